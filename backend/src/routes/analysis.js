@@ -5,6 +5,17 @@ import { incrementAnalysisStats } from './stats.js';
 const router = express.Router();
 const GRAPH_AGENT_URL = process.env.GRAPH_AGENT_URL || 'http://localhost:8000';
 
+// Sections rendered by the dashboard (heavy ones like metrics.pagerank stay on the Graph Agent,
+// available via /analysis/{analysis_id}/...)
+const ANALYSIS_FIELDS = [
+    'graph_data',
+    'metrics',
+    'mixer_flags',
+    'suspicious_clusters',
+    'top_holders',
+    'wash_trade_pairs'
+];
+
 // Transform Graph Agent response to frontend format
 function transformAnalysisResponse(pythonResponse) {
     const { graph_data, risk_score, metrics, mixer_flags, suspicious_clusters, top_holders, wash_trade_pairs } = pythonResponse;
@@ -53,7 +64,8 @@ function transformAnalysisResponse(pythonResponse) {
         clusters: clusters,
         whales: whales,
         wash_trade_pairs: wash_trade_pairs || [],
-        metrics: metrics || {}
+        metrics: metrics || {},
+        analysis_id: pythonResponse.analysis_id || null
     };
 }
 
@@ -73,7 +85,8 @@ router.post('/', async (req, res) => {
             token_address: token_address,
             chain: 'ethereum',
             api_provider: 'auto',
-            timeout_seconds: 30
+            timeout_seconds: 30,
+            fields: ANALYSIS_FIELDS
         }, {
             timeout: 35000 // 35s timeout (Graph Agent has 30s max)
         });
@@ -78,6 +78,9 @@ const GraphView = ({
         );
     }
 
+    // Positions precomputed by the Graph Agent (x/y): no force simulation needed
+    const hasLayout = graphData.nodes.every(node => node.x !== undefined && node.y !== undefined);
+
     return (
         <ForceGraph2D
             ref={graphRef}
@@ -93,6 +96,7 @@ const GraphView = ({
             backgroundColor="#020617"
             enableNodeDrag={true}
             cooldownTime={3000}
+            cooldownTicks={hasLayout ? 0 : Infinity}
             nodeCanvasObject={paintNode}
         />
     );
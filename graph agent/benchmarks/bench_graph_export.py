@@ -0,0 +1,44 @@
+"""
+Benchmark export CSV (src.graph_export) pour les backfills
+Exporte TOKENS graphes synthétiques de EDGES arêtes dans un dossier temporaire et
+mesure le débit en lignes/s (wallets + transferts), la taille du dossier et le pic de RSS
+(constant quel que soit TOKENS: les fichiers sont écrits au fil de l'eau).
+
+Usage (depuis "graph agent"):
+  python benchmarks/bench_graph_export.py
+"""
+import os
+import sys
+import resource
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_graph_storage import synthetic_graph  # noqa: E402
+from src.graph_export import CSVGraphExporter  # noqa: E402
+
+TOKENS = 20
+EDGES = 20_000
+
+
+def main():
+    graphs = [synthetic_graph(EDGES, seed=seed) for seed in range(4)]
+    analysis = {"metrics": {"pagerank": {}, "chain": "ethereum"}, "mixer_flags": []}
+    export_dir = tempfile.mkdtemp(prefix="graph_export_")
+    rows = 0
+    start = time.perf_counter()
+    with CSVGraphExporter(export_dir, chunk_rows=250_000) as exporter:
+        for i in range(TOKENS):
+            counts = exporter.add_graph(graphs[i % len(graphs)], f"0xtoken{i}", analysis)
+            rows += sum(counts.values())
+    seconds = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3  # Ko sous Linux
+    size = sum(os.path.getsize(os.path.join(export_dir, name)) for name in os.listdir(export_dir))
+    print(f"{TOKENS} tokens x {EDGES} edges -> {rows} rows in {seconds:.2f}s "
+          f"({rows / seconds:,.0f} rows/s), {size / 1e6:.1f} MB, peak RSS {peak_rss:.0f} MB")
+    print(f"export dir: {export_dir}")
+
+
+if __name__ == "__main__":
+    main()
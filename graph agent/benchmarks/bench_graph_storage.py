@@ -0,0 +1,126 @@
+"""
+Benchmark écritures Memgraph (GraphStorage._save_to_memgraph)
+Compare une requête par ligne (batch 1, comportement historique) aux lots UNWIND,
+avec 1 ou plusieurs sessions en parallèle, sur un graphe synthétique de 20k arêtes.
+
+Usage (depuis "graph agent"):
+  python benchmarks/bench_graph_storage.py                      # stand-in embarqué (latence simulée)
+  python benchmarks/bench_graph_storage.py bolt://localhost:7687  # Memgraph/Neo4j local (docker)
+
+Le stand-in simule un aller-retour réseau par requête (ROUND_TRIP_MS) et un coût par ligne
+(ROW_US): il mesure le nombre d'allers-retours, pas les performances du moteur.
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import networkx as nx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.graph_storage import GraphSnapshot, GraphStorage  # noqa: E402
+
+EDGES = 20_000
+ROUND_TRIP_MS = 0.5
+ROW_US = 5
+CONFIGS = [(1, 1), (100, 1), (1000, 1), (5000, 1), (1000, 4)]  # (batch_size, sessions)
+
+
+class _Result:
+    def __init__(self, record):
+        self._record = record
+
+    def single(self):
+        return self._record
+
+    def consume(self):
+        return self
+
+
+class _Session:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, cypher, **params):
+        rows = next((len(v) for v in params.values() if isinstance(v, list)), 1)
+        time.sleep(ROUND_TRIP_MS / 1000 + rows * ROW_US / 1e6)
+        with self.driver.lock:
+            self.driver.queries += 1
+            self.driver.rows += rows
+        return _Result({"count": rows, "wallet_count": 0, "transfer_count": 0})
+
+    def execute_write(self, fn, *args):
+        return fn(self, *args)
+
+
+class StandInDriver:
+    """Driver Bolt minimal: latence par requête, compte requêtes et lignes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queries = 0
+        self.rows = 0
+
+    def verify_connectivity(self):
+        pass
+
+    def session(self, **kwargs):
+        return _Session(self)
+
+    def close(self):
+        pass
+
+
+def synthetic_graph(edges: int, seed: int = 7) -> nx.DiGraph:
+    rng = random.Random(seed)
+    wallets = [f"0x{rng.getrandbits(160):040x}" for _ in range(edges // 4)]
+    graph = nx.DiGraph()
+    for wallet in wallets:
+        graph.add_node(wallet, balance=rng.random() * 1e6, transaction_count=rng.randint(1, 50))
+    pairs = set()
+    while len(pairs) < edges:
+        pairs.add(tuple(rng.sample(wallets, 2)))
+    for a, b in pairs:
+        graph.add_edge(a, b, weight=rng.random() * 1e4, count=rng.randint(1, 20), tx_hash="0x")
+    return graph
+
+
+def main():
+    uri = sys.argv[1] if len(sys.argv) > 1 else None
+    graph = synthetic_graph(EDGES)
+    analysis = {"metrics": {"pagerank": {}, "chain": "ethereum"}, "mixer_flags": []}
+    print(f"{graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges - "
+          f"{'Memgraph at ' + uri if uri else f'stand-in ({ROUND_TRIP_MS}ms round trip)'}")
+    print(f"{'batch':>6} {'sessions':>8} {'queries':>8} {'seconds':>8} {'rows/s':>10}")
+    for batch_size, sessions in CONFIGS:
+        if uri:
+            from neo4j import GraphDatabase
+            driver = GraphDatabase.driver(uri)
+            driver.session().run("MATCH (n) DETACH DELETE n").consume()
+        else:
+            driver = StandInDriver()
+        # Mode full + snapshot jetable: chaque configuration écrit tout le graphe
+        snapshot = GraphSnapshot(os.path.join(tempfile.mkdtemp(), "snapshot.sqlite3"))
+        storage = GraphStorage("memgraph", driver=driver, batch_size=batch_size, write_sessions=sessions,
+                               write_mode="full", snapshot=snapshot)
+        result = storage.save_graph(graph, "0xbench", analysis)
+        if not result.get("success"):
+            print(f"  failed: {result.get('error')}")
+            continue
+        queries = getattr(driver, "queries", "-")
+        print(f"{batch_size:>6} {sessions:>8} {queries:>8} {result['write_seconds']:>8.2f} "
+              f"{result['rows_per_second']:>10.0f}")
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark sérialisation des réponses /analyze
+Temps d'encodage (pydantic + json vs src.serialization) et octets envoyés
+(brut / gzip / br) pour des graphes synthétiques de 1k, 10k et 100k arêtes,
+puis graph_data seul: format "objects" vs "compact" (taille, temps de parsing JSON).
+
+Usage (depuis "graph agent"): python benchmarks/bench_serialization.py
+"""
+import json
+import os
+import random
+import sys
+import time
+
+import networkx as nx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main1 import TokenAnalysisResponse  # noqa: E402
+from src.graph_builder import GraphBuilder  # noqa: E402
+from src.graph_format import format_graph  # noqa: E402
+from src.serialization import available_encodings, compress, dumps, msgpack, orjson, packb  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000)
+REPEAT = 3
+
+
+def synthetic_result(edges: int, seed: int = 42) -> dict:
+    """Résultat d'analyse réaliste: ~edges/4 wallets, PageRank, clusters, wash trades"""
+    rng = random.Random(seed)
+    nodes = [f"0x{rng.getrandbits(160):040x}" for _ in range(max(2, edges // 4))]
+    graph = nx.DiGraph()
+    for address in nodes:
+        graph.add_node(address, balance=rng.random() * 1e6)
+    pairs = set()
+    while len(pairs) < edges:
+        pairs.add(tuple(rng.sample(nodes, 2)))
+    for a, b in pairs:
+        graph.add_edge(a, b, weight=rng.random() * 1e4, count=rng.randint(1, 20))
+
+    pagerank = {address: rng.random() / len(nodes) for address in nodes}
+    clusters = [
+        {"cluster_id": i, "wallets": nodes[i * 20:(i + 1) * 20], "size": 20, "risk": 0.5}
+        for i in range(min(50, len(nodes) // 20))
+    ]
+    wash = [{"from": a, "to": b, "score": 0.9} for a, b, _ in list(graph.edges(data=True))[:100]]
+    analysis = {
+        "suspicious_clusters": clusters,
+        "mixer_flags": [],
+        "wash_trade_pairs": wash,
+        "metrics": {"pagerank": pagerank, "gini": 0.8},
+    }
+    graph_data = GraphBuilder().format_for_react_force_graph(graph, analysis)
+    return {
+        "token_address": nodes[0],
+        "analysis_time_seconds": 1.0,
+        "risk_score": 0.5,
+        "top_holders": [{"address": a, "balance": 1.0} for a in nodes[:100]],
+        "suspicious_clusters": clusters,
+        "mixer_flags": [],
+        "wash_trade_pairs": wash,
+        "graph_data": graph_data,
+        "metrics": analysis["metrics"],
+        "storage_result": None,
+        "analysis_id": "bench",
+    }
+
+
+def best_of(fn) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print(f"orjson: {'yes' if orjson is not None else 'no (json fallback)'} - "
+          f"encodings: {', '.join(available_encodings())}")
+    header = f"{'edges':>8} {'pydantic+json':>14} {'dumps':>8} {'raw':>10}"
+    header += "".join(f" {encoding:>10}" for encoding in available_encodings())
+    print(header)
+    for edges in SIZES:
+        result = synthetic_result(edges)
+        legacy = best_of(lambda: json.dumps(
+            TokenAnalysisResponse(**result).model_dump(), default=str
+        ).encode())
+        fast = best_of(lambda: dumps(result))
+        body = dumps(result)
+        line = f"{edges:>8} {legacy * 1000:>12.1f}ms {fast * 1000:>6.1f}ms {len(body) / 1024:>8.0f}KB"
+        for encoding in available_encodings():
+            start = time.perf_counter()
+            size = len(compress(body, encoding))
+            line += f" {size / 1024:>5.0f}KB/{(time.perf_counter() - start) * 1000:.0f}ms"
+        print(line)
+
+    print("\ngraph_data: objects vs compact (raw / gzip / msgpack, json.loads time)")
+    for edges in SIZES:
+        result = synthetic_result(edges)
+        for graph_format in ("objects", "compact"):
+            graph_data = format_graph(result, graph_format)["graph_data"]
+            body = dumps(graph_data)
+            parse = best_of(lambda: json.loads(body))
+            line = (f"{edges:>8} {graph_format:>8} {len(body) / 1024:>8.0f}KB "
+                    f"{len(compress(body, 'gzip')) / 1024:>6.0f}KB")
+            if msgpack is not None:
+                line += f" {len(packb(graph_data)) / 1024:>6.0f}KB"
+            print(line + f" parse {parse * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
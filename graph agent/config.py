@@ -3,6 +3,9 @@ Configuration centralisée pour BlockStat Backend
 Optimisé pour contrainte <30s
 """
 import os
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Mapping, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -29,9 +32,80 @@ class Config:
     MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 8))
     REQUESTS_PER_SECOND = int(os.getenv("REQUESTS_PER_SECOND", 4))
     REQUEST_TIMEOUT_SECONDS = int(os.getenv("REQUEST_TIMEOUT_SECONDS", 10))
-    # Cache in-memory (TTL et taille)
+    # Quotas partagés par provider (token bucket commun à toutes les requêtes du process)
+    PROVIDER_REQUESTS_PER_SECOND = {
+        "etherscan": REQUESTS_PER_SECOND,
+        "alchemy": int(os.getenv("ALCHEMY_REQUESTS_PER_SECOND", 25)),
+        "bitquery": int(os.getenv("BITQUERY_REQUESTS_PER_SECOND", 5)),
+    }
+    # Pool de connexions HTTP partagé (keep-alive)
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+    # Threads pour les étapes CPU (graphe, Leiden, PageRank) hors de la boucle asyncio
+    ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", 4))
+    # Batch /analyze/batch
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 4))
+    BATCH_MAX_TOKENS = int(os.getenv("BATCH_MAX_TOKENS", 500))
+    # Contrôle d'admission /analyze (file bornée, limite par client, refus rapide 429/503)
+    ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", 8))
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", 32))
+    ADMISSION_PER_CLIENT = int(os.getenv("ADMISSION_PER_CLIENT", 4))
+    ADMISSION_SLA_SECONDS = float(os.getenv("ADMISSION_SLA_SECONDS", 30))  # contrainte <30s
+    ADMISSION_INITIAL_SERVICE_SECONDS = float(os.getenv("ADMISSION_INITIAL_SERVICE_SECONDS", 5))
+    ADMISSION_SMALL_TRANSACTIONS = int(os.getenv("ADMISSION_SMALL_TRANSACTIONS", 2000))  # priorité "petite requête"
+    # Jobs asynchrones (/jobs)
+    JOB_MAX_CONCURRENCY = int(os.getenv("JOB_MAX_CONCURRENCY", 4))
+    JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", 64))  # en attente + en cours, au-delà: 503
+    JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", 3600))  # résultats gardés 1h
+    # État des jobs partagé entre workers (si CACHE_BACKEND=sqlite): GET /jobs/{id} sur n'importe quel worker
+    JOB_STORE_MAX_BYTES = int(os.getenv("JOB_STORE_MAX_MB", 128)) * 1024 * 1024
+    JOB_STORE_SQLITE_PATH = os.getenv("JOB_STORE_SQLITE_PATH", "data/jobs.sqlite3")
+    # Cache in-memory des données fetchées (compressé, borné en octets)
     CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 300))  # 5 minutes
-    MAX_CACHE_ITEMS = int(os.getenv("MAX_CACHE_ITEMS", 100))
+    CACHE_STALE_SECONDS = int(os.getenv("CACHE_STALE_SECONDS", 600))  # servi périmé pendant le rafraîchissement
+    CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_MB", 256)) * 1024 * 1024
+    CACHE_COMPRESSION_LEVEL = int(os.getenv("CACHE_COMPRESSION_LEVEL", 1))  # zlib: 1 = rapide
+    # "memory" (par worker) ou "sqlite" (fichier WAL partagé par les workers du nœud, survit aux redémarrages)
+    # Entrées sérialisées avec pickle: les fichiers SQLite (cache, résultats, layouts) doivent être de confiance,
+    # jamais partagés avec un autre utilisateur ni restaurés depuis une source externe (exécution de code au chargement)
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "data/cache.sqlite3")
+    # Cache des réponses /analyze sérialisées (ETag / If-None-Match)
+    RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 300))
+    RESPONSE_CACHE_MAX_ITEMS = int(os.getenv("RESPONSE_CACHE_MAX_ITEMS", 50))
+    # Résultats complets des analyses (sections lourdes servies par /analysis/{analysis_id}/...)
+    RESULT_STORE_TTL_SECONDS = int(os.getenv("RESULT_STORE_TTL_SECONDS", 1800))
+    RESULT_STORE_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_MB", 128)) * 1024 * 1024
+    RESULT_STORE_SQLITE_PATH = os.getenv("RESULT_STORE_SQLITE_PATH", "data/results.sqlite3")  # si CACHE_BACKEND=sqlite
+    # Compression des réponses (Accept-Encoding: br si brotli est installé, sinon gzip)
+    COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))  # petits corps envoyés tels quels
+    GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 5))
+    COMPRESS_THREAD_MIN_BYTES = int(os.getenv("COMPRESS_THREAD_MIN_BYTES", 64 * 1024))  # au-delà: compression hors boucle
+    RENDER_THREAD_MIN_ITEMS = int(os.getenv("RENDER_THREAD_MIN_ITEMS", 500))  # nœuds + liens: au-delà, rendu + encodage hors boucle
+    BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+    # Résumé du graphe pour les gros tokens (graph_detail="summary"/"auto", src/level_of_detail.py)
+    LOD_AUTO_THRESHOLD_NODES = int(os.getenv("LOD_AUTO_THRESHOLD_NODES", 2000))  # "auto": résumé au-delà
+    LOD_MAX_NODES = int(os.getenv("LOD_MAX_NODES", 500))  # nœuds rendus (explicites + supernœuds)
+    LOD_MAX_SUPERNODES = int(os.getenv("LOD_MAX_SUPERNODES", 100))  # communautés suivantes -> "community:other"
+    LOD_TOP_K = int(os.getenv("LOD_TOP_K", 100))  # wallets gardés explicites par PageRank
+    # Layout précalculé (x/y dans graph_data, src/layout.py)
+    # Calculé en tâche de fond (jamais pendant /analyze); DrL ~2s par millier de nœuds
+    LAYOUT_MAX_NODES = int(os.getenv("LAYOUT_MAX_NODES", 5000))  # au-delà: pas de layout (0 = désactivé)
+    LAYOUT_DRL_THRESHOLD = int(os.getenv("LAYOUT_DRL_THRESHOLD", 1000))  # DrL au lieu de Fruchterman-Reingold
+    LAYOUT_ITERATIONS = int(os.getenv("LAYOUT_ITERATIONS", 500))
+    LAYOUT_REFINE_ITERATIONS = int(os.getenv("LAYOUT_REFINE_ITERATIONS", 50))  # layout précédent réutilisé
+    LAYOUT_SPACING = float(os.getenv("LAYOUT_SPACING", 20))
+    LAYOUT_SEED = int(os.getenv("LAYOUT_SEED", 42))
+    # Dernier layout de chaque token (position de départ de la ré-analyse)
+    LAYOUT_STORE_TTL_SECONDS = int(os.getenv("LAYOUT_STORE_TTL_SECONDS", 7 * 24 * 3600))
+    LAYOUT_STORE_MAX_BYTES = int(os.getenv("LAYOUT_STORE_MAX_MB", 64)) * 1024 * 1024
+    LAYOUT_STORE_SQLITE_PATH = os.getenv("LAYOUT_STORE_SQLITE_PATH", "data/layouts.sqlite3")  # si CACHE_BACKEND=sqlite
+    # Requêtes viewport sur le layout (GET /graph/{token}/viewport, src/viewport.py)
+    VIEWPORT_CELL_PIXELS = float(os.getenv("VIEWPORT_CELL_PIXELS", 48))  # cellule d'écran
+    VIEWPORT_NODES_PER_CELL = int(os.getenv("VIEWPORT_NODES_PER_CELL", 4))
+    VIEWPORT_CONTEXT_FACTOR = int(os.getenv("VIEWPORT_CONTEXT_FACTOR", 8))  # hors viewport: cellules 8x plus grandes
+    VIEWPORT_MAX_NODES = int(os.getenv("VIEWPORT_MAX_NODES", 2000))
+    VIEWPORT_MAX_CONTEXT_NODES = int(os.getenv("VIEWPORT_MAX_CONTEXT_NODES", 200))
+    VIEWPORT_INDEX_CACHE_ITEMS = int(os.getenv("VIEWPORT_INDEX_CACHE_ITEMS", 8))
     
     # Etherscan API
     ETHERSCAN_API_URL = "https://api.etherscan.io/v2/api"
@@ -46,10 +120,40 @@ class Config:
     NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
     NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
     NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "neo4j")
+    # NEO4J_URI explicite: driver asyncio ouvert au démarrage (/chat) et donc surveillé
+    NEO4J_CONFIGURED = bool(os.getenv("NEO4J_URI"))
     
     MEMGRAPH_URI = os.getenv("MEMGRAPH_URI", "bolt://localhost:7687")
     MEMGRAPH_USER = os.getenv("MEMGRAPH_USER", "")
     MEMGRAPH_PASSWORD = os.getenv("MEMGRAPH_PASSWORD", "")
+    # Écritures par lots (UNWIND): lignes par requête, sessions en parallèle
+    GRAPH_DB_BATCH_SIZE = int(os.getenv("GRAPH_DB_BATCH_SIZE", 1000))
+    GRAPH_DB_WRITE_SESSIONS = int(os.getenv("GRAPH_DB_WRITE_SESSIONS", 1))
+    # "diff": n'écrire que les wallets/transferts modifiés depuis la dernière sauvegarde du token
+    # "full": tout réécrire (MERGE, sans doublons) et resynchroniser le snapshot, ex. après un reset de la base
+    GRAPH_DB_WRITE_MODE = os.getenv("GRAPH_DB_WRITE_MODE", "diff")
+    GRAPH_DB_SNAPSHOT_PATH = os.getenv("GRAPH_DB_SNAPSHOT_PATH", "data/graph_snapshots.sqlite3")
+    # Persistance en tâche de fond (save_to_graph_db): file bornée, workers, tentatives
+    PERSISTENCE_MAX_QUEUE = int(os.getenv("PERSISTENCE_MAX_QUEUE", 64))
+    PERSISTENCE_WORKERS = int(os.getenv("PERSISTENCE_WORKERS", 2))
+    PERSISTENCE_MAX_ATTEMPTS = int(os.getenv("PERSISTENCE_MAX_ATTEMPTS", 3))
+    PERSISTENCE_RETRY_BACKOFF_SECONDS = float(os.getenv("PERSISTENCE_RETRY_BACKOFF_SECONDS", 1.0))
+    PERSISTENCE_DRAIN_SECONDS = float(os.getenv("PERSISTENCE_DRAIN_SECONDS", 10))  # attente max à l'arrêt
+    # Drivers Bolt partagés (/chat, persistance): pool, attente d'une connexion, recyclage, health check
+    GRAPH_DB_POOL_SIZE = int(os.getenv("GRAPH_DB_POOL_SIZE", 10))
+    GRAPH_DB_ACQUISITION_TIMEOUT_SECONDS = float(os.getenv("GRAPH_DB_ACQUISITION_TIMEOUT_SECONDS", 10))
+    GRAPH_DB_MAX_CONNECTION_LIFETIME_SECONDS = float(os.getenv("GRAPH_DB_MAX_CONNECTION_LIFETIME_SECONDS", 1800))
+    GRAPH_DB_HEALTH_CHECK_SECONDS = float(os.getenv("GRAPH_DB_HEALTH_CHECK_SECONDS", 30))
+    # /chat: délais max de l'appel LLM et de la requête Cypher, lignes renvoyées au plus
+    CHAT_LLM_TIMEOUT_SECONDS = float(os.getenv("CHAT_LLM_TIMEOUT_SECONDS", 60))
+    CHAT_QUERY_TIMEOUT_SECONDS = float(os.getenv("CHAT_QUERY_TIMEOUT_SECONDS", 15))
+    CHAT_MAX_ROWS = int(os.getenv("CHAT_MAX_ROWS", 1000))
+    # Store graphe embarqué (graph_db_type="sqlite"), sans serveur; AUTO_SAVE: alimenté à chaque analyse
+    GRAPH_STORE_SQLITE_PATH = os.getenv("GRAPH_STORE_SQLITE_PATH", "data/graph_store.sqlite3")
+    GRAPH_STORE_AUTO_SAVE = os.getenv("GRAPH_STORE_AUTO_SAVE", "false").lower() == "true"
+    # Export CSV (graph_db_type="csv"): dossier d'export, lignes max par fichier
+    GRAPH_EXPORT_DIR = os.getenv("GRAPH_EXPORT_DIR", "data/graph_export")
+    GRAPH_EXPORT_CHUNK_ROWS = int(os.getenv("GRAPH_EXPORT_CHUNK_ROWS", 1_000_000))
     
     # Known Mixer Addresses (Tornado Cash, etc.)
     KNOWN_MIXERS = {
@@ -59,6 +163,11 @@ class Config:
         "0xa160cdab225685da1d56aa342ad8841c3b53f291",  # Tornado Cash 100 ETH
     }
     
+    # Label Registry (fichier mmap trié d'adresses étiquetées: sanctions, CEX, DEX routers...)
+    # KNOWN_MIXERS et PROTOCOL_WHITELIST ci-dessous restent fusionnés comme labels intégrés
+    LABEL_REGISTRY_PATH = os.getenv("LABEL_REGISTRY_PATH", "data/labels.bin")
+    LABEL_REGISTRY_RELOAD_SECONDS = float(os.getenv("LABEL_REGISTRY_RELOAD_SECONDS", 30))  # rechargement à chaud
+    
     # Protocol Whitelist (adresses connues de DEX routers, staking, bridges, trésoreries)
     PROTOCOL_WHITELIST = {
         # Uniswap V2 Router
@@ -106,3 +215,32 @@ class Config:
             )
         return True
 
+
+@dataclass(frozen=True)
+class AnalysisSettings:
+    """
+    Paramètres d'une analyse (immuables), construits par requête à partir de Config.
+    Passés explicitement à DataFetcher, GraphAnalyzer, WashTradeDetector et RiskScorer:
+    les overrides d'une requête ne modifient jamais Config (analyses concurrentes sûres).
+    """
+    max_transactions: int = field(default_factory=lambda: Config.MAX_TRANSACTIONS_TO_FETCH)
+    max_holders: int = field(default_factory=lambda: Config.MAX_HOLDERS)
+    timeout_seconds: Optional[int] = None  # None = timeout désactivé
+    request_timeout_seconds: float = field(default_factory=lambda: Config.REQUEST_TIMEOUT_SECONDS)
+    max_concurrent_requests: int = field(default_factory=lambda: Config.MAX_CONCURRENT_REQUESTS)
+    wash_trade_burst_window_seconds: int = field(default_factory=lambda: Config.WASH_TRADE_BURST_WINDOW_SECONDS)
+    wash_trade_volume_normalizer: float = field(default_factory=lambda: Config.WASH_TRADE_VOLUME_NORMALIZER)
+    risk_weights: Mapping[str, float] = field(default_factory=lambda: Config.RISK_WEIGHTS)
+
+    def __post_init__(self):
+        # Copie en lecture seule: les poids ne peuvent pas être modifiés après coup
+        object.__setattr__(self, "risk_weights", MappingProxyType(dict(self.risk_weights)))
+
+    @classmethod
+    def from_config(cls, **overrides) -> "AnalysisSettings":
+        """Valeurs de Config, avec overrides (les valeurs None sont ignorées)"""
+        return cls(**{k: v for k, v in overrides.items() if v is not None})
+
+    def with_overrides(self, **overrides) -> "AnalysisSettings":
+        """Copie modifiée (les valeurs None sont ignorées)"""
+        return replace(self, **{k: v for k, v in overrides.items() if v is not None})
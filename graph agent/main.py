@@ -12,7 +12,7 @@ import uvicorn
 import os
 os.environ.setdefault("NX_CUGRAPH_AUTOCONFIG", "True")
 
-from config import Config
+from config import Config, AnalysisSettings
 from src.data_fetcher import DataFetcher
 from src.graph_builder import GraphBuilder
 from src.analyzer import GraphAnalyzer
@@ -78,10 +78,14 @@ async def analyze_token(request: TokenAnalysisRequest):
     """
     start_time = time.time()
     
-    # Override config avec valeurs de la requête si fournies
-    max_transactions = request.max_transactions if request.max_transactions else Config.MAX_TRANSACTIONS_TO_FETCH
-    timeout_seconds = request.timeout_seconds if request.timeout_seconds is not None else Config.TIMEOUT_SECONDS
-    timeout_enabled = request.timeout_seconds is not None
+    # Paramètres de cette requête (Config n'est jamais modifié: requêtes concurrentes isolées)
+    settings = AnalysisSettings.from_config(
+        max_transactions=request.max_transactions or None,
+        timeout_seconds=request.timeout_seconds,
+    )
+    max_transactions = settings.max_transactions
+    timeout_seconds = settings.timeout_seconds
+    timeout_enabled = timeout_seconds is not None
     
     try:
         # Vérification timeout avant de commencer (seulement si activé)
@@ -97,20 +101,13 @@ async def analyze_token(request: TokenAnalysisRequest):
         print(f"  📊 Max Transactions: {max_transactions}")
         print(f"  ⏱️ Timeout: {'Enabled (' + str(timeout_seconds) + 's)' if timeout_enabled else 'Disabled'}")
         
-        # Override temporairement la config pour cette requête
-        original_max = Config.MAX_TRANSACTIONS_TO_FETCH
-        Config.MAX_TRANSACTIONS_TO_FETCH = max_transactions
-        
-        fetcher = DataFetcher(chain=request.chain, preferred_provider=request.api_provider)
+        fetcher = DataFetcher(chain=request.chain, preferred_provider=request.api_provider, settings=settings)
         token_data = await fetcher.fetch_token_data(request.token_address)
         # Inject provider used into metrics for frontend visibility
         if "metrics" not in token_data:
             token_data["metrics"] = {}
         token_data["metrics"]["provider_used"] = fetcher.last_provider_used or request.api_provider
         
-        # Restaurer la config originale
-        Config.MAX_TRANSACTIONS_TO_FETCH = original_max
-        
         # Vérification timeout après fetch (seulement si activé)
         elapsed = time.time() - start_time
         if timeout_enabled and elapsed > timeout_seconds:
@@ -130,7 +127,7 @@ async def analyze_token(request: TokenAnalysisRequest):
         
         # 3. ANALYZE (algorithms optimisés)
         print(f"[{time.time() - start_time:.2f}s] 🧠 Running analysis")
-        analyzer = GraphAnalyzer(graph)
+        analyzer = GraphAnalyzer(graph, settings=settings)
         analysis_results = analyzer.analyze(community_mode=request.community_mode or "auto")
         # Ensure provider_used is available in response metrics
         analysis_results.setdefault("metrics", {})
@@ -138,7 +135,7 @@ async def analyze_token(request: TokenAnalysisRequest):
         
         # 3.5. WASH TRADE DETECTION
         print(f"[{time.time() - start_time:.2f}s] 🔍 Detecting wash trades")
-        wash_detector = WashTradeDetector(graph)
+        wash_detector = WashTradeDetector(graph, settings=settings)
         wash_trade_pairs = wash_detector.detect()
         analysis_results["wash_trade_pairs"] = wash_trade_pairs
         
@@ -150,7 +147,7 @@ async def analyze_token(request: TokenAnalysisRequest):
         
         # 4. RISK SCORING
         print(f"[{time.time() - start_time:.2f}s] ⚠️ Calculating risk scores")
-        scorer = RiskScorer()
+        scorer = RiskScorer(settings=settings)
         risk_score = scorer.calculate_risk_score(
             analysis_results, 
             token_data
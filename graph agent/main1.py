@@ -3,32 +3,59 @@ BlockStat - Forensic Graph Agent Backend
 Version avec ouverture automatique du navigateur
 Optimized for <30s response time (Hackathon MVP)
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+import math
 import time
+import uuid
+import asyncio
 import webbrowser
 import threading
-from typing import Optional, Dict, List
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Tuple
 import uvicorn
 import os
 
 import os
 os.environ.setdefault("NX_CUGRAPH_AUTOCONFIG", "True")
 
-from config import Config
+from config import Config, AnalysisSettings
 from src.data_fetcher import DataFetcher
 from src.graph_builder import GraphBuilder
 from src.analyzer import GraphAnalyzer
 from src.risk_scorer import RiskScorer
 from src.wash_trade_detector import WashTradeDetector
 from src.utils import check_mixer_flags
-from src.graph_storage import GraphStorage
+from src.persistence import PersistenceQueue, PersistenceRejected
+from src.graph_store import get_graph_store
+from src.graph_db import close_drivers as close_graph_db_drivers, get_async_driver as get_graph_db_async_driver
+from src.graph_db import close_async_drivers as close_graph_db_async_drivers
+from src.graph_db import health_status as graph_db_health, monitor_health as monitor_graph_db_health
+from src.progress import AnalysisProgress
+from src.jobs import JobManager, JobRejected
+from src.cache import create_cache
+from src.label_registry import get_label_registry
+from src.projection import parse_fields, project_response
+from src.serialization import dumps, encode_body, encode_for_client, negotiate_media_type
+from src.graph_format import format_graph, validate_graph_format
+from src.level_of_detail import apply_level_of_detail, parse_expand, validate_graph_detail
+from src.layout import apply_layout, layout_graph_data, layout_key, positions_from_graph_data
+from src.viewport import ViewportIndex, ViewportIndexCache, parse_bbox
+from src.admission import (
+    AdmissionController, AdmissionRejected, PRIORITY_CACHED, PRIORITY_SMALL, PRIORITY_DEFAULT
+)
+from src.response_cache import (
+    ResponseCache, CachedResponse, analysis_params, data_watermark, etag_for, etag_matches,
+    latest_analysis_key, response_cache_key
+)
 # Chat agent is provided by src.agents.chat_agent
-# See /chat route defined using get_chat_agent, extract_cypher, run_cypher from that module
-from src.agents.chat_agent import get_chat_agent, extract_cypher, run_cypher
+# See /chat route defined using get_chat_agent, extract_cypher, run_cypher_async, stream_cypher from that module
+from src.agents.chat_agent import get_chat_agent, extract_cypher, run_cypher_async, stream_cypher
 
 # Valider la configuration au démarrage
 Config.validate()
@@ -56,21 +83,76 @@ class TokenAnalysisRequest(BaseModel):
     max_transactions: Optional[int] = None  # Override MAX_TRANSACTIONS_TO_FETCH
     timeout_seconds: Optional[int] = None  # Override TIMEOUT_SECONDS (None = disabled)
     save_to_graph_db: Optional[bool] = False  # Sauvegarder dans Neo4j/Memgraph après analyse
-    graph_db_type: Optional[str] = "neo4j"  # "neo4j" ou "memgraph"
+    graph_db_type: Optional[str] = "neo4j"  # "neo4j", "memgraph", "sqlite" (embarqué) ou "csv" (export hors ligne)
     community_mode: Optional[str] = "auto"  # "auto" | "leiden" | "louvain"
+    # Sections à renvoyer par /analyze (None = réponse complète), ex: ["graph_data", "top_holders"]
+    # Sections lourdes sur demande: "metrics.pagerank", "metrics.communities", "suspicious_clusters.wallets"
+    fields: Optional[List[str]] = None
+    # Format de graph_data: "objects" (React Force Graph) | "compact" (tableaux parallèles, voir src/graph_format.py)
+    graph_format: Optional[str] = "objects"
+    # "full" | "summary" (communautés repliées en supernœuds) | "auto" (résumé au-delà de LOD_AUTO_THRESHOLD_NODES)
+    # "full" par défaut: le backend lit graph_data.nodes (total_wallets, active_wallets), le client opte pour le résumé
+    graph_detail: Optional[str] = "full"
 
 
 class TokenAnalysisResponse(BaseModel):
     token_address: str
     analysis_time_seconds: float
     risk_score: float
-    top_holders: List[Dict]
-    suspicious_clusters: List[Dict]
-    mixer_flags: List[Dict]
-    wash_trade_pairs: List[Dict]
-    graph_data: Dict  # Format pour React Force Graph
-    metrics: Dict  # PageRank, Gini, etc.
+    # Sections absentes si non demandées dans `fields`
+    top_holders: Optional[List[Dict]] = None
+    suspicious_clusters: Optional[List[Dict]] = None
+    mixer_flags: Optional[List[Dict]] = None
+    wash_trade_pairs: Optional[List[Dict]] = None
+    graph_data: Optional[Dict] = None  # Format pour React Force Graph
+    metrics: Optional[Dict] = None  # PageRank, Gini, etc.
     storage_result: Optional[Dict] = None  # Résultat de sauvegarde dans graph DB
+    analysis_id: Optional[str] = None  # Pour /analysis/{analysis_id}/... (sections lourdes)
+
+
+# Health check périodique des drivers graph DB (tâche de fond, démarrée avec le serveur)
+_graph_db_monitor: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def warm_chat():
+    """
+    Construit l'agent /chat et, si Neo4j est configuré (NEO4J_URI), son driver asyncio (lié à
+    cette boucle) une fois, puis lance le health check périodique des drivers ouverts en
+    arrière-plan (sans bloquer le démarrage)
+    """
+    global _graph_db_monitor
+    try:
+        get_chat_agent()
+    except Exception as e:
+        print(f"  ⚠️ Chat agent unavailable: {e}")
+    try:
+        if Config.NEO4J_CONFIGURED:
+            get_graph_db_async_driver("neo4j")
+    except Exception as e:
+        print(f"  ⚠️ Neo4j async driver unavailable: {e}")
+    _graph_db_monitor = asyncio.create_task(monitor_graph_db_health())
+
+
+@app.on_event("startup")
+async def warm_label_registry():
+    """Charge le registre de labels et construit son filtre de Bloom dans un thread (jamais sur une requête)"""
+    await asyncio.to_thread(get_label_registry)
+
+
+@app.on_event("shutdown")
+async def close_shared_clients():
+    """Arrête les layouts en cours, ferme le pool HTTP partagé des fetchers, vide la file de persistance et ferme les drivers graph DB"""
+    if _graph_db_monitor is not None:
+        _graph_db_monitor.cancel()
+        await asyncio.gather(_graph_db_monitor, return_exceptions=True)
+    for task in list(_layout_tasks.values()):
+        task.cancel()
+    await asyncio.gather(*_layout_tasks.values(), return_exceptions=True)
+    await DataFetcher.close_http_clients()
+    await persistence_queue.close()
+    close_graph_db_drivers()
+    await close_graph_db_async_drivers()
 
 
 @app.get("/")
@@ -96,133 +178,391 @@ async def api_info():
         "endpoints": {
             "health": "/health",
             "analyze": "/analyze (POST)",
+            "analyze_batch": "/analyze/batch (POST, NDJSON stream)",
+            "analyze_stream": "/analyze/stream (POST, Server-Sent Events)",
+            "jobs": "/jobs (POST), /jobs/{job_id} (GET, DELETE)",
+            "persistence": "/persistence/{job_id} (sauvegardes graph DB en tâche de fond)",
+            "store": "/store/wallets/{address}, /store/wallets/{address}/neighbours, "
+                     "/store/tokens/{token_address}/top, /store/tokens/{token_address}/transfers, "
+                     "/store/tokens/{token_address}/history (store graphe embarqué)",
+            "analysis": "/analysis/{analysis_id}?fields=..., /analysis/{analysis_id}/pagerank, "
+                        "/analysis/{analysis_id}/communities, /analysis/{analysis_id}/clusters/{cluster_id}",
             "interface": "/interface"
         }
     }
 
 
+# Réponses /analyze sérialisées, par (chaîne, token, watermark des données, paramètres, fields)
+response_cache = ResponseCache()
+# Résultats complets par analysis_id: reprojection sans recalcul + endpoints de suivi
+analysis_store = create_cache(
+    sqlite_path=Config.RESULT_STORE_SQLITE_PATH,
+    max_bytes=Config.RESULT_STORE_MAX_BYTES,
+    ttl_seconds=Config.RESULT_STORE_TTL_SECONDS,
+    stale_seconds=0,
+)
+# Dernier layout de chaque token: point de départ (stable) de la ré-analyse
+layout_store = create_cache(
+    sqlite_path=Config.LAYOUT_STORE_SQLITE_PATH,
+    max_bytes=Config.LAYOUT_STORE_MAX_BYTES,
+    ttl_seconds=Config.LAYOUT_STORE_TTL_SECONDS,
+    stale_seconds=0,
+)
+# Admission /analyze: file bornée par priorité, limite par client, refus rapide en surcharge
+admission = AdmissionController()
+
+
+def _admission_priority(request: TokenAnalysisRequest, settings: AnalysisSettings) -> int:
+    """Données en cache d'abord, puis petites requêtes, puis le reste"""
+    if DataFetcher.is_cached(request.chain, request.token_address, settings.max_transactions):
+        return PRIORITY_CACHED
+    if settings.max_transactions <= Config.ADMISSION_SMALL_TRANSACTIONS:
+        return PRIORITY_SMALL
+    return PRIORITY_DEFAULT
+
+
 @app.post("/analyze", response_model=TokenAnalysisResponse)
-async def analyze_token(request: TokenAnalysisRequest):
+async def analyze_token(
+    request: TokenAnalysisRequest,
+    http_request: Request,
+    if_none_match: Optional[str] = Header(None),
+    x_client_id: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+):
     """
     Endpoint principal : analyse un token et retourne le graphe + flags suspects
     CONTRAINTE CRITIQUE : < 30 secondes
+    Réponse mise en cache (sauf save_to_graph_db) avec un ETag: If-None-Match -> 304
+    En surcharge: 429 (limite par client) ou 503 (file pleine / attente > SLA) avec Retry-After;
+    les 304 et réponses déjà en cache (données fraîches) sont servis avant l'admission
+    Accept: application/msgpack -> corps MessagePack (si msgpack est installé)
     """
-    start_time = time.time()
-    
-    # Override config avec valeurs de la requête si fournies
-    max_transactions = request.max_transactions if request.max_transactions else Config.MAX_TRANSACTIONS_TO_FETCH
-    timeout_seconds = request.timeout_seconds if request.timeout_seconds is not None else Config.TIMEOUT_SECONDS
-    timeout_enabled = request.timeout_seconds is not None
-    
+    settings = _request_settings(request)
+    fields, graph_format, graph_detail = _render_options(request)
+    media_type = negotiate_media_type(accept)
+    # 304 / réponse déjà en cache: servie sans passer par l'admission (rien à protéger)
+    cached = await _cached_response(
+        request, settings, fields, if_none_match, graph_format, graph_detail, media_type, accept_encoding
+    )
+    if cached is not None:
+        return cached
+    client_id = _client_id(http_request, x_client_id)
     try:
-        # Vérification timeout avant de commencer (seulement si activé)
-        if timeout_enabled and time.time() - start_time > timeout_seconds:
-            raise HTTPException(
-                status_code=408,
-                detail=f"Timeout avant même de commencer l'analyse"
-            )
-        
-        # 1. FETCH DATA (optimisé : seulement top holders + transactions clés)
-        print(f"[{time.time() - start_time:.2f}s] 📥 Fetching data for {request.token_address}")
-        print(f"  🔧 API Provider: {request.api_provider}")
-        print(f"  📊 Max Transactions: {max_transactions}")
-        print(f"  ⏱️ Timeout: {'Enabled (' + str(timeout_seconds) + 's)' if timeout_enabled else 'Disabled'}")
-        
-        # Override temporairement la config pour cette requête
-        original_max = Config.MAX_TRANSACTIONS_TO_FETCH
-        Config.MAX_TRANSACTIONS_TO_FETCH = max_transactions
-        
-        fetcher = DataFetcher(chain=request.chain, preferred_provider=request.api_provider)
-        token_data = await fetcher.fetch_token_data(request.token_address)
-        
-        # Restaurer la config originale
-        Config.MAX_TRANSACTIONS_TO_FETCH = original_max
-        
-        # Vérification timeout après fetch (seulement si activé)
-        elapsed = time.time() - start_time
-        if timeout_enabled and elapsed > timeout_seconds:
-            print(f"  ⚠️ WARNING: Fetch took {elapsed:.2f}s (exceeds {timeout_seconds}s timeout)")
-            print(f"  💡 Suggestion: Reduce max_transactions or use faster API (Alchemy)")
-            raise HTTPException(
-                status_code=408,
-                detail=f"Timeout après fetch ({elapsed:.2f}s > {timeout_seconds}s). "
-                       f"BitQuery peut être lent. Essayez: 1) Réduire max_transactions, "
-                       f"2) Utiliser Alchemy API, ou 3) Désactiver le timeout dans l'interface."
+        async with admission.admit(client_id, _admission_priority(request, settings)):
+            return await _analyze_with_cache(
+                request, settings, fields, if_none_match,
+                graph_format=graph_format,
+                graph_detail=graph_detail,
+                media_type=media_type,
+                accept_encoding=accept_encoding,
             )
-        
-        # 2. BUILD GRAPH (rapide : seulement top holders)
-        print(f"[{time.time() - start_time:.2f}s] 🕸️ Building graph")
-        builder = GraphBuilder()
-        graph = builder.build_graph(token_data)
-        
-        # 3. ANALYZE (algorithms optimisés)
-        print(f"[{time.time() - start_time:.2f}s] 🧠 Running analysis")
-        analyzer = GraphAnalyzer(graph)
-        analysis_results = analyzer.analyze(community_mode=request.community_mode or "auto")
-        analysis_results.setdefault("metrics", {})
-        analysis_results["metrics"]["chain"] = request.chain or "ethereum"
-        
-        # 3.5. WASH TRADE DETECTION
-        print(f"[{time.time() - start_time:.2f}s] 🔍 Detecting wash trades")
-        wash_detector = WashTradeDetector(graph)
-        wash_trade_pairs = wash_detector.detect()
-        analysis_results["wash_trade_pairs"] = wash_trade_pairs
-        
-        # 3.6. MIXER FLAGS
-        print(f"[{time.time() - start_time:.2f}s] 🚨 Checking mixer flags")
-        holder_addresses = [h.get("address", "") for h in token_data.get("top_holders", [])]
-        mixer_flags = check_mixer_flags(holder_addresses)
-        analysis_results["mixer_flags"] = mixer_flags
-        
-        # 4. RISK SCORING
-        print(f"[{time.time() - start_time:.2f}s] ⚠️ Calculating risk scores")
-        scorer = RiskScorer()
-        risk_score = scorer.calculate_risk_score(
-            analysis_results, 
-            token_data
+    except AdmissionRejected as e:
+        raise _admission_rejected(e, request, client_id)
+
+
+def _render_options(request: BaseModel) -> Tuple[Optional[List[str]], str, str]:
+    """fields, graph_format et graph_detail validés d'une requête d'analyse (invalide -> 400)"""
+    try:
+        return (
+            parse_fields(request.fields),
+            validate_graph_format(request.graph_format),
+            validate_graph_detail(request.graph_detail),
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _client_id(http_request: Request, x_client_id: Optional[str]) -> str:
+    """Client pour la limite d'admission: X-Client-Id, sinon l'IP"""
+    return x_client_id or (http_request.client.host if http_request.client else "anonymous")
+
+
+def _admission_rejected(e: AdmissionRejected, request: TokenAnalysisRequest, client_id: str) -> HTTPException:
+    print(f"  🚦 Rejected ({e.status_code}) {request.token_address} for {client_id}: {e.detail}")
+    return HTTPException(
+        status_code=e.status_code,
+        detail=e.detail,
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+async def _run_admitted(request: TokenAnalysisRequest, client_id: str,
+                        progress: Optional[AnalysisProgress] = None) -> Dict:
+    """
+    run_analysis sous le contrôle d'admission de /analyze (partagé par /analyze/batch et /analyze/stream)
+    Refus: HTTPException 429/503 avec Retry-After
+    """
+    settings = _request_settings(request)
+    try:
+        async with admission.admit(client_id, _admission_priority(request, settings)):
+            return await run_analysis(request, progress=progress)
+    except AdmissionRejected as e:
+        raise _admission_rejected(e, request, client_id)
+
+
+async def _analyze_with_cache(
+    request: TokenAnalysisRequest,
+    settings: AnalysisSettings,
+    fields: Optional[List[str]],
+    if_none_match: Optional[str],
+    graph_format: str = "objects",
+    graph_detail: str = "full",
+    media_type: str = "application/json",
+    accept_encoding: Optional[str] = None
+) -> Response:
+    """
+    Pipeline /analyze avec cache de réponses sérialisées et ETag.
+    Le corps est compressé selon Accept-Encoding (br/gzip); la version compressée
+    est gardée avec l'entrée de cache.
+    Le résultat complet est conservé par analysis_id: une autre projection (fields, graph_format,
+    graph_detail, media_type) des mêmes données ne relance pas l'analyse.
+    """
+    start_time = time.time()
+    progress = AnalysisProgress()
+    
+    with _analysis_errors(start_time):
+        token_data = await _fetch_for_analysis(request, settings, progress, start_time)
+        chain = request.chain or "ethereum"
+        analysis_id, key = _response_keys(request, settings, token_data, fields, graph_format, graph_detail, media_type)
+        etag = etag_for(key)
+        cacheable = not request.save_to_graph_db
         
-        # 5. FORMAT FOR FRONTEND (React Force Graph format)
-        print(f"[{time.time() - start_time:.2f}s] 📊 Formatting for frontend")
-        graph_data = builder.format_for_react_force_graph(graph, analysis_results)
-        
-        # 6. OPTIONAL: Save to Graph Database (Neo4j/Memgraph)
-        storage_result = None
-        if request.save_to_graph_db:
-            print(f"[{time.time() - start_time:.2f}s] 💾 Saving to {request.graph_db_type}...")
-            try:
-                storage = GraphStorage(storage_type=request.graph_db_type)
-                storage_result = storage.save_graph(graph, request.token_address, analysis_results)
-                if storage_result.get("success"):
-                    print(f"  ✅ Graph saved: {storage_result.get('total_wallets', 0)} wallets, {storage_result.get('total_transfers', 0)} transfers")
-                else:
-                    print(f"  ⚠️ Storage failed: {storage_result.get('error', 'Unknown error')}")
-            except Exception as e:
-                print(f"  ⚠️ Storage error: {e}")
-                storage_result = {"success": False, "error": str(e)}
-        
-        elapsed_time = time.time() - start_time
-        
-        # VÉRIFICATION CONTRAINTE 30s (désactivée)
-        if elapsed_time > 30:
-            print(f"[{elapsed_time:.2f}s] ⏱️ Warning: analysis exceeded 30s but returning results")
-        
-        print(f"[{elapsed_time:.2f}s] ✅ Analysis complete - Risk Score: {risk_score:.2f}")
+        if cacheable and etag_matches(if_none_match, etag):
+            print(f"[{time.time() - start_time:.2f}s] 🧠 Not modified (ETag)")
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # In analyze_token(): after computing risk_score and before returning
-        return TokenAnalysisResponse(
-            token_address=request.token_address,
-            analysis_time_seconds=round(elapsed_time, 2),
-            risk_score=round(risk_score, 3),
-            top_holders=analysis_results["top_holders"],
-            suspicious_clusters=analysis_results["suspicious_clusters"],
-            mixer_flags=analysis_results["mixer_flags"],
-            wash_trade_pairs=analysis_results["wash_trade_pairs"],
-            graph_data=graph_data,
-            metrics=analysis_results["metrics"],
-            storage_result=storage_result
+        entry = response_cache.get(key) if cacheable else None
+        cache_status = "HIT"
+        if entry is None:
+            cache_status = "MISS"
+            result = None
+            if cacheable:
+                result, _ = await asyncio.to_thread(analysis_store.get, analysis_id)
+            if result is None:
+                result = await _finish_analysis(request, settings, token_data, progress, start_time)
+                if cacheable:
+                    result["analysis_id"] = analysis_id
+                    await asyncio.to_thread(analysis_store.set, analysis_id, result)
+                    await asyncio.to_thread(
+                        analysis_store.set, latest_analysis_key(chain, request.token_address), analysis_id
+                    )
+                    _schedule_layout(analysis_id)
+            else:
+                cache_status = "PROJECTED"
+                print(f"[{time.time() - start_time:.2f}s] 🧠 Stored analysis reused for new projection")
+            body = await _off_loop(
+                _graph_size(result), _render_body, result, media_type, fields, graph_format, graph_detail
+            )
+            entry = response_cache.put(key, body) if cacheable else CachedResponse(body, etag)
+        else:
+            print(f"[{time.time() - start_time:.2f}s] 🧠 Cache hit: analysis response")
+    
+    return await _entry_response(entry, cache_status, media_type, accept_encoding, cacheable)
+
+
+def _response_keys(
+    request: TokenAnalysisRequest,
+    settings: AnalysisSettings,
+    token_data: Dict,
+    fields: Optional[List[str]],
+    graph_format: str,
+    graph_detail: str,
+    media_type: str
+) -> Tuple[str, str]:
+    """(analysis_id, clé du cache de réponses) pour ces données et cette variante de réponse"""
+    chain = request.chain or "ethereum"
+    watermark = data_watermark(token_data)
+    params = analysis_params(settings, request.community_mode)
+    analysis_id = response_cache_key(chain, request.token_address, watermark, params)
+    # Variante de la réponse (projection, format du graphe, encodage) -> clé de cache distincte
+    variant = {}
+    if fields is not None:
+        variant["fields"] = fields
+    if graph_format != "objects":
+        variant["graph_format"] = graph_format
+    if graph_detail != "full":
+        variant["graph_detail"] = graph_detail
+    if media_type != "application/json":
+        variant["media_type"] = media_type
+    key = analysis_id if not variant else response_cache_key(
+        chain, request.token_address, watermark, {**params, **variant}
+    )
+    return analysis_id, key
+
+
+async def _entry_response(entry: CachedResponse, cache_status: str, media_type: str,
+                          accept_encoding: Optional[str], cacheable: bool = True) -> Response:
+    body, encoding = await encode_for_client(entry.body, accept_encoding, entry.variants)
+    headers = {"X-Cache": cache_status, "Vary": "Accept, Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    if cacheable:
+        headers["ETag"] = entry.etag
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+async def _cached_response(
+    request: TokenAnalysisRequest,
+    settings: AnalysisSettings,
+    fields: Optional[List[str]],
+    if_none_match: Optional[str],
+    graph_format: str,
+    graph_detail: str,
+    media_type: str,
+    accept_encoding: Optional[str]
+) -> Optional[Response]:
+    """
+    304 ou réponse du cache si les données du token sont fraîches dans le cache DataFetcher
+    et la réponse déjà sérialisée (sans fetch, sans analyse); sinon None
+    """
+    if request.save_to_graph_db:
+        return None
+    token_data = await DataFetcher.fresh_cached_data(
+        request.chain, request.token_address, settings.max_transactions
+    )
+    if token_data is None:
+        return None
+    _, key = _response_keys(request, settings, token_data, fields, graph_format, graph_detail, media_type)
+    etag = etag_for(key)
+    if etag_matches(if_none_match, etag):
+        print("🧠 Not modified (ETag), before admission")
+        return Response(status_code=304, headers={"ETag": etag})
+    entry = response_cache.get(key)
+    if entry is None:
+        return None
+    print("🧠 Cache hit: analysis response, before admission")
+    return await _entry_response(entry, "HIT", media_type, accept_encoding)
+
+
+# Pool de threads pour les étapes CPU (graphe, Leiden, PageRank...): la boucle asyncio
+# reste libre pour les fetchs des autres requêtes (batch, requêtes concurrentes)
+_analysis_executor = ThreadPoolExecutor(max_workers=Config.ANALYSIS_WORKERS, thread_name_prefix="analysis")
+# Layouts (x/y) calculés un à la fois, hors requête, dans un process dédié: pas de GIL partagé
+# avec les requêtes, et igraph y utilise le générateur seedé de chaque appel (thread principal)
+_layout_executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+# Layout en cours par analysis_id (tâche de fond après /analyze, partagée avec les appels viewport/graphe)
+_layout_tasks: Dict[str, asyncio.Task] = {}
+
+
+async def _build_layout(analysis_id: str) -> Optional[Dict]:
+    """
+    Calcule le layout d'une analyse stockée (jusqu'à LAYOUT_MAX_NODES nœuds, départ: dernier layout
+    du token) et le réenregistre avec l'analyse. Retourne l'analyse (None si expirée)
+    """
+    result, _ = await asyncio.to_thread(analysis_store.get, analysis_id)
+    if result is None:
+        return None
+    graph_data = result.get("graph_data") or {}
+    nodes = graph_data.get("nodes") or []
+    if not 0 < len(nodes) <= Config.LAYOUT_MAX_NODES or positions_from_graph_data(graph_data):
+        return result
+    metrics = result.get("metrics") or {}
+    key = layout_key(metrics.get("chain") or "ethereum", result["token_address"])
+    previous, _ = await asyncio.to_thread(layout_store.get, key)
+    start = time.time()
+    try:
+        positions = await asyncio.get_running_loop().run_in_executor(
+            _layout_executor, layout_graph_data, graph_data, metrics.get("communities"), previous
         )
-        
+    except Exception as e:
+        print(f"  ⚠️ Layout error ({analysis_id}): {e}")
+        return result
+    apply_layout(graph_data, positions)
+    await asyncio.to_thread(analysis_store.set, analysis_id, result)
+    await asyncio.to_thread(layout_store.set, key, positions)
+    print(f"  🗺️ Layout computed: {len(nodes)} nodes{' (from previous layout)' if previous else ''} "
+          f"({time.time() - start:.2f}s)")
+    return result
+
+
+def _schedule_layout(analysis_id: str) -> asyncio.Task:
+    """Lance (une fois par analyse) le calcul du layout en tâche de fond"""
+    task = _layout_tasks.get(analysis_id)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.create_task(_build_layout(analysis_id))
+        _layout_tasks[analysis_id] = task
+        task.add_done_callback(lambda done: _layout_tasks.get(analysis_id) is done and _layout_tasks.pop(analysis_id))
+    return task
+
+
+async def _ensure_layout(analysis_id: str) -> Dict:
+    """Analyse stockée avec son layout: attend la tâche de fond, ou la lance si besoin"""
+    result = await asyncio.shield(_schedule_layout(analysis_id))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Analysis not found or expired, run /analyze again")
+    return result
+
+
+def _compute_analysis(request: TokenAnalysisRequest, token_data: Dict, start_time: float,
+                      progress: AnalysisProgress, settings: AnalysisSettings):
+    """Étapes CPU du pipeline (exécutées dans _analysis_executor)"""
+    # 2. BUILD GRAPH (rapide : seulement top holders)
+    progress.start_stage("build_graph")
+    print(f"[{time.time() - start_time:.2f}s] 🕸️ Building graph")
+    builder = GraphBuilder()
+    graph = builder.build_graph(token_data)
+    if progress.has_listeners():
+        # Graphe préliminaire (sans analyse) pour /analyze/stream: formaté seulement si quelqu'un écoute
+        progress.emit("graph", builder.format_for_react_force_graph(graph, {}))
+    
+    # 3. ANALYZE (algorithms optimisés)
+    progress.start_stage("analyze")
+    print(f"[{time.time() - start_time:.2f}s] 🧠 Running analysis")
+    analyzer = GraphAnalyzer(graph, summary=token_data.get("summary"), settings=settings)
+    analysis_results = analyzer.analyze(community_mode=request.community_mode or "auto", on_stage=progress.emit)
+    analysis_results.setdefault("metrics", {})
+    analysis_results["metrics"]["chain"] = request.chain or "ethereum"
+    
+    # 3.5. WASH TRADE DETECTION
+    progress.start_stage("wash_trades")
+    print(f"[{time.time() - start_time:.2f}s] 🔍 Detecting wash trades")
+    wash_detector = WashTradeDetector(graph, settings=settings)
+    wash_trade_pairs = wash_detector.detect()
+    analysis_results["wash_trade_pairs"] = wash_trade_pairs
+    progress.emit("wash_trades", wash_trade_pairs)
+    
+    # 3.6. MIXER FLAGS
+    progress.start_stage("mixer_flags")
+    print(f"[{time.time() - start_time:.2f}s] 🚨 Checking mixer flags")
+    holder_addresses = [h.get("address", "") for h in token_data.get("top_holders", [])]
+    mixer_flags = check_mixer_flags(holder_addresses, token_data.get("address_labels"))
+    analysis_results["mixer_flags"] = mixer_flags
+    progress.emit("mixer_flags", mixer_flags)
+    
+    # 4. RISK SCORING
+    progress.start_stage("risk_score")
+    print(f"[{time.time() - start_time:.2f}s] ⚠️ Calculating risk scores")
+    scorer = RiskScorer(settings=settings)
+    risk_score = scorer.calculate_risk_score(
+        analysis_results, 
+        token_data
+    )
+    progress.emit("risk_score", round(risk_score, 3))
+    analysis_results["risk_score"] = risk_score  # historique du store graphe embarqué
+    
+    # 5. FORMAT FOR FRONTEND (React Force Graph format)
+    progress.start_stage("format")
+    print(f"[{time.time() - start_time:.2f}s] 📊 Formatting for frontend")
+    graph_data = builder.format_for_react_force_graph(graph, analysis_results)
+    # (layout x/y: calculé hors requête, voir _ensure_layout)
+    
+    return graph, analysis_results, risk_score, graph_data
+
+
+def _request_settings(request: TokenAnalysisRequest) -> AnalysisSettings:
+    """Paramètres de cette requête (Config n'est jamais modifié: requêtes concurrentes isolées)"""
+    return AnalysisSettings.from_config(
+        max_transactions=request.max_transactions or None,
+        timeout_seconds=request.timeout_seconds,
+    )
+
+
+@contextmanager
+def _analysis_errors(start_time: float):
+    """Convertit les erreurs du pipeline en HTTPException (400 configuration, 500 sinon)"""
+    try:
+        yield
     except HTTPException:
         raise
     except ValueError as e:
@@ -241,6 +581,602 @@ async def analyze_token(request: TokenAnalysisRequest):
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
+async def _fetch_for_analysis(
+    request: TokenAnalysisRequest,
+    settings: AnalysisSettings,
+    progress: AnalysisProgress,
+    start_time: float
+) -> Dict:
+    """Étape 1 du pipeline: fetch des données (cache DataFetcher) + contrôle du timeout"""
+    max_transactions = settings.max_transactions
+    timeout_seconds = settings.timeout_seconds
+    timeout_enabled = timeout_seconds is not None
+    
+    # Vérification timeout avant de commencer (seulement si activé)
+    if timeout_enabled and time.time() - start_time > timeout_seconds:
+        raise HTTPException(
+            status_code=408,
+            detail=f"Timeout avant même de commencer l'analyse"
+        )
+    
+    # 1. FETCH DATA (optimisé : seulement top holders + transactions clés)
+    progress.start_stage("fetch")
+    print(f"[{time.time() - start_time:.2f}s] 📥 Fetching data for {request.token_address}")
+    print(f"  🔧 API Provider: {request.api_provider}")
+    print(f"  📊 Max Transactions: {max_transactions}")
+    print(f"  ⏱️ Timeout: {'Enabled (' + str(timeout_seconds) + 's)' if timeout_enabled else 'Disabled'}")
+    
+    fetcher = DataFetcher(
+        chain=request.chain,
+        preferred_provider=request.api_provider,
+        progress=progress,
+        settings=settings
+    )
+    token_data = await fetcher.fetch_token_data(request.token_address)
+    
+    # Résultats du fetch publiés ici seulement (fetch réel, cache ou fetch partagé): toujours dans cet ordre
+    progress.emit("metadata", token_data.get("metadata", {}))
+    progress.emit("top_holders", token_data.get("top_holders", []))
+    
+    # Vérification timeout après fetch (seulement si activé)
+    elapsed = time.time() - start_time
+    if timeout_enabled and elapsed > timeout_seconds:
+        print(f"  ⚠️ WARNING: Fetch took {elapsed:.2f}s (exceeds {timeout_seconds}s timeout)")
+        print(f"  💡 Suggestion: Reduce max_transactions or use faster API (Alchemy)")
+        raise HTTPException(
+            status_code=408,
+            detail=f"Timeout après fetch ({elapsed:.2f}s > {timeout_seconds}s). "
+                   f"BitQuery peut être lent. Essayez: 1) Réduire max_transactions, "
+                   f"2) Utiliser Alchemy API, ou 3) Désactiver le timeout dans l'interface."
+        )
+    return token_data
+
+
+async def _finish_analysis(
+    request: TokenAnalysisRequest,
+    settings: AnalysisSettings,
+    token_data: Dict,
+    progress: AnalysisProgress,
+    start_time: float
+) -> Dict:
+    """Étapes 2-6 du pipeline: graphe, analyses, score, format, stockage optionnel"""
+    # 2-5. GRAPHE, ANALYSES, SCORE, FORMAT (CPU, hors boucle asyncio)
+    loop = asyncio.get_running_loop()
+    graph, analysis_results, risk_score, graph_data = await loop.run_in_executor(
+        _analysis_executor, _compute_analysis, request, token_data, start_time, progress, settings
+    )
+    
+    # 6. OPTIONAL: Save to Graph Database (Neo4j/Memgraph) - en tâche de fond, suivi via /persistence/{job_id}
+    storage_result = None
+    if request.save_to_graph_db:
+        progress.start_stage("storage")
+        try:
+            job = persistence_queue.submit(graph, request.token_address, analysis_results, request.graph_db_type)
+            print(f"[{time.time() - start_time:.2f}s] 💾 Saving to {request.graph_db_type} in background (job {job.id})")
+            storage_result = {
+                "success": None,  # connu à la fin du job
+                "status": job.status,
+                "job_id": job.id,
+                "status_url": f"/persistence/{job.id}",
+                "storage_type": request.graph_db_type,
+            }
+        except PersistenceRejected as e:
+            print(f"  ⚠️ Storage skipped: {e}")
+            storage_result = {"success": False, "status": "rejected", "error": str(e)}
+    # Store embarqué alimenté à chaque analyse (quelques ms, hors requête)
+    if Config.GRAPH_STORE_AUTO_SAVE and not (request.save_to_graph_db and request.graph_db_type == "sqlite"):
+        try:
+            persistence_queue.submit(graph, request.token_address, analysis_results, "sqlite")
+        except PersistenceRejected as e:
+            print(f"  ⚠️ Graph store auto-save skipped: {e}")
+    
+    progress.finish()
+    elapsed_time = time.time() - start_time
+    
+    # VÉRIFICATION CONTRAINTE 30s (désactivée)
+    if elapsed_time > 30:
+        print(f"[{elapsed_time:.2f}s] ⏱️ Warning: analysis exceeded 30s but returning results")
+    
+    print(f"[{elapsed_time:.2f}s] ✅ Analysis complete - Risk Score: {risk_score:.2f}")
+    
+    # Dict au format TokenAnalysisResponse, sans revalidation pydantic des gros blobs
+    # (graph_data, metrics): encodé directement par src.serialization
+    return {
+        "token_address": request.token_address,
+        "analysis_time_seconds": round(elapsed_time, 2),
+        "risk_score": round(risk_score, 3),
+        "top_holders": analysis_results["top_holders"],
+        "suspicious_clusters": analysis_results["suspicious_clusters"],
+        "mixer_flags": analysis_results["mixer_flags"],
+        "wash_trade_pairs": analysis_results["wash_trade_pairs"],
+        "graph_data": graph_data,
+        "metrics": analysis_results["metrics"],
+        "storage_result": storage_result,
+        "analysis_id": None,
+    }
+
+
+async def run_analysis(
+    request: TokenAnalysisRequest,
+    progress: Optional[AnalysisProgress] = None
+) -> Dict:
+    """
+    Pipeline complet : fetch -> graphe -> analyses -> score -> format
+    Retourne un dict au format TokenAnalysisResponse
+    Partagé par /analyze/batch, /analyze/stream et /jobs (/analyze ajoute le cache de réponses)
+    progress: suivi d'avancement (étape courante, pages, durées par étape)
+    """
+    start_time = time.time()
+    if progress is None:
+        progress = AnalysisProgress()
+    settings = _request_settings(request)
+    
+    with _analysis_errors(start_time):
+        token_data = await _fetch_for_analysis(request, settings, progress, start_time)
+        return await _finish_analysis(request, settings, token_data, progress, start_time)
+
+
+class BatchTokenItem(BaseModel):
+    token_address: str
+    chain: Optional[str] = "ethereum"
+
+
+class BatchAnalysisRequest(BaseModel):
+    tokens: List[BatchTokenItem]
+    api_provider: Optional[str] = "auto"
+    max_transactions: Optional[int] = None
+    timeout_seconds: Optional[int] = None
+    community_mode: Optional[str] = "auto"
+    concurrency: Optional[int] = None  # Override BATCH_CONCURRENCY
+    # Rendu de chaque résultat, comme /analyze
+    fields: Optional[List[str]] = None
+    graph_format: Optional[str] = "objects"
+    graph_detail: Optional[str] = "full"
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(
+    request: BatchAnalysisRequest,
+    http_request: Request,
+    x_client_id: Optional[str] = Header(None)
+):
+    """
+    Analyse une liste de tokens avec une concurrence bornée.
+    Les résultats sont streamés en NDJSON (une ligne par token, dans l'ordre de complétion).
+    Pool HTTP, rate limiters et caches sont partagés par toutes les analyses du batch.
+    Chaque analyse passe par l'admission de /analyze (concurrence plafonnée à ADMISSION_PER_CLIENT);
+    un refus donne une ligne "error" avec status_code 429/503 et retry_after.
+    fields / graph_format / graph_detail: appliqués à chaque résultat (comme /analyze)
+    """
+    fields, graph_format, graph_detail = _render_options(request)
+    if not request.tokens:
+        raise HTTPException(status_code=400, detail="tokens must not be empty")
+    if len(request.tokens) > Config.BATCH_MAX_TOKENS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many tokens ({len(request.tokens)} > {Config.BATCH_MAX_TOKENS})"
+        )
+    
+    client_id = _client_id(http_request, x_client_id)
+    # Au-delà de la limite par client, les analyses du batch seraient refusées (429) par l'admission
+    concurrency = min(max(1, request.concurrency or Config.BATCH_CONCURRENCY), admission.per_client)
+    semaphore = asyncio.Semaphore(concurrency)
+    print(f"📦 Batch analysis: {len(request.tokens)} tokens (concurrency {concurrency})")
+    
+    async def analyze_one(index: int, item: BatchTokenItem) -> Dict:
+        async with semaphore:
+            single = TokenAnalysisRequest(
+                token_address=item.token_address,
+                chain=item.chain,
+                api_provider=request.api_provider,
+                max_transactions=request.max_transactions,
+                timeout_seconds=request.timeout_seconds,
+                community_mode=request.community_mode,
+            )
+            line = {"index": index, "token_address": item.token_address, "chain": item.chain}
+            try:
+                result = await _run_admitted(single, client_id)
+                result = await _off_loop(
+                    _graph_size(result), _render_result, result, fields, graph_format, graph_detail
+                )
+                line.update({"status": "ok", "result": result})
+            except HTTPException as e:
+                line.update({"status": "error", "status_code": e.status_code, "detail": e.detail})
+                if e.headers and "Retry-After" in e.headers:
+                    line["retry_after"] = int(e.headers["Retry-After"])
+            return line
+    
+    async def stream_results():
+        tasks = [asyncio.create_task(analyze_one(i, item)) for i, item in enumerate(request.tokens)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = await next_done
+                yield dumps(line) + b"\n"
+        finally:
+            # Client déconnecté: annuler les analyses restantes
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+def _render_result(
+    result: Dict,
+    fields: Optional[List[str]],
+    graph_format: str = "objects",
+    graph_detail: str = "full",
+    expand: Optional[List[str]] = None
+) -> Dict:
+    """Résumé du graphe, puis format du graphe, puis projection (result n'est pas modifié)"""
+    result = apply_level_of_detail(result, graph_detail, expand)
+    return project_response(format_graph(result, graph_format), fields)
+
+
+def _render_body(
+    result: Dict,
+    media_type: str,
+    fields: Optional[List[str]],
+    graph_format: str = "objects",
+    graph_detail: str = "full",
+) -> bytes:
+    """_render_result puis encodage (JSON/MessagePack), en une étape pour _off_loop"""
+    return encode_body(_render_result(result, fields, graph_format, graph_detail), media_type)
+
+
+def _graph_size(result: Dict) -> int:
+    """Nœuds + liens de graph_data: coût du rendu et de l'encodage d'une réponse"""
+    graph_data = result.get("graph_data") or {}
+    return len(graph_data.get("nodes") or []) + len(graph_data.get("links") or [])
+
+
+async def _off_loop(size: int, fn, *args):
+    """fn(*args), dans un thread si size >= RENDER_THREAD_MIN_ITEMS (petits graphes: sur la boucle)"""
+    if size >= Config.RENDER_THREAD_MIN_ITEMS:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+# ===== Sections lourdes d'une analyse (/analysis/{analysis_id}) =====
+async def _stored_analysis(analysis_id: str) -> Dict:
+    result, _ = await asyncio.to_thread(analysis_store.get, analysis_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Analysis not found or expired, run /analyze again")
+    return result
+
+
+@app.get("/analysis/{analysis_id}")
+async def get_analysis(
+    analysis_id: str,
+    fields: Optional[str] = None,
+    graph_format: Optional[str] = None,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Résultat d'une analyse /analyze, projeté selon fields (liste séparée par des virgules)
+    graph_format: "objects" | "compact"; Accept: application/msgpack -> MessagePack
+    """
+    try:
+        parsed = parse_fields(fields)
+        graph_format = validate_graph_format(graph_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = await _stored_analysis(analysis_id)
+    media_type = negotiate_media_type(accept)
+    body = await _off_loop(_graph_size(result), _render_body, result, media_type, parsed, graph_format)
+    return Response(content=body, media_type=media_type, headers={"Vary": "Accept"})
+
+
+@app.get("/analysis/{analysis_id}/graph")
+async def get_analysis_graph(
+    analysis_id: str,
+    detail: Optional[str] = "summary",
+    expand: Optional[str] = None,
+    graph_format: Optional[str] = None,
+    accept: Optional[str] = Header(None)
+):
+    """
+    graph_data d'une analyse, résumé par défaut (supernœuds = communautés).
+    expand: communautés à déplier, ex: expand=3,7 (ou "community:3"): leurs wallets
+    deviennent explicites dans le graphe résumé renvoyé.
+    Attend le layout (x/y) s'il est encore en cours de calcul
+    """
+    try:
+        graph_detail = validate_graph_detail(detail)
+        graph_format = validate_graph_format(graph_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = await _ensure_layout(analysis_id)
+    media_type = negotiate_media_type(accept)
+    body = await _off_loop(
+        _graph_size(result), _render_graph_body,
+        analysis_id, result, media_type, graph_format, graph_detail, parse_expand(expand)
+    )
+    return Response(content=body, media_type=media_type, headers={"Vary": "Accept"})
+
+
+def _render_graph_body(analysis_id: str, result: Dict, media_type: str, graph_format: str,
+                       graph_detail: str, expand: Optional[List[str]]) -> bytes:
+    result = _render_result(result, ["graph_data"], graph_format, graph_detail, expand)
+    return encode_body({"analysis_id": analysis_id, "graph_data": result.get("graph_data")}, media_type)
+
+
+# Index spatiaux des layouts (par analysis_id), construits à la première requête viewport
+viewport_indexes = ViewportIndexCache()
+
+
+@app.get("/graph/{token_address}/viewport")
+async def get_graph_viewport(
+    token_address: str,
+    bbox: str,
+    zoom: float = 1.0,
+    chain: str = "ethereum",
+    analysis_id: Optional[str] = None,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Nœuds du layout précalculé dans le viewport (bbox=min_x,min_y,max_x,max_y en coordonnées
+    du layout, zoom = pixels par unité), plafonnés par cellule d'écran, + liens entre eux
+    + échantillon clairsemé hors viewport (context). Dernière analyse /analyze du token par défaut.
+    """
+    try:
+        box = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not math.isfinite(zoom) or zoom <= 0:
+        raise HTTPException(status_code=400, detail="zoom must be a finite number > 0")
+    if analysis_id is None:
+        analysis_id, _ = await asyncio.to_thread(analysis_store.get, latest_analysis_key(chain, token_address))
+        if analysis_id is None:
+            raise HTTPException(status_code=404, detail="No stored analysis for this token, run /analyze first")
+    
+    index = viewport_indexes.get(analysis_id)
+    if index is None:
+        graph_data = (await _ensure_layout(analysis_id)).get("graph_data") or {}
+        index = await asyncio.to_thread(ViewportIndex, graph_data)
+        if not index.nodes:
+            raise HTTPException(status_code=409, detail="This analysis has no precomputed layout")
+        viewport_indexes.put(analysis_id, index)
+    
+    body = {"analysis_id": analysis_id, "bbox": list(box), "zoom": zoom, **index.viewport(box, zoom)}
+    media_type = negotiate_media_type(accept)
+    size = len(body["nodes"]) + len(body["context"]) + len(body["links"])
+    return Response(
+        content=await _off_loop(size, encode_body, body, media_type), media_type=media_type, headers={"Vary": "Accept"}
+    )
+
+
+@app.get("/analysis/{analysis_id}/pagerank")
+async def get_analysis_pagerank(analysis_id: str, limit: Optional[int] = None, offset: int = 0):
+    """PageRank de chaque wallet, trié par score décroissant (paginé)"""
+    result = await _stored_analysis(analysis_id)
+    pagerank = (result.get("metrics") or {}).get("pagerank") or {}
+    ranked = sorted(pagerank.items(), key=lambda item: item[1], reverse=True)
+    page = ranked[offset:offset + limit if limit is not None else None]
+    return {
+        "analysis_id": analysis_id,
+        "total": len(ranked),
+        "offset": offset,
+        "pagerank": [{"address": address, "pagerank": score} for address, score in page],
+    }
+
+
+@app.get("/analysis/{analysis_id}/communities")
+async def get_analysis_communities(analysis_id: str):
+    """Mapping complet communauté -> wallets"""
+    result = await _stored_analysis(analysis_id)
+    metrics = result.get("metrics") or {}
+    return {
+        "analysis_id": analysis_id,
+        "community_algorithm": metrics.get("community_algorithm"),
+        "communities": metrics.get("communities") or {},
+    }
+
+
+@app.get("/analysis/{analysis_id}/clusters/{cluster_id}")
+async def get_analysis_cluster(analysis_id: str, cluster_id: int):
+    """Cluster suspect avec la liste de ses wallets"""
+    result = await _stored_analysis(analysis_id)
+    for cluster in result.get("suspicious_clusters") or []:
+        if cluster.get("cluster_id") == cluster_id:
+            return cluster
+    raise HTTPException(status_code=404, detail=f"Cluster {cluster_id} not found in this analysis")
+
+
+def _sse_event(event: Dict) -> bytes:
+    """Formate un événement Server-Sent Events"""
+    return b"event: " + event["stage"].encode() + b"\ndata: " + dumps(event) + b"\n\n"
+
+
+@app.post("/analyze/stream")
+async def analyze_stream(
+    request: TokenAnalysisRequest,
+    http_request: Request,
+    x_client_id: Optional[str] = Header(None)
+):
+    """
+    Variante progressive de /analyze (Server-Sent Events).
+    Chaque étape est publiée dès qu'elle est prête, avec sa durée:
+    metadata -> top_holders -> graph (squelette) -> pagerank -> clusters
+    -> wash_trades -> mixer_flags -> risk_score -> result (réponse complète de /analyze)
+    Même admission que /analyze; en cas d'échec ou de refus: événement "error"
+    {status_code, detail} (+ retry_after si refus 429/503).
+    fields / graph_format / graph_detail: appliqués à l'événement "result" (comme /analyze)
+    """
+    fields, graph_format, graph_detail = _render_options(request)
+    client_id = _client_id(http_request, x_client_id)
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    progress = AnalysisProgress()
+    # Les étapes CPU publient depuis le pool de threads: remise dans la boucle
+    progress.subscribe(lambda event: loop.call_soon_threadsafe(queue.put_nowait, event))
+    
+    async def run():
+        try:
+            result = await _run_admitted(request, client_id, progress=progress)
+            progress.emit("result", await _off_loop(
+                _graph_size(result), _render_result, result, fields, graph_format, graph_detail
+            ))
+        except HTTPException as e:
+            error = {"status_code": e.status_code, "detail": e.detail}
+            if e.headers and "Retry-After" in e.headers:
+                error["retry_after"] = int(e.headers["Retry-After"])
+            progress.emit("error", error)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+    
+    async def stream_events():
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield _sse_event(event)
+        finally:
+            # Client déconnecté: annuler l'analyse
+            task.cancel()
+    
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ===== Jobs asynchrones (/jobs) =====
+# CACHE_BACKEND=sqlite: état des jobs partagé entre workers (sinon par process)
+job_manager = JobManager(store=create_cache(
+    sqlite_path=Config.JOB_STORE_SQLITE_PATH,
+    max_bytes=Config.JOB_STORE_MAX_BYTES,
+    ttl_seconds=Config.JOB_RESULT_TTL_SECONDS,
+    stale_seconds=0,
+) if Config.CACHE_BACKEND.lower() == "sqlite" else None)
+
+
+def _job_error(e: Exception) -> Dict:
+    """Convertit l'erreur d'un job en dict (même format que les erreurs HTTP de /analyze)"""
+    if isinstance(e, HTTPException):
+        return {"status_code": e.status_code, "detail": e.detail}
+    return {"status_code": 500, "detail": f"Internal error: {str(e)}"}
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: TokenAnalysisRequest):
+    """
+    Lance l'analyse en tâche de fond et retourne immédiatement un identifiant de job.
+    Suivre l'avancement (étape, pages, transferts décodés, durées) via GET /jobs/{job_id}.
+    Trop de jobs en attente (JOB_MAX_PENDING): 503 avec Retry-After
+    Hors admission /analyze: pas de SLA de réponse à protéger, et les jobs ont leur propre
+    file bornée (JOB_MAX_PENDING) et leur propre concurrence (JOB_MAX_CONCURRENCY)
+    fields / graph_format / graph_detail: appliqués au résultat du job (comme /analyze)
+    """
+    fields, graph_format, graph_detail = _render_options(request)
+    
+    async def runner(progress: AnalysisProgress) -> Dict:
+        result = await run_analysis(request, progress=progress)
+        return await _off_loop(_graph_size(result), _render_result, result, fields, graph_format, graph_detail)
+    
+    try:
+        job = job_manager.submit(request.model_dump(), runner, error_handler=_job_error)
+    except JobRejected as e:
+        print(f"  🚦 Job rejected ({e.status_code}) {request.token_address}: {e.detail}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    État d'un job: avancement, puis résultat (conservé JOB_RESULT_TTL_SECONDS).
+    Plusieurs workers uvicorn: état lu dans le store partagé si CACHE_BACKEND=sqlite (avancement
+    mis à jour à chaque changement de statut); sinon jobs par process, il faut un seul worker
+    ou un routage collant (sticky) vers le worker qui a reçu le POST /jobs
+    """
+    data = await job_manager.lookup(job_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return data
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Annule un job en cours (seulement sur le worker qui l'exécute)"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return {"job_id": job_id, "cancelled": job_manager.cancel(job_id)}
+
+
+# ===== Persistance graph DB en tâche de fond (save_to_graph_db) =====
+persistence_queue = PersistenceQueue()
+
+
+@app.get("/persistence/{job_id}")
+async def get_persistence_job(job_id: str):
+    """État d'une sauvegarde graph DB: queued | running | retrying | done | failed (+ résultat)"""
+    job = persistence_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Persistence job not found or expired")
+    return job.to_dict()
+
+
+# ===== Store graphe embarqué (SQLite, graph_db_type="sqlite") =====
+async def _store_query(method: str, *args, **kwargs):
+    """Requête sur le store embarqué hors boucle asyncio (ValueError -> 400)"""
+    store = get_graph_store()
+    try:
+        return await asyncio.to_thread(getattr(store, method), *args, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/store/wallets/{address}")
+async def store_wallet(address: str):
+    """Attributs d'un wallet et tokens dans lesquels il apparaît"""
+    wallet = await _store_query("wallet", address)
+    if wallet is None:
+        raise HTTPException(status_code=404, detail="Wallet not found in graph store")
+    return wallet
+
+
+@app.get("/store/wallets/{address}/neighbours")
+async def store_wallet_neighbours(address: str, direction: str = "both", token_address: Optional[str] = None,
+                                  limit: int = 100):
+    """Transferts entrants/sortants d'un wallet (tous tokens ou un seul)"""
+    return {"address": address.lower(),
+            "neighbours": await _store_query("neighbours", address, direction, token_address, limit)}
+
+
+@app.get("/store/tokens/{token_address}/top")
+async def store_top_wallets(token_address: str, chain: str = "ethereum", by: str = "pagerank", k: int = 20):
+    """Top-k wallets d'un token par PageRank ou balance"""
+    return {"token_address": token_address.lower(), "by": by,
+            "wallets": await _store_query("top_wallets", token_address, chain, by, k)}
+
+
+@app.get("/store/tokens/{token_address}/transfers")
+async def store_token_transfers(token_address: str, chain: str = "ethereum", min_value: float = 0,
+                                limit: int = 100):
+    """Plus gros transferts enregistrés pour un token"""
+    return {"token_address": token_address.lower(),
+            "transfers": await _store_query("token_transfers", token_address, chain, min_value, limit)}
+
+
+@app.get("/store/tokens/{token_address}/history")
+async def store_token_history(token_address: str, chain: str = "ethereum", limit: int = 50):
+    """Historique des analyses d'un token (score de risque, gini, tailles)"""
+    return {"token_address": token_address.lower(),
+            "analyses": await _store_query("analysis_history", token_address, chain, limit)}
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -251,7 +1187,12 @@ async def health_check():
             "max_holders": Config.MAX_HOLDERS,
             "max_transactions": Config.MAX_TRANSACTIONS_TO_FETCH,
             "timeout_seconds": Config.TIMEOUT_SECONDS
-        }
+        },
+        "data_cache": DataFetcher._cache.stats(),
+        "admission": admission.stats(),
+        "jobs": job_manager.stats(),
+        "persistence": persistence_queue.stats(),
+        "graph_db": graph_db_health()
     }
 
 # ===== Chatbot Graph Agent (/chat) - placé AVANT le lancement du serveur =====
@@ -259,6 +1200,16 @@ class ChatRequest(BaseModel):
     message: str
     execute: Optional[bool] = True  # Execute Cypher if present
     params: Optional[Dict] = None   # Optional Cypher parameters
+    session_id: Optional[str] = None  # Conversation to continue (new one if omitted)
+    stream: Optional[bool] = False  # Server-Sent Events: tokens, then Cypher rows as they arrive
+
+
+async def _chat_execution(cypher: str, params: Dict) -> Dict:
+    """Exécute le Cypher extrait (driver async, CHAT_QUERY_TIMEOUT_SECONDS, CHAT_MAX_ROWS)"""
+    try:
+        return {"query": cypher, "params": params, "rows": await run_cypher_async(cypher, params)}
+    except Exception as e:
+        return {"error": str(e), "query": cypher}
 
 
 @app.post("/chat")
@@ -266,30 +1217,92 @@ async def chat(request: ChatRequest):
     """Chat with an AI agent that can generate Cypher and query Neo4j.
     - If the model returns a Cypher block, optionally execute it and include results.
     - Returns: agent response, extracted cypher (if any), and query results (if executed).
+    - stream=true: Server-Sent Events "token" (LLM deltas), "cypher", "row" (one per result row),
+      then "done" (same fields as the JSON response, rows omitted) or "error".
+    The LLM call (agent.arun) and the query (async driver) never block the event loop;
+    they are bounded by CHAT_LLM_TIMEOUT_SECONDS and CHAT_QUERY_TIMEOUT_SECONDS.
     """
-    agent = get_chat_agent()
-    run = agent.run(request.message)
+    try:
+        agent = get_chat_agent()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Chat agent unavailable: {e}")
+    session_id = request.session_id or uuid.uuid4().hex
+    params = request.params or {}
+    execute = request.execute is None or request.execute
+
+    if request.stream:
+        return StreamingResponse(
+            _chat_events(agent, request.message, session_id, params, execute),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    # stream explicite: l'agent partagé garde sinon le mode du dernier appel
+    try:
+        run = await asyncio.wait_for(
+            agent.arun(request.message, session_id=session_id, stream=False),
+            Config.CHAT_LLM_TIMEOUT_SECONDS,
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"LLM call timed out after {Config.CHAT_LLM_TIMEOUT_SECONDS:.0f}s")
     content = str(getattr(run, "content", ""))
 
     cypher = extract_cypher(content)
     execution = None
-    if cypher and (request.execute is None or request.execute):
-        try:
-            execution = {
-                "query": cypher,
-                "params": request.params or {},
-                "rows": run_cypher(cypher, request.params or {}),
-            }
-        except Exception as e:
-            execution = {"error": str(e), "query": cypher}
+    if cypher and execute:
+        execution = await _chat_execution(cypher, params)
 
     return {
         "response": content,
         "cypher": cypher,
         "execution": execution,
+        "session_id": session_id,
     }
 
 
+async def _chat_events(agent, message: str, session_id: str, params: Dict, execute: bool):
+    """Flux SSE de /chat: deltas du LLM puis lignes du Cypher, au fil de l'eau"""
+    deadline = time.monotonic() + Config.CHAT_LLM_TIMEOUT_SECONDS
+    parts = []
+    try:
+        events = agent.arun(message, session_id=session_id, stream=True).__aiter__()
+        while True:
+            try:
+                event = await asyncio.wait_for(events.__anext__(), max(0.0, deadline - time.monotonic()))
+            except StopAsyncIteration:
+                break
+            if getattr(event, "event", None) == "RunContent" and getattr(event, "content", None):
+                delta = str(event.content)
+                parts.append(delta)
+                yield _sse_event({"stage": "token", "delta": delta})
+            elif getattr(event, "event", None) == "RunError":
+                raise RuntimeError(str(getattr(event, "content", "LLM error")))
+    except asyncio.TimeoutError:
+        yield _sse_event({"stage": "error", "status_code": 504,
+                          "detail": f"LLM call timed out after {Config.CHAT_LLM_TIMEOUT_SECONDS:.0f}s"})
+        return
+    except Exception as e:
+        yield _sse_event({"stage": "error", "status_code": 502, "detail": f"LLM error: {e}"})
+        return
+
+    content = "".join(parts)
+    cypher = extract_cypher(content)
+    execution = None
+    if cypher:
+        yield _sse_event({"stage": "cypher", "query": cypher})
+    if cypher and execute:
+        row_count = 0
+        try:
+            async for row in stream_cypher(cypher, params):
+                row_count += 1
+                yield _sse_event({"stage": "row", "row": row})
+            execution = {"query": cypher, "params": params, "row_count": row_count}
+        except Exception as e:
+            execution = {"error": str(e), "query": cypher, "row_count": row_count}
+    yield _sse_event({"stage": "done", "response": content, "cypher": cypher,
+                      "execution": execution, "session_id": session_id})
+
+
 def open_browser():
     """Ouvre le navigateur après un court délai pour laisser le serveur démarrer"""
     time.sleep(1.5)  # Attendre que le serveur soit prêt
@@ -313,38 +1326,3 @@ if __name__ == "__main__":
     # Lancer le serveur
     uvicorn.run(app, host=Config.HOST, port=Config.PORT)
 
-
-class ChatRequest(BaseModel):
-    message: str
-    execute: Optional[bool] = True  # Execute Cypher if present
-    params: Optional[Dict] = None   # Optional Cypher parameters
-
-
-@app.post("/chat")
-async def chat(request: ChatRequest):
-    """Chat with an AI agent that can generate Cypher and query Neo4j.
-    - If the model returns a Cypher block, optionally execute it and include results.
-    - Returns: agent response, extracted cypher (if any), and query results (if executed).
-    """
-    agent = get_chat_agent()
-    run = agent.run(request.message)
-    content = str(getattr(run, "content", ""))
-
-    cypher = extract_cypher(content)
-    execution = None
-    if cypher and (request.execute is None or request.execute):
-        try:
-            execution = {
-                "query": cypher,
-                "params": request.params or {},
-                "rows": run_cypher(cypher, request.params or {}),
-            }
-        except Exception as e:
-            execution = {"error": str(e), "query": cypher}
-
-    return {
-        "response": content,
-        "cypher": cypher,
-        "execution": execution,
-    }
-
@@ -0,0 +1,155 @@
+"""
+Admission Module
+Contrôle d'admission devant le pipeline /analyze: nombre d'analyses simultanées borné,
+file d'attente bornée et ordonnée par priorité, limite par client.
+Quand l'attente estimée dépasse le SLA, la requête est refusée tout de suite
+(429/503 + Retry-After) au lieu d'expirer avec toutes les autres.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from config import Config
+
+# Classes de priorité (plus petit = servi d'abord)
+PRIORITY_CACHED = 0  # données déjà en cache: pas de fetch, peu de CPU
+PRIORITY_SMALL = 1   # petite limite de transactions
+PRIORITY_DEFAULT = 2
+
+
+class AdmissionRejected(Exception):
+    """Requête refusée: status_code 429 (limite client) ou 503 (surcharge), retry_after en secondes"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    max_concurrent: analyses exécutées simultanément
+    max_queue: requêtes en attente au maximum
+    per_client: requêtes (en cours + en attente) par client
+    sla_seconds: attente estimée au-delà de laquelle la requête est refusée
+    Le temps de service est une moyenne glissante (EWMA) des analyses terminées.
+    """
+
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        per_client: Optional[int] = None,
+        sla_seconds: Optional[float] = None,
+        initial_service_seconds: Optional[float] = None,
+    ):
+        self.max_concurrent = max_concurrent or Config.ADMISSION_MAX_CONCURRENT
+        self.max_queue = max_queue if max_queue is not None else Config.ADMISSION_MAX_QUEUE
+        self.per_client = per_client or Config.ADMISSION_PER_CLIENT
+        self.sla_seconds = sla_seconds if sla_seconds is not None else Config.ADMISSION_SLA_SECONDS
+        self.service_seconds = (
+            initial_service_seconds if initial_service_seconds is not None
+            else Config.ADMISSION_INITIAL_SERVICE_SECONDS
+        )
+        self._active = 0
+        self._waiters = []  # heap de (priorité, ordre d'arrivée, future)
+        self._order = itertools.count()
+        self._clients: Dict[str, int] = {}
+        self.admitted = 0
+        self.rejected: Dict[str, int] = defaultdict(int)
+
+    def _queued(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def estimated_wait(self, priority: int) -> float:
+        """Attente estimée pour une nouvelle requête de cette priorité"""
+        ahead = sum(1 for p, _, future in self._waiters if p <= priority and not future.done())
+        if self._active < self.max_concurrent and ahead == 0:
+            return 0.0
+        return (ahead + 1) / self.max_concurrent * self.service_seconds
+
+    def _reject(self, reason: str, status_code: int, detail: str, retry_after: float):
+        self.rejected[reason] += 1
+        raise AdmissionRejected(status_code, detail, max(1, math.ceil(retry_after)))
+
+    def _release_slot(self):
+        # Le créneau passe directement au meilleur candidat en attente
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def _record(self, seconds: float):
+        self.service_seconds += self.EWMA_ALPHA * (seconds - self.service_seconds)
+
+    @asynccontextmanager
+    async def admit(self, client_id: str, priority: int = PRIORITY_DEFAULT):
+        """
+        Attend un créneau d'exécution (ou lève AdmissionRejected immédiatement).
+        Usage: async with controller.admit(client, priority): ...
+        """
+        if self._clients.get(client_id, 0) >= self.per_client:
+            self._reject(
+                "client_limit", 429,
+                f"Too many concurrent analyses for this client (limit {self.per_client})",
+                self.service_seconds,
+            )
+        wait = self.estimated_wait(priority)
+        if wait > 0:
+            if self._queued() >= self.max_queue:
+                self._reject("queue_full", 503, "Analysis queue is full, retry later", wait)
+            if wait > self.sla_seconds:
+                self._reject(
+                    "sla", 503,
+                    f"Estimated queue time {wait:.1f}s exceeds {self.sla_seconds:.0f}s, retry later",
+                    wait,
+                )
+
+        self._clients[client_id] = self._clients.get(client_id, 0) + 1
+        try:
+            if self._active < self.max_concurrent and not self._queued():
+                self._active += 1
+            else:
+                future = asyncio.get_running_loop().create_future()
+                heapq.heappush(self._waiters, (priority, next(self._order), future))
+                try:
+                    await future
+                except asyncio.CancelledError:
+                    # Créneau attribué juste avant l'annulation: le rendre
+                    if future.done() and not future.cancelled():
+                        self._release_slot()
+                    raise
+            self.admitted += 1
+            start = time.monotonic()
+            try:
+                yield
+            finally:
+                self._record(time.monotonic() - start)
+                self._release_slot()
+        finally:
+            remaining = self._clients.get(client_id, 0) - 1
+            if remaining > 0:
+                self._clients[client_id] = remaining
+            else:
+                self._clients.pop(client_id, None)
+
+    def stats(self) -> Dict:
+        return {
+            "active": self._active,
+            "queued": self._queued(),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "service_seconds": round(self.service_seconds, 3),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+        }
@@ -1,15 +1,22 @@
-from typing import Optional, Dict, List
+from typing import AsyncIterator, Optional, Dict, List
+import asyncio
 import re
+import threading
+import time
 
 from agno.agent import Agent
 from agno.db.sqlite import SqliteDb
 from agno.models.groq import Groq
 
 from config import Config
+from src.graph_db import get_async_driver, get_driver, reset_async_driver, reset_driver
 
+_agent: Optional[Agent] = None
+_agent_lock = threading.Lock()
 
-def get_chat_agent() -> Agent:
-    """Create and return the Agno Agent configured for graph Q&A.
+
+def _build_chat_agent() -> Agent:
+    """Build the Agno Agent configured for graph Q&A.
     Uses Groq LLM and persists chat history to a local SQLite DB.
     """
     # Model id requested by user
@@ -34,6 +41,18 @@ def get_chat_agent() -> Agent:
     )
 
 
+def get_chat_agent() -> Agent:
+    """Return the process-wide chat agent (model client, agent and SQLite history built once).
+    Pass a session_id to agent.run(): the shared agent otherwise keeps the first session for everyone.
+    """
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                _agent = _build_chat_agent()
+    return _agent
+
+
 def extract_cypher(text: str) -> Optional[str]:
     """Extract a Cypher query from a fenced code block, if present."""
     if not text:
@@ -45,16 +64,74 @@ def extract_cypher(text: str) -> Optional[str]:
     return None
 
 
+def _query(query: str, params: Optional[Dict]) -> List[Dict]:
+    with get_driver("neo4j").session() as session:
+        result = session.run(query, **(params or {}))
+        return [r.data() for r in result]
+
+
 def run_cypher(query: str, params: Optional[Dict] = None) -> List[Dict]:
-    """Execute Cypher against the configured Neo4j and return rows as dicts."""
-    from neo4j import GraphDatabase
-    neo4j_uri = getattr(Config, "NEO4J_URI", "bolt://localhost:7687")
-    neo4j_user = getattr(Config, "NEO4J_USER", "neo4j")
-    neo4j_password = getattr(Config, "NEO4J_PASSWORD", "neo4j")
-    driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
+    """Execute Cypher against the configured Neo4j and return rows as dicts.
+    Uses the shared pooled driver (src.graph_db): no connection setup per query.
+    """
+    from neo4j.exceptions import ServiceUnavailable, SessionExpired
+
     try:
-        with driver.session() as session:
-            result = session.run(query, **(params or {}))
-            return [r.data() for r in result]
-    finally:
-        driver.close()
\ No newline at end of file
+        return _query(query, params)
+    except (ServiceUnavailable, SessionExpired):
+        # Connexions du pool mortes (serveur redémarré): nouveau driver, une seule nouvelle tentative
+        reset_driver("neo4j")
+        return _query(query, params)
+
+
+async def stream_cypher(
+    query: str,
+    params: Optional[Dict] = None,
+    timeout: Optional[float] = None,
+    max_rows: Optional[int] = None,
+) -> AsyncIterator[Dict]:
+    """Execute Cypher with the async Neo4j driver and yield rows as they arrive.
+    The whole query (connection, execution, fetching) must finish within timeout seconds
+    (CHAT_QUERY_TIMEOUT_SECONDS, also sent to the server as the transaction timeout);
+    at most max_rows rows are yielded (CHAT_MAX_ROWS).
+    """
+    from neo4j import Query
+    from neo4j.exceptions import ServiceUnavailable, SessionExpired
+
+    timeout = timeout if timeout is not None else Config.CHAT_QUERY_TIMEOUT_SECONDS
+    max_rows = max_rows if max_rows is not None else Config.CHAT_MAX_ROWS
+    deadline = time.monotonic() + timeout
+
+    def remaining() -> float:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise asyncio.TimeoutError()
+        return left
+
+    try:
+        async with get_async_driver("neo4j").session() as session:
+            result = await asyncio.wait_for(
+                session.run(Query(query, timeout=timeout), params or {}), remaining()
+            )
+            records = result.__aiter__()
+            for _ in range(max_rows):
+                try:
+                    record = await asyncio.wait_for(records.__anext__(), remaining())
+                except StopAsyncIteration:
+                    return
+                yield record.data()
+    except (ServiceUnavailable, SessionExpired):
+        await reset_async_driver("neo4j")  # connexions mortes: nouveau driver au prochain appel
+        raise
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Cypher query timed out after {timeout:.0f}s")
+
+
+async def run_cypher_async(
+    query: str,
+    params: Optional[Dict] = None,
+    timeout: Optional[float] = None,
+    max_rows: Optional[int] = None,
+) -> List[Dict]:
+    """Async variant of run_cypher (does not block the event loop), with timeout and row cap."""
+    return [row async for row in stream_cypher(query, params, timeout, max_rows)]
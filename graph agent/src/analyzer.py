@@ -5,10 +5,11 @@ Optimisé pour vitesse (<30s constraint)
 """
 import networkx as nx
 import numpy as np
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 from leidenalg import find_partition, ModularityVertexPartition
 import igraph as ig
-from config import Config
+from config import AnalysisSettings
+from src.token_summary import TokenSummary
 
 
 class GraphAnalyzer:
@@ -16,21 +17,29 @@ class GraphAnalyzer:
     Analyse le graphe avec différents algorithmes
     """
     
-    def __init__(self, graph: nx.DiGraph):
+    def __init__(self, graph: nx.DiGraph, summary: Optional[TokenSummary] = None,
+                 settings: Optional[AnalysisSettings] = None):
         self.graph = graph
+        self.settings = settings or AnalysisSettings.from_config()
+        # Résumé calculé à l'ingestion (distribution des balances pour Gini)
+        self.summary = summary
         self.results = {}
         self.community_algorithm_used = None
     
-    def analyze(self, community_mode: str = "auto") -> Dict:
+    def analyze(self, community_mode: str = "auto",
+                on_stage: Optional[Callable[[str, Dict], None]] = None) -> Dict:
         """
         Lance toutes les analyses et retourne les résultats
         community_mode: "auto" | "leiden" | "louvain"
+        on_stage: appelé avec les résultats partiels ("pagerank", puis "clusters") dès qu'ils sont prêts
         """
         if self.graph.number_of_nodes() == 0:
             return self._empty_results()
         
         # 1. PageRank (rapide)
         pagerank = self._calculate_pagerank()
+        if on_stage:
+            on_stage("pagerank", pagerank)
         
         # 2. Détection de communautés selon mode
         if community_mode == "leiden":
@@ -55,6 +64,13 @@ class GraphAnalyzer:
         
         # 4. Identifier les clusters suspects
         suspicious_clusters = self._identify_suspicious_clusters(communities)
+        if on_stage:
+            on_stage("clusters", {
+                "communities": communities,
+                "community_algorithm": self.community_algorithm_used or community_mode,
+                "gini": gini,
+                "suspicious_clusters": suspicious_clusters,
+            })
         
         # 5. Top holders avec leurs métriques
         top_holders = self._get_top_holders(pagerank)
@@ -168,6 +184,10 @@ class GraphAnalyzer:
         if self.graph.number_of_nodes() == 0:
             return 0.0
         
+        # Distribution des balances déjà calculée à l'ingestion (même ensemble de wallets)
+        if self.summary is not None and self.summary.wallet_count == self.graph.number_of_nodes():
+            return self.summary.gini(self.graph.number_of_nodes())
+        
         # Utiliser les balances des holders
         balances = [
             self.graph.nodes[node].get("balance", 0) 
@@ -249,7 +269,7 @@ class GraphAnalyzer:
         # Trier par PageRank
         holders.sort(key=lambda x: x["pagerank"], reverse=True)
         
-        return holders[:Config.MAX_HOLDERS]
+        return holders[:self.settings.max_holders]
     
     def _empty_results(self) -> Dict:
         """Retourne des résultats vides si pas de données"""
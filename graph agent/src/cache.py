@@ -0,0 +1,304 @@
+"""
+Cache Module
+Cache LRU en mémoire borné en octets: les valeurs sont stockées sérialisées et compressées
+(pickle + zlib), l'éviction tient compte de la taille réelle de chaque entrée.
+Fenêtre stale-while-revalidate: une entrée expirée reste servie pendant que l'appelant
+la rafraîchit en tâche de fond (pas de falaise de latence à l'expiration du TTL).
+Backend SQLite (WAL) optionnel: un seul cache sur disque partagé par les workers d'un nœud.
+Les entrées sont désérialisées avec pickle: le fichier SQLite doit être de confiance.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import Config
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+class _Entry:
+    __slots__ = ("blob", "created_at")
+
+    def __init__(self, blob: bytes, created_at: float):
+        self.blob = blob
+        self.created_at = created_at
+
+
+class CompressedLRUCache:
+    """
+    max_bytes: budget total (octets compressés)
+    ttl_seconds: durée pendant laquelle une entrée est fraîche
+    stale_seconds: durée supplémentaire pendant laquelle elle est servie comme périmée (0 = désactivé)
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        stale_seconds: Optional[float] = None,
+        compression_level: Optional[int] = None,
+    ):
+        self.max_bytes = max_bytes if max_bytes is not None else Config.CACHE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.CACHE_TTL_SECONDS
+        self.stale_seconds = stale_seconds if stale_seconds is not None else Config.CACHE_STALE_SECONDS
+        self.compression_level = (
+            compression_level if compression_level is not None else Config.CACHE_COMPRESSION_LEVEL
+        )
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        # Accès depuis la boucle asyncio et depuis le pool de threads d'analyse
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _encode(self, value: Any) -> bytes:
+        return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), self.compression_level)
+
+    @staticmethod
+    def _decode(blob: bytes) -> Any:
+        return pickle.loads(zlib.decompress(blob))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.blob)
+
+    def get(self, key: str) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Retourne (valeur, FRESH | STALE), ou (None, None) si absente / trop ancienne.
+        Chaque appel retourne une copie indépendante de la valeur.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, None
+            age = time.time() - entry.created_at
+            if age > self.ttl_seconds + self.stale_seconds:
+                self._remove(key)
+                self.misses += 1
+                return None, None
+            self._entries.move_to_end(key)
+            state = FRESH if age <= self.ttl_seconds else STALE
+            if state == FRESH:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            blob = entry.blob
+        # Décompression hors verrou
+        return self._decode(blob), state
+
+    def peek(self, key: str) -> Optional[str]:
+        """État de l'entrée (FRESH | STALE | None) sans la décompresser ni toucher à l'ordre LRU"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            age = time.time() - entry.created_at
+        if age <= self.ttl_seconds:
+            return FRESH
+        return STALE if age <= self.ttl_seconds + self.stale_seconds else None
+
+    def set(self, key: str, value: Any) -> int:
+        """Insère la valeur (compressée) et évince les entrées LRU jusqu'à respecter le budget"""
+        blob = self._encode(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if len(blob) > self.max_bytes:
+                # Plus grosse que le budget entier: ne pas vider tout le cache pour elle
+                return len(blob)
+            self._entries[key] = _Entry(blob, time.time())
+            self._bytes += len(blob)
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return len(blob)
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class SQLiteCache(CompressedLRUCache):
+    """
+    Même interface que CompressedLRUCache, stockée dans un fichier SQLite en mode WAL:
+    - partagé par tous les workers uvicorn du nœud et conservé entre redémarrages
+    - écritures atomiques (une transaction par set, remplacement de la ligne)
+    - lectures sans verrou applicatif: un SELECT, les lecteurs WAL ne bloquent pas les écrivains
+    - éviction TTL + LRU approximatif (accessed_at mis à jour au plus toutes les TOUCH_INTERVAL s)
+      jusqu'à respecter le budget en octets
+    """
+
+    TOUCH_INTERVAL = 30.0
+
+    def __init__(self, path: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path or Config.CACHE_SQLITE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Une connexion par thread (et par process: pas de connexion héritée d'un fork)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, blob BLOB NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Tuple[Optional[Any], Optional[str]]:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT blob, created_at, accessed_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.ttl_seconds + self.stale_seconds:
+            with self._lock:
+                self.misses += 1
+            return None, None
+        blob, created_at, accessed_at = row
+        if now - accessed_at > self.TOUCH_INTERVAL:
+            try:
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            except sqlite3.OperationalError:
+                pass  # base occupée: l'ordre LRU est approximatif, la lecture reste valide
+        state = FRESH if now - created_at <= self.ttl_seconds else STALE
+        with self._lock:
+            if state == FRESH:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+        return self._decode(blob), state
+
+    def peek(self, key: str) -> Optional[str]:
+        row = self._connect().execute("SELECT created_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        age = time.time() - row[0]
+        if age <= self.ttl_seconds:
+            return FRESH
+        return STALE if age <= self.ttl_seconds + self.stale_seconds else None
+
+    def set(self, key: str, value: Any) -> int:
+        blob = self._encode(value)
+        size = len(blob)
+        if size > self.max_bytes:
+            self.delete(key)
+            return size
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, blob, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(blob), size, now, now),
+            )
+            conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds - self.stale_seconds,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                evicted = 0
+                for old_key, old_size in conn.execute(
+                    "SELECT key, size FROM entries WHERE key != ? ORDER BY accessed_at", (key,)
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+                    total -= old_size
+                    evicted += 1
+                with self._lock:
+                    self.evictions += evicted
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return size
+
+    def delete(self, key: str):
+        self._connect().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        self._connect().execute("DELETE FROM entries")
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def size_bytes(self) -> int:
+        return self._connect().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def stats(self) -> Dict:
+        entries, size = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        with self._lock:
+            return {
+                "backend": "sqlite",
+                "path": self.path,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def create_cache(sqlite_path: Optional[str] = None, **kwargs) -> CompressedLRUCache:
+    """
+    Backend configuré par CACHE_BACKEND: "memory" (par worker) ou "sqlite" (partagé sur disque).
+    kwargs: max_bytes, ttl_seconds, stale_seconds, compression_level (défauts: CACHE_*)
+    """
+    backend = Config.CACHE_BACKEND.lower()
+    if backend == "sqlite":
+        return SQLiteCache(path=sqlite_path, **kwargs)
+    if backend == "memory":
+        return CompressedLRUCache(**kwargs)
+    raise ValueError(f"CACHE_BACKEND inconnu: {Config.CACHE_BACKEND} (memory | sqlite)")
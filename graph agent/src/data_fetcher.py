@@ -11,8 +11,14 @@ from typing import Dict, List, Optional
 import time
 import math
 import random
-from collections import defaultdict, OrderedDict
-from config import Config
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from config import Config, AnalysisSettings
+from src.rate_limiter import throttle_request
+from src.label_registry import get_label_registry
+from src.token_summary import TokenSummary
+from src.progress import AnalysisProgress
+from src.cache import create_cache, FRESH, STALE
 
 
 class DataFetcher:
@@ -21,15 +27,30 @@ class DataFetcher:
     Selon hackathon: fetch les 10,000 dernières transactions du token
     """
     
-    # Cache LRU + TTL (partagé entre instances)
-    _cache: OrderedDict = OrderedDict()
-    _cache_lock = asyncio.Lock()
+    # Cache compressé, borné en octets, avec stale-while-revalidate (partagé entre instances;
+    # entre workers avec CACHE_BACKEND=sqlite)
+    _cache = create_cache()
+    # Rafraîchissements en tâche de fond des entrées périmées, par clé de cache
+    _refresh_tasks: Dict[str, asyncio.Task] = {}
+    # Fetchs en cours par clé de cache: des requêtes concurrentes (ex: batch) sur le même token
+    # attendent le même résultat au lieu de relancer le fetch
+    _inflight: Dict[str, asyncio.Task] = {}
+    # Clients HTTP partagés par (boucle asyncio, timeout): keep-alive et pool de connexions communs
+    _http_clients: Dict = {}
 
-    def __init__(self, chain: str = "ethereum", preferred_provider: str = "auto"):
+    def __init__(self, chain: str = "ethereum", preferred_provider: str = "auto",
+                 progress: Optional[AnalysisProgress] = None,
+                 settings: Optional[AnalysisSettings] = None):
         self.chain = chain
+        # Paramètres de la requête (limites, timeouts): jamais lus depuis un Config muté
+        self.settings = settings or AnalysisSettings.from_config()
+        # Suivi d'avancement optionnel (pages récupérées, transferts décodés)
+        self.progress = progress
         self.preferred_provider = preferred_provider.lower()
         # Track last successful provider used
         self.last_provider_used = None
+        # Adresses étiquetées repérées pendant le décodage (pré-filtre Bloom + lookup exact)
+        self.address_labels: Dict[str, int] = {}
         
         # Configurer les providers disponibles en fonction des clés API
         self.use_bitquery = bool(Config.BITQUERY_ACCESS_TOKEN)
@@ -131,31 +152,105 @@ class DataFetcher:
         }
         return v2_map.get(chain, "eth"), v1_map.get(chain, "ethereum")
         
+    @asynccontextmanager
+    async def _http_client(self, timeout: float):
+        """
+        Fournit le client HTTP partagé (non fermé en sortie de bloc).
+        Chaque requête passe par le rate limiter du provider (hook httpx).
+        """
+        loop = asyncio.get_running_loop()
+        key = float(timeout)
+        entry = DataFetcher._http_clients.get(key)
+        if entry is None or entry[0] is not loop or entry[1].is_closed:
+            client = httpx.AsyncClient(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=Config.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.HTTP_MAX_CONNECTIONS,
+                ),
+                event_hooks={"request": [throttle_request]},
+            )
+            entry = (loop, client)
+            DataFetcher._http_clients[key] = entry
+        yield entry[1]
+    
+    @classmethod
+    async def close_http_clients(cls):
+        """Ferme les clients HTTP partagés (arrêt du serveur)"""
+        for _, client in list(cls._http_clients.values()):
+            if not client.is_closed:
+                await client.aclose()
+        cls._http_clients.clear()
+    
     async def _cache_get(self, key: str):
-        """Retourne la valeur en cache si TTL valide, sinon None"""
-        async with self._cache_lock:
-            if key in self._cache:
-                entry = self._cache[key]
-                if time.time() - entry["ts"] <= Config.CACHE_TTL_SECONDS:
-                    # LRU: accès -> fin
-                    self._cache.move_to_end(key, last=True)
-                    return entry["value"]
-                else:
-                    # Expiré
-                    del self._cache[key]
-            return None
+        """Retourne (valeur, FRESH | STALE) si en cache, sinon (None, None)"""
+        # Décompression (et lecture disque pour SQLite) hors de la boucle asyncio
+        return await asyncio.to_thread(self._cache.get, key)
     
     async def _cache_set(self, key: str, value):
-        """Insère/rafraîchit une entrée dans le cache avec TTL et LRU"""
-        async with self._cache_lock:
-            self._cache[key] = {"value": value, "ts": time.time()}
-            self._cache.move_to_end(key, last=True)
-            # Éviction LRU si dépassement
-            if len(self._cache) > Config.MAX_CACHE_ITEMS:
-                self._cache.popitem(last=False)
+        """Insère/rafraîchit une entrée (compressée, éviction LRU selon le budget en octets)"""
+        size = await asyncio.to_thread(self._cache.set, key, value)
+        # Taille totale dans /health (size_bytes = requête SUM sur le backend SQLite, pas sur la boucle ici)
+        print(f"  🧠 Cached token data: {size / 1024:.0f} KiB compressed")
+    
+    def _schedule_refresh(self, token_address: str, key: str):
+        """Rafraîchit une entrée périmée en tâche de fond (une seule à la fois par clé)"""
+        if key in self._inflight or key in self._refresh_tasks:
+            return
+        async def refresh():
+            try:
+                refresher = DataFetcher(self.chain, self.preferred_provider, settings=self.settings)
+                await refresher._fetch_single_flight(token_address, key)
+                print(f"  🔄 Background refresh done: {key}")
+            except Exception as e:
+                print(f"  ⚠️ Background refresh failed for {key}: {e}")
+        
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks[key] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(key, None))
+    
+    @staticmethod
+    def cache_key(chain: str, token_address: str, max_transactions: int) -> str:
+        # La limite fait partie de la clé: un fetch à 1k transactions ne sert pas une requête à 10k
+        return f"{chain}:{token_address.lower()}:{max_transactions}"
+    
+    @classmethod
+    def is_cached(cls, chain: str, token_address: str, max_transactions: int) -> bool:
+        """Données déjà en cache (fraîches ou périmées) ou en cours de fetch: pas de fetch coûteux à prévoir"""
+        key = cls.cache_key(chain, token_address, max_transactions)
+        return key in cls._inflight or cls._cache.peek(key) is not None
+    
+    @classmethod
+    async def fresh_cached_data(cls, chain: str, token_address: str, max_transactions: int) -> Optional[Dict]:
+        """Données fraîches (non vides) déjà en cache, sinon None: jamais de fetch ni d'attente d'un fetch"""
+        key = cls.cache_key(chain, token_address, max_transactions)
+        if cls._cache.peek(key) != FRESH:
+            return None
+        cached, state = await asyncio.to_thread(cls._cache.get, key)
+        if cached is None or state != FRESH or not cached.get("total_transactions_fetched", 0):
+            return None
+        return cached
     
     def _cache_key(self, token_address: str) -> str:
-        return f"{self.chain}:{token_address.lower()}"
+        return self.cache_key(self.chain, token_address, self.settings.max_transactions)
+    
+    def _on_page_decoded(self, rows: List[Dict]):
+        """
+        Appelé pour chaque page de provider décodée:
+        - met à jour l'avancement (pages, transferts décodés)
+        - pré-filtre les adresses avec le filtre de Bloom du registre de labels.
+          Seules les correspondances probables passent par le lookup exact; les hits sont
+          enregistrés dans self.address_labels (mixers/whitelist connus avant GraphBuilder).
+        """
+        if self.progress is not None:
+            self.progress.page_decoded(len(rows))
+        if not rows:
+            return
+        addresses = {row.get("from", "") for row in rows} | {row.get("to", "") for row in rows}
+        addresses.discard("")
+        hits = get_label_registry().screen(list(addresses))
+        if hits:
+            self.address_labels.update(hits)
     
     async def fetch_token_data(self, token_address: str) -> Dict:
         """
@@ -163,22 +258,65 @@ class DataFetcher:
         """
         # Cache rapide (évite re-fetch pour tokens populaires)
         key = self._cache_key(token_address)
-        cached = await self._cache_get(key)
+        cached, state = await self._cache_get(key)
         if cached is not None:
             # Si le cache contient un résultat vide, ne pas l'utiliser
             if cached.get("total_transactions_fetched", 0) > 0:
-                print("  🧠 Cache hit: token data")
+                if state == STALE:
+                    # Stale-while-revalidate: réponse immédiate, rafraîchissement en arrière-plan
+                    print("  🧠 Cache hit (stale): token data, refreshing in background")
+                    self._schedule_refresh(token_address, key)
+                else:
+                    print("  🧠 Cache hit: token data")
                 return cached
             else:
                 print("  🧠 Cache contient un résultat vide → rafraîchissement forcé")
         
+        return await self._fetch_single_flight(token_address, key)
+    
+    async def _fetch_single_flight(self, token_address: str, key: str) -> Dict:
+        """
+        Fetch + mise en cache, partagé entre les requêtes concurrentes sur la même clé.
+        Le fetch tourne dans sa propre tâche: l'annulation d'un appelant (y compris le premier)
+        n'annule ni le fetch ni l'attente des autres, et le résultat est mis en cache.
+        """
+        # Même token déjà en cours de fetch (requête concurrente): partager le résultat
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight.get_loop() is asyncio.get_running_loop():
+            print("  🔁 Fetch already in progress for this token, waiting for it")
+            return await asyncio.shield(inflight)
+        
+        task = asyncio.create_task(self._fetch_token_data_uncached(token_address, key))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._fetch_done(key, done))
+        return await asyncio.shield(task)
+    
+    @classmethod
+    def _fetch_done(cls, key: str, task: asyncio.Task):
+        if cls._inflight.get(key) is task:
+            del cls._inflight[key]
+        if not task.cancelled():
+            # Exception déjà propagée aux appelants (s'il en reste): éviter l'avertissement "never retrieved"
+            task.exception()
+    
+    async def _fetch_token_data_uncached(self, token_address: str, key: str) -> Dict:
+        """Fetch réel (transactions + métadonnées), puis mise en cache"""
         start = time.time()
+        self.address_labels = {}
+        
+        # Métadonnées en parallèle des transactions
+        metadata_task = asyncio.create_task(self._fetch_token_metadata(token_address))
         
         # Fetch transactions du token
-        transactions = await self._fetch_token_transactions(token_address)
+        try:
+            transactions = await self._fetch_token_transactions(token_address)
+        except BaseException:
+            metadata_task.cancel()
+            raise
         
-        # Extraire les wallets impliqués et leurs balances
-        wallets_data = self._extract_wallets_from_transactions(transactions, token_address)
+        # Extraire les wallets impliqués et leurs balances (+ résumé, même passage)
+        summary = TokenSummary()
+        wallets_data = self._extract_wallets_from_transactions(transactions, token_address, summary)
         
         # Trier par balance et prendre les top 50 pour l'output
         sorted_wallets = sorted(wallets_data.items(), key=lambda x: x[1]['balance'], reverse=True)
@@ -188,15 +326,17 @@ class DataFetcher:
                 "balance": data['balance'],
                 "transaction_count": data['transaction_count']
             }
-            for addr, data in sorted_wallets[:Config.MAX_HOLDERS]
+            for addr, data in sorted_wallets[:self.settings.max_holders]
         ]
         
-        # Fetch metadata du token
-        metadata = await self._fetch_token_metadata(token_address)
+        metadata = await metadata_task
         
         elapsed = time.time() - start
         print(f"  ✅ Data fetch: {len(transactions)} transactions, {len(wallets_data)} wallets uniques ({elapsed:.2f}s)")
         
+        # Résumé calculé une seule fois, partagé par GraphAnalyzer et RiskScorer
+        summary.set_wallets(len(wallets_data), [h["balance"] for h in top_holders])
+        
         result = {
             "token_address": token_address,
             "chain": self.chain,
@@ -204,7 +344,10 @@ class DataFetcher:
             "top_holders": top_holders,
             "transactions": transactions,
             "all_wallets": list(wallets_data.keys()),  # Tous les wallets pour le graphe
-            "total_transactions_fetched": len(transactions)
+            "total_transactions_fetched": len(transactions),
+            # Labels (bitmask) des wallets étiquetés, repérés pendant le décodage
+            "address_labels": {a: c for a, c in self.address_labels.items() if a in wallets_data},
+            "summary": summary
         }
         
         # Mettre en cache le résultat
@@ -267,7 +410,7 @@ class DataFetcher:
         else:
             raise ValueError("No API provider available")
         
-        return transactions[:Config.MAX_TRANSACTIONS_TO_FETCH]
+        return transactions[:self.settings.max_transactions]
     
     async def _fetch_transactions_etherscan(self, token_address: str) -> List[Dict]:
         """
@@ -278,10 +421,10 @@ class DataFetcher:
         - Gestion du rate limit (HTTP 429 et payload status=0)
         """
         url = Config.ETHERSCAN_API_URL
-        sem = asyncio.Semaphore(Config.MAX_CONCURRENT_REQUESTS)
+        sem = asyncio.Semaphore(self.settings.max_concurrent_requests)
         chain_id = self._get_chain_id()
 
-        async with httpx.AsyncClient(timeout=Config.REQUEST_TIMEOUT_SECONDS) as client:
+        async with self._http_client(self.settings.request_timeout_seconds) as client:
             async def get_latest_block() -> int:
                 try:
                     r = await client.get(url, params={
@@ -355,12 +498,12 @@ class DataFetcher:
             decimals = await get_decimals()
 
             # Fenêtrage: on limite à ~10k blocs et on s'adapte au nombre de pages
-            max_pages = min(max(1, math.ceil(Config.MAX_TRANSACTIONS_TO_FETCH / 1000)), 10)
+            max_pages = min(max(1, math.ceil(self.settings.max_transactions / 1000)), 10)
             window = min(10_000, max(2_000, latest_block // max(max_pages * 12, 1)))
             transfer_topic0 = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
 
             async def fetch_window(idx: int, start_block: int, end_block: int, depth: int = 0) -> List[Dict]:
-                await asyncio.sleep(idx / max(Config.REQUESTS_PER_SECOND, 1))
+                # Quota Etherscan appliqué par le rate limiter partagé (hook du client HTTP)
                 async with sem:
                     tries = 0
                     backoff = 0.5
@@ -416,6 +559,7 @@ class DataFetcher:
                                         })
                                     except Exception:
                                         continue
+                                self._on_page_decoded(page)
                                 return page
 
                             # status=0
@@ -478,95 +622,135 @@ class DataFetcher:
                 seen.add(h)
                 deduped.append(tx)
         deduped.sort(key=lambda t: t.get("timestamp", 0), reverse=True)
-        return deduped[:Config.MAX_TRANSACTIONS_TO_FETCH]
+        return deduped[:self.settings.max_transactions]
 
     async def _fetch_transactions_etherscan_tokentx(self, token_address: str) -> List[Dict]:
         """
         Fallback Etherscan implementation using account.tokentx (ERC20 transfers list) with pagination.
         - Uses v2 API with chainid
-        - Paginates by page and offset up to MAX_TRANSACTIONS_TO_FETCH
+        - Pages (sort=desc) are known up front: ceil(settings.max_transactions / 1000) requests
+          issued concurrently under the shared rate limiter, merged in page order
+        - A short or empty page ends the listing: higher-numbered pages are cancelled as soon as
+          it arrives (without waiting for the lower pages to be merged)
         - Leverages tokenDecimal field to compute value
         """
         url = Config.ETHERSCAN_API_URL
         chain_id = self._get_chain_id()
-        max_needed = Config.MAX_TRANSACTIONS_TO_FETCH
+        max_needed = self.settings.max_transactions
         per_page = min(1000, max_needed)
-        transfers: List[Dict] = []
-        page = 1
-        backoff = 0.5
+        page_count = max(1, math.ceil(max_needed / per_page))
+        sem = asyncio.Semaphore(self.settings.max_concurrent_requests)
+        raw_sizes: Dict[int, int] = {}
+        tasks: List[asyncio.Task] = []
 
-        async with httpx.AsyncClient(timeout=Config.REQUEST_TIMEOUT_SECONDS) as client:
-            while len(transfers) < max_needed:
+        def end_of_listing(page: int):
+            """Page courte ou vide: les pages suivantes sont vides, inutile d'attendre leur tour"""
+            for task in tasks[page:]:
+                if not task.done():
+                    task.cancel()
+
+        def decode(result: List[Dict]) -> List[Dict]:
+            page_transfers = []
+            for tx in result:
                 try:
-                    params = {
-                        "module": "account",
-                        "action": "tokentx",
-                        "contractaddress": token_address,
-                        "page": str(page),
-                        "offset": str(per_page),
-                        "sort": "desc",
-                        "chainid": str(chain_id),
-                        "apikey": Config.ETHERSCAN_API_KEY,
-                    }
-                    resp = await client.get(url, params=params)
-                    resp.raise_for_status()
-                    data = resp.json()
-                    status = data.get("status")
-                    result = data.get("result")
-                    if status == "1" and isinstance(result, list):
-                        if not result:
-                            break
-                        for tx in result:
-                            try:
-                                # Parse typical tokentx fields
-                                from_addr = tx.get("from", "").lower()
-                                to_addr = tx.get("to", "").lower()
-                                # tokenDecimal might be string, default 18
-                                decimals_str = tx.get("tokenDecimal", "18")
-                                decimals = int(decimals_str) if str(decimals_str).isdigit() else 18
-                                value_raw = tx.get("value", "0")
-                                value = int(value_raw) / (10 ** decimals)
-                                # timeStamp is seconds string
-                                ts_str = tx.get("timeStamp", "0")
-                                timestamp = int(ts_str) if str(ts_str).isdigit() else 0
-                                transfers.append({
-                                    "hash": tx.get("hash", ""),
-                                    "from": from_addr,
-                                    "to": to_addr,
-                                    "value": value,
-                                    "timestamp": timestamp,
-                                    "block": tx.get("blockNumber", ""),
-                                })
-                            except Exception:
-                                continue
-                        # Go next page
-                        page += 1
-                        # If we got less than per_page, likely final page
-                        if len(result) < per_page:
-                            break
-                        continue
-                    else:
+                    # Parse typical tokentx fields
+                    from_addr = tx.get("from", "").lower()
+                    to_addr = tx.get("to", "").lower()
+                    # tokenDecimal might be string, default 18
+                    decimals_str = tx.get("tokenDecimal", "18")
+                    decimals = int(decimals_str) if str(decimals_str).isdigit() else 18
+                    value_raw = tx.get("value", "0")
+                    value = int(value_raw) / (10 ** decimals)
+                    # timeStamp is seconds string
+                    ts_str = tx.get("timeStamp", "0")
+                    timestamp = int(ts_str) if str(ts_str).isdigit() else 0
+                    page_transfers.append({
+                        "hash": tx.get("hash", ""),
+                        "from": from_addr,
+                        "to": to_addr,
+                        "value": value,
+                        "timestamp": timestamp,
+                        "block": tx.get("blockNumber", ""),
+                    })
+                except Exception:
+                    continue
+            return page_transfers
+
+        async def fetch_page(client, page: int) -> Optional[List[Dict]]:
+            """
+            Transferts décodés d'une page, [] si la page est vide,
+            None si la page n'a pas pu être récupérée (erreur définitive ou retries épuisés).
+            raw_sizes[page] reçoit le nombre de lignes brutes (page complète = per_page)
+            """
+            async with sem:
+                tries = 0
+                backoff = 0.5
+                while tries < 3:
+                    try:
+                        params = {
+                            "module": "account",
+                            "action": "tokentx",
+                            "contractaddress": token_address,
+                            "page": str(page),
+                            "offset": str(per_page),
+                            "sort": "desc",
+                            "chainid": str(chain_id),
+                            "apikey": Config.ETHERSCAN_API_KEY,
+                        }
+                        resp = await client.get(url, params=params)
+                        resp.raise_for_status()
+                        data = resp.json()
+                        status = data.get("status")
+                        result = data.get("result")
+                        if status == "1" and isinstance(result, list):
+                            page_transfers = decode(result)
+                            self._on_page_decoded(page_transfers)
+                            raw_sizes[page] = len(result)
+                            if len(result) < per_page:
+                                end_of_listing(page)
+                            return page_transfers
                         # Handle rate limits or errors
-                        msg = str(data.get("message", ""))
                         res_text = result if isinstance(result, str) else ""
                         low = str(res_text).lower()
                         if ("rate limit" in low or "too many" in low) or resp.status_code == 429:
                             await asyncio.sleep(backoff + random.uniform(0, 0.25))
                             backoff *= 2
+                            tries += 1
                             continue
                         # No more results
-                        break
-                except httpx.HTTPStatusError as e:
-                    if e.response.status_code in (429, 500, 502, 503, 504):
-                        await asyncio.sleep(backoff + random.uniform(0, 0.25))
+                        raw_sizes[page] = 0
+                        end_of_listing(page)
+                        return []
+                    except httpx.HTTPStatusError as e:
+                        if e.response.status_code in (429, 500, 502, 503, 504):
+                            await asyncio.sleep(backoff + random.uniform(0, 0.25))
+                            backoff *= 2
+                            tries += 1
+                            continue
+                        return None
+                    except Exception:
+                        tries += 1
+                        await asyncio.sleep(backoff)
                         backoff *= 2
-                        continue
-                    else:
+                print(f"  ⚠️ Etherscan tokentx error persistant (page {page})")
+                return None
+
+        transfers: List[Dict] = []
+        async with self._http_client(self.settings.request_timeout_seconds) as client:
+            tasks.extend(asyncio.create_task(fetch_page(client, page)) for page in range(1, page_count + 1))
+            try:
+                # Fusion dans l'ordre des pages; une page courte termine le listing
+                for page, task in enumerate(tasks, start=1):
+                    page_transfers = await task
+                    if page_transfers:
+                        transfers.extend(page_transfers)
+                    if page_transfers is None or raw_sizes.get(page, 0) < per_page:
                         break
-                except Exception:
-                    await asyncio.sleep(backoff)
-                    backoff *= 2
-                    continue
+            finally:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
         # Deduplicate by hash and sort desc by timestamp
         seen = set()
         deduped = []
@@ -576,14 +760,14 @@ class DataFetcher:
                 seen.add(h)
                 deduped.append(tx)
         deduped.sort(key=lambda t: t.get("timestamp", 0), reverse=True)
-        return deduped[:Config.MAX_TRANSACTIONS_TO_FETCH]
+        return deduped[:self.settings.max_transactions]
 
     async def _fetch_transactions_alchemy(self, token_address: str) -> List[Dict]:
         """
         Fetch transactions via Alchemy Transfers API (alchemy_getAssetTransfers) pour ERC20.
         - Filtre par contractAddresses = [token_address]
         - category=['erc20'] pour capturer les événements Transfer
-        - Pagination via pageKey et maxCount jusqu'à MAX_TRANSACTIONS_TO_FETCH
+        - Pagination via pageKey et maxCount jusqu'à settings.max_transactions
         """
         endpoint = f"{Config.ALCHEMY_BASE_URL}/{Config.ALCHEMY_API_KEY}"
         normalized_token_address = token_address.lower()
@@ -599,7 +783,7 @@ class DataFetcher:
                         "latest",
                     ],
                 }
-                async with httpx.AsyncClient(timeout=Config.REQUEST_TIMEOUT_SECONDS) as client:
+                async with self._http_client(self.settings.request_timeout_seconds) as client:
                     r = await client.post(endpoint, json=payload)
                     r.raise_for_status()
                     res = r.json().get("result")
@@ -614,11 +798,11 @@ class DataFetcher:
 
         transfers: List[Dict] = []
         page_key: Optional[str] = None
-        max_needed = Config.MAX_TRANSACTIONS_TO_FETCH
+        max_needed = self.settings.max_transactions
         max_per_page = min(1000, max_needed)
 
         # Boucle de pagination
-        async with httpx.AsyncClient(timeout=Config.REQUEST_TIMEOUT_SECONDS) as client:
+        async with self._http_client(self.settings.request_timeout_seconds) as client:
             while len(transfers) < max_needed:
                 params_obj = {
                     "fromBlock": "0x0",   # depuis le début (pour robustesse)
@@ -655,6 +839,7 @@ class DataFetcher:
 
                     print(f"    📦 Alchemy page: {len(page_transfers)} transfers")
 
+                    page_start = len(transfers)
                     for t in page_transfers:
                         try:
                             from_addr = (t.get("from") or "").lower()
@@ -687,6 +872,7 @@ class DataFetcher:
                             })
                         except Exception:
                             continue
+                    self._on_page_decoded(transfers[page_start:])
 
                     if not page_key or len(page_transfers) == 0:
                         break
@@ -781,7 +967,7 @@ class DataFetcher:
         
         variables = {
             "token_address": token_address,
-            "limit": min(Config.MAX_TRANSACTIONS_TO_FETCH, 10000)
+            "limit": min(self.settings.max_transactions, 10000)
         }
         
         # Essayer V2 d'abord (streaming endpoint), puis V1
@@ -790,7 +976,7 @@ class DataFetcher:
             (Config.BITQUERY_ENDPOINT, query_v1, "V1")
         ]
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self._http_client(30.0) as client:
             for endpoint, query, version in endpoints_and_queries:
                 try:
                     print(f"  📡 Fetching transactions via BitQuery {version} API...")
@@ -866,6 +1052,7 @@ class DataFetcher:
                             
                             if transactions:
                                 print(f"  ✅ Parsed {len(transactions)} transactions from BitQuery V2")
+                                self._on_page_decoded(transactions)
                                 return transactions
                     
                     # Parser réponse V1
@@ -906,6 +1093,7 @@ class DataFetcher:
                             
                             if transactions:
                                 print(f"  ✅ Parsed {len(transactions)} transactions from BitQuery V1")
+                                self._on_page_decoded(transactions)
                                 return transactions
                     
                     print(f"  ⚠️ No data returned from {version} API. Trying next...")
@@ -929,11 +1117,13 @@ class DataFetcher:
     def _extract_wallets_from_transactions(
         self, 
         transactions: List[Dict], 
-        token_address: str
+        token_address: str,
+        summary: Optional[TokenSummary] = None
     ) -> Dict[str, Dict]:
         """
         Extrait tous les wallets impliqués dans les transactions
         et calcule leurs balances (approximatives basées sur les transactions)
+        summary (optionnel): volume, bornes temporelles et comptage ajoutés dans le même passage
         """
         wallets = defaultdict(lambda: {"balance": 0, "transaction_count": 0, "sent": 0, "received": 0})
         
@@ -941,6 +1131,8 @@ class DataFetcher:
             from_addr = tx.get("from", "")
             to_addr = tx.get("to", "")
             value = tx.get("value", 0)
+            if summary is not None:
+                summary.add_transfer(float(value), tx.get("timestamp"))
             
             if from_addr:
                 wallets[from_addr]["sent"] += value
@@ -973,7 +1165,7 @@ class DataFetcher:
                 return metadata
         
         # Fallback vers Etherscan
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with self._http_client(5.0) as client:
             try:
                 if self.use_etherscan:
                     url = Config.ETHERSCAN_API_URL
@@ -1030,7 +1222,7 @@ class DataFetcher:
         }}
         """
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self._http_client(10.0) as client:
             try:
                 headers = {
                     "Content-Type": "application/json",
@@ -1084,7 +1276,7 @@ class DataFetcher:
                 "method": "alchemy_getTokenMetadata",
                 "params": [normalized],
             }
-            async with httpx.AsyncClient(timeout=Config.REQUEST_TIMEOUT_SECONDS) as client:
+            async with self._http_client(self.settings.request_timeout_seconds) as client:
                 resp = await client.post(endpoint, json=payload)
                 resp.raise_for_status()
                 data = resp.json()
@@ -1111,7 +1303,7 @@ class DataFetcher:
                         "latest",
                     ],
                 }
-                async with httpx.AsyncClient(timeout=Config.REQUEST_TIMEOUT_SECONDS) as client:
+                async with self._http_client(self.settings.request_timeout_seconds) as client:
                     r = await client.post(endpoint, json=payload_dec)
                     r.raise_for_status()
                     res = r.json().get("result")
@@ -1131,7 +1323,7 @@ class DataFetcher:
                     "latest",
                 ],
             }
-            async with httpx.AsyncClient(timeout=Config.REQUEST_TIMEOUT_SECONDS) as client:
+            async with self._http_client(self.settings.request_timeout_seconds) as client:
                 r2 = await client.post(endpoint, json=payload_ts)
                 r2.raise_for_status()
                 rs = r2.json().get("result")
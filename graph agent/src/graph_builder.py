@@ -29,6 +29,13 @@ class GraphBuilder:
         all_wallets = token_data.get("all_wallets", [])
         top_holders_dict = {h.get("address", ""): h for h in token_data.get("top_holders", [])}
         
+        # Labels (mixers, whitelist...) déjà repérés pendant l'ingestion
+        address_labels = token_data.get("address_labels")
+        if address_labels is not None:
+            self.graph.graph["labels_screened"] = True
+        else:
+            address_labels = {}
+        
         # Ajouter TOUS les nodes (wallets impliqués dans les transactions)
         for wallet_addr in all_wallets:
             holder_data = top_holders_dict.get(wallet_addr, {})
@@ -36,7 +43,8 @@ class GraphBuilder:
                 wallet_addr,
                 balance=holder_data.get("balance", 0),
                 transaction_count=holder_data.get("transaction_count", 0),
-                is_top_holder=wallet_addr in top_holders_dict
+                is_top_holder=wallet_addr in top_holders_dict,
+                labels=address_labels.get(wallet_addr, 0)
             )
         
         # Ajouter les edges (transactions)
@@ -50,9 +58,11 @@ class GraphBuilder:
             # S'assurer que les nodes existent
             if from_addr and to_addr:
                 if from_addr not in self.graph:
-                    self.graph.add_node(from_addr, balance=0, transaction_count=0, is_top_holder=False)
+                    self.graph.add_node(from_addr, balance=0, transaction_count=0, is_top_holder=False,
+                                        labels=address_labels.get(from_addr, 0))
                 if to_addr not in self.graph:
-                    self.graph.add_node(to_addr, balance=0, transaction_count=0, is_top_holder=False)
+                    self.graph.add_node(to_addr, balance=0, transaction_count=0, is_top_holder=False,
+                                        labels=address_labels.get(to_addr, 0))
                 
                 # Ajouter ou mettre à jour l'edge
                 if self.graph.has_edge(from_addr, to_addr):
@@ -105,34 +115,34 @@ class GraphBuilder:
         # Mapper PageRank
         pagerank = analysis_results.get("metrics", {}).get("pagerank", {})
         
-        # Construire les nodes
-        nodes = []
-        for node_id in graph.nodes():
-            node_data = {
+        # Construire les nodes (un seul passage, sans lookup graph.nodes[...] par nœud)
+        nodes = [
+            {
                 "id": node_id,
                 "group": community_map.get(node_id, 0),
                 "pagerank": round(pagerank.get(node_id, 0), 4),
                 "is_mixer": mixer_flags.get(node_id, False),
-                "balance": graph.nodes[node_id].get("balance", 0)
+                "balance": balance
             }
-            nodes.append(node_data)
+            for node_id, balance in graph.nodes(data="balance", default=0)
+        ]
         
         # Construire les links
-        links = []
         wash_trade_pairs = {
             (wt.get("from", ""), wt.get("to", "")) 
             for wt in analysis_results.get("wash_trade_pairs", [])
         }
         
-        for from_addr, to_addr, data in graph.edges(data=True):
-            link_data = {
+        links = [
+            {
                 "source": from_addr,
                 "target": to_addr,
                 "value": data.get("weight", 0),
                 "count": data.get("count", 1),
                 "is_wash_trade": (from_addr, to_addr) in wash_trade_pairs
             }
-            links.append(link_data)
+            for from_addr, to_addr, data in graph.edges(data=True)
+        ]
         
         return {
             "nodes": nodes,
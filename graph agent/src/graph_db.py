@@ -0,0 +1,188 @@
+"""
+Graph DB Module
+Drivers Bolt partagés par le process (un par backend: neo4j, memgraph), créés une fois
+et réutilisés par /chat (run_cypher) et la persistance en tâche de fond.
+- pool de connexions borné (GRAPH_DB_POOL_SIZE), attente d'une connexion bornée
+- connexions recyclées après GRAPH_DB_MAX_CONNECTION_LIFETIME_SECONDS, keep-alive TCP
+- health check (verify_connectivity) au plus toutes les GRAPH_DB_HEALTH_CHECK_SECONDS, relancé
+  en tâche de fond par monitor_health pour les seuls drivers ouverts (bloquant et asyncio);
+  un échec marque le backend non sain (/health) sans fermer le driver: les écritures en cours
+  continuent, le pool écarte lui-même ses connexions mortes
+Variante asyncio (get_async_driver) pour les requêtes faites depuis la boucle (/chat).
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+from config import Config
+
+BACKENDS = ("neo4j", "memgraph")
+
+_drivers: Dict[str, object] = {}
+_async_drivers: Dict[str, object] = {}
+_health: Dict[str, Dict] = {}
+_async_health: Dict[str, Dict] = {}
+_lock = threading.Lock()
+
+
+def _connection(storage_type: str):
+    """(uri, auth) du backend depuis Config (Memgraph sans auth si identifiants vides)"""
+    if storage_type == "neo4j":
+        return Config.NEO4J_URI, (Config.NEO4J_USER, Config.NEO4J_PASSWORD)
+    if Config.MEMGRAPH_USER or Config.MEMGRAPH_PASSWORD:
+        return Config.MEMGRAPH_URI, (Config.MEMGRAPH_USER, Config.MEMGRAPH_PASSWORD)
+    return Config.MEMGRAPH_URI, None
+
+
+def _driver_config() -> Dict:
+    return {
+        "max_connection_pool_size": Config.GRAPH_DB_POOL_SIZE,
+        "connection_acquisition_timeout": Config.GRAPH_DB_ACQUISITION_TIMEOUT_SECONDS,
+        "max_connection_lifetime": Config.GRAPH_DB_MAX_CONNECTION_LIFETIME_SECONDS,
+        "keep_alive": True,
+    }
+
+
+def get_driver(storage_type: str = "neo4j"):
+    """Driver partagé du backend, créé au premier appel (ne pas le fermer: close_drivers à l'arrêt)"""
+    storage_type = storage_type.lower()
+    if storage_type not in BACKENDS:
+        raise ValueError(f"Storage type {storage_type} has no Bolt driver. Use 'neo4j' or 'memgraph'")
+    driver = _drivers.get(storage_type)
+    if driver is not None:
+        return driver
+    with _lock:
+        driver = _drivers.get(storage_type)
+        if driver is None:
+            from neo4j import GraphDatabase
+
+            uri, auth = _connection(storage_type)
+            driver = GraphDatabase.driver(uri, auth=auth, **_driver_config())
+            _drivers[storage_type] = driver
+        return driver
+
+
+def get_async_driver(storage_type: str = "neo4j"):
+    """Driver asyncio partagé (lié à la boucle du worker), mêmes réglages de pool que get_driver"""
+    storage_type = storage_type.lower()
+    if storage_type not in BACKENDS:
+        raise ValueError(f"Storage type {storage_type} has no Bolt driver. Use 'neo4j' or 'memgraph'")
+    driver = _async_drivers.get(storage_type)
+    if driver is None:
+        from neo4j import AsyncGraphDatabase
+
+        uri, auth = _connection(storage_type)
+        driver = AsyncGraphDatabase.driver(uri, auth=auth, **_driver_config())
+        _async_drivers[storage_type] = driver
+    return driver
+
+
+async def reset_async_driver(storage_type: str = "neo4j"):
+    """Ferme le driver asyncio du backend: recréé au prochain get_async_driver"""
+    driver = _async_drivers.pop(storage_type.lower(), None)
+    if driver is not None:
+        try:
+            await driver.close()
+        except Exception:
+            pass
+
+
+def reset_driver(storage_type: str = "neo4j"):
+    """Ferme le driver du backend (connexions mortes, serveur redémarré): recréé au prochain get_driver"""
+    with _lock:
+        driver = _drivers.pop(storage_type.lower(), None)
+    if driver is not None:
+        try:
+            driver.close()
+        except Exception:
+            pass
+
+
+def check_health(storage_type: str = "neo4j", force: bool = False) -> Dict:
+    """
+    Vérifie la connexion (aller-retour Bolt) si le dernier contrôle a plus de
+    GRAPH_DB_HEALTH_CHECK_SECONDS (ou si force); en échec, le backend est marqué non sain
+    (le driver partagé reste ouvert: sessions en cours non interrompues).
+    """
+    storage_type = storage_type.lower()
+    last = _health.get(storage_type)
+    if not force and last is not None and time.time() - last["checked_at"] < Config.GRAPH_DB_HEALTH_CHECK_SECONDS:
+        return last
+    start = time.perf_counter()
+    try:
+        get_driver(storage_type).verify_connectivity()
+        status = {"healthy": True, "error": None}
+    except Exception as e:
+        status = {"healthy": False, "error": str(e)}
+    status["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    status["checked_at"] = time.time()
+    _health[storage_type] = status
+    return status
+
+
+async def check_async_health(storage_type: str = "neo4j") -> Dict:
+    """Même contrôle pour le driver asyncio (depuis sa boucle); en échec, marqué non sain sans être fermé"""
+    storage_type = storage_type.lower()
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(
+            get_async_driver(storage_type).verify_connectivity(), Config.GRAPH_DB_ACQUISITION_TIMEOUT_SECONDS
+        )
+        status = {"healthy": True, "error": None}
+    except Exception as e:
+        status = {"healthy": False, "error": str(e) or type(e).__name__}
+    status["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    status["checked_at"] = time.time()
+    _async_health[storage_type] = status
+    return status
+
+
+async def monitor_health(interval: Optional[float] = None):
+    """
+    Tâche de fond (démarrée avec le serveur): contrôle toutes les interval secondes
+    (GRAPH_DB_HEALTH_CHECK_SECONDS) les drivers ouverts, et eux seuls: un backend non
+    configuré ou jamais utilisé n'est pas sondé (aucun driver créé par le contrôle).
+    Le contrôle bloquant tourne dans un thread: la boucle n'attend jamais le réseau.
+    """
+    interval = interval if interval is not None else Config.GRAPH_DB_HEALTH_CHECK_SECONDS
+    while True:
+        for storage_type in BACKENDS:
+            if storage_type in _drivers:
+                await asyncio.to_thread(check_health, storage_type, True)
+            if storage_type in _async_drivers:
+                await check_async_health(storage_type)
+        await asyncio.sleep(interval)
+
+
+def health_status() -> Dict[str, Dict]:
+    """Derniers résultats de check_health / check_async_health (sans aller-retour réseau), pour /health"""
+    return {
+        storage_type: {
+            **_health.get(storage_type, {}),
+            "pool_size": Config.GRAPH_DB_POOL_SIZE,
+            "connected": storage_type in _drivers,
+            "async_connected": storage_type in _async_drivers,
+            "async": _async_health.get(storage_type),
+        }
+        for storage_type in BACKENDS
+        if storage_type in _health or storage_type in _async_health
+    }
+
+
+async def close_async_drivers():
+    """Ferme les drivers asyncio (arrêt du serveur, depuis la boucle qui les a créés)"""
+    for storage_type in list(_async_drivers):
+        await reset_async_driver(storage_type)
+
+
+def close_drivers():
+    """Ferme tous les drivers partagés (arrêt du serveur)"""
+    with _lock:
+        drivers = list(_drivers.values())
+        _drivers.clear()
+    for driver in drivers:
+        try:
+            driver.close()
+        except Exception:
+            pass
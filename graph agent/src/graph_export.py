@@ -0,0 +1,335 @@
+"""
+Graph Export Module
+Export hors ligne du graphe (wallets, transferts, tokens) en CSV découpés par morceaux,
+pour les backfills de milliers de tokens où même les lots Bolt sont le goulot.
+
+Un dossier d'export contient, par type:
+    <kind>_header.csv   : en-tête au format neo4j-admin (address:ID(Wallet), value:double...)
+    <kind>_00000.csv... : données sans en-tête, au plus chunk_rows lignes par fichier
+    manifest.json       : fichiers et nombre de lignes (reprise d'un export existant)
+
+Les mêmes fichiers servent à:
+    - neo4j-admin database import full (base vide, le plus rapide): voir admin_import_command
+    - LOAD CSV Neo4j / Memgraph (base existante, MERGE idempotent): voir load_export
+
+La mémoire reste constante: chaque graphe est écrit ligne à ligne puis oublié. Les wallets
+présents dans plusieurs tokens sont écrits plusieurs fois (neo4j-admin les ignore avec
+--skip-duplicate-nodes, LOAD CSV les fusionne avec MERGE).
+
+Usage (depuis "graph agent"):
+    python -m src.graph_export command <export_dir> [database]          # commande neo4j-admin
+    python -m src.graph_export load <export_dir> [neo4j|memgraph] [prefix]
+"""
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import networkx as nx
+
+from config import Config
+
+# Colonnes par type de fichier (en-têtes neo4j-admin, même ordre pour LOAD CSV)
+COLUMNS = {
+    "wallets": (
+        "address:ID(Wallet)", "balance:double", "transaction_count:long",
+        "is_top_holder:boolean", "pagerank:double", "is_mixer:boolean",
+    ),
+    "tokens": (
+        "address:ID(Token)", "chain", "wallet_count:long", "transfer_count:long",
+        "mixer_count:long", "wash_trade_pairs:long",
+    ),
+    "transfers": (
+        ":START_ID(Wallet)", ":END_ID(Wallet)", "tokenAddress", "chain",
+        "txHash", "value:double", "count:long",
+    ),
+    "holds": (":START_ID(Wallet)", ":END_ID(Token)"),
+}
+
+# neo4j-admin: --nodes=<Label>=... / --relationships=<TYPE>=...
+NODE_LABELS = {"wallets": "Wallet", "tokens": "Token"}
+RELATIONSHIP_TYPES = {"transfers": "TRANSFERRED", "holds": "HOLDS"}
+
+# LOAD CSV sans en-tête (row[i] suit COLUMNS); mêmes clés MERGE que GraphStorage
+LOAD_CYPHER = {
+    "wallets": """
+MERGE (w:Wallet {address: row[0]})
+ON CREATE SET w.is_top_holder = (row[3] = 'true')
+SET w.balance = toFloat(row[1]),
+    w.transaction_count = toInteger(row[2]),
+    w.pagerank = toFloat(row[4]),
+    w.is_mixer = (row[5] = 'true')
+""",
+    "tokens": """
+MERGE (t:Token {address: row[0]})
+ON CREATE SET t.created_at = timestamp()
+SET t.chain = row[1],
+    t.wallet_count = toInteger(row[2]),
+    t.transfer_count = toInteger(row[3]),
+    t.mixer_count = toInteger(row[4]),
+    t.wash_trade_pairs = toInteger(row[5])
+""",
+    "transfers": """
+MATCH (from:Wallet {address: row[0]})
+MATCH (to:Wallet {address: row[1]})
+MERGE (from)-[t:TRANSFERRED {tokenAddress: row[2], chain: row[3]}]->(to)
+ON CREATE SET t.timestamp = timestamp()
+SET t.txHash = row[4],
+    t.value = toFloat(row[5]),
+    t.count = toInteger(row[6]),
+    t.updated_at = timestamp()
+""",
+    "holds": """
+MATCH (w:Wallet {address: row[0]})
+MATCH (t:Token {address: row[1]})
+MERGE (w)-[:HOLDS]->(t)
+""",
+}
+
+# Nœuds avant relations (les MATCH des relations doivent trouver leurs extrémités)
+LOAD_ORDER = ("wallets", "tokens", "transfers", "holds")
+
+MANIFEST = "manifest.json"
+
+
+def _flag(value) -> str:
+    return "true" if value else "false"
+
+
+class CSVGraphExporter:
+    """
+    Écrit des graphes d'analyse dans un dossier d'export, fichier par fichier de chunk_rows lignes.
+    Reprend un export existant (manifest.json): le dernier fichier incomplet est complété.
+    Un exporter n'est pas partagé entre process; entre threads, passer par export_graph (verrou).
+    """
+
+    def __init__(self, export_dir: str, chunk_rows: Optional[int] = None):
+        self.export_dir = export_dir
+        self.chunk_rows = max(1, chunk_rows or Config.GRAPH_EXPORT_CHUNK_ROWS)
+        os.makedirs(export_dir, exist_ok=True)
+        manifest_path = os.path.join(export_dir, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.files: Dict[str, List[Dict]] = json.load(f)["files"]
+        else:
+            self.files = {kind: [] for kind in COLUMNS}
+        self._handles: Dict[str, Tuple] = {}
+        for kind, columns in COLUMNS.items():
+            with open(os.path.join(export_dir, f"{kind}_header.csv"), "w", newline="") as f:
+                csv.writer(f).writerow(columns)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _writer(self, kind: str):
+        """(fichier, writer, entrée manifest) du fichier en cours pour kind, rotation si plein"""
+        handle = self._handles.get(kind)
+        if handle is not None and handle[2]["rows"] < self.chunk_rows:
+            return handle
+        if handle is not None:
+            handle[0].close()
+        entries = self.files[kind]
+        if entries and entries[-1]["rows"] < self.chunk_rows and handle is None:
+            entry = entries[-1]  # reprise: compléter le dernier fichier
+        else:
+            entry = {"file": f"{kind}_{len(entries):05d}.csv", "rows": 0}
+            entries.append(entry)
+        f = open(os.path.join(self.export_dir, entry["file"]), "a", newline="")
+        handle = (f, csv.writer(f), entry)
+        self._handles[kind] = handle
+        return handle
+
+    def write_rows(self, kind: str, rows: Iterable[Tuple]) -> int:
+        """Écrit des tuples (ordre COLUMNS[kind]), en morceaux pour respecter chunk_rows"""
+        written = 0
+        rows = iter(rows)
+        for first in rows:  # pas de nouveau fichier (vide) s'il ne reste rien à écrire
+            f, writer, entry = self._writer(kind)
+            chunk = [first]
+            chunk.extend(islice(rows, self.chunk_rows - entry["rows"] - 1))
+            writer.writerows(chunk)
+            entry["rows"] += len(chunk)
+            written += len(chunk)
+        return written
+
+    def add_graph(self, graph: nx.DiGraph, token_address: str, analysis_results: Dict) -> Dict[str, int]:
+        """Ajoute un graphe d'analyse (attributs PageRank/mixer inclus); retourne les lignes écrites par type"""
+        token = token_address.lower()
+        metrics = analysis_results.get("metrics", {})
+        chain = str(metrics.get("chain", "ethereum"))
+        pagerank = metrics.get("pagerank", {})
+        mixers = {f["address"] for f in analysis_results.get("mixer_flags", []) if f.get("is_mixer")}
+
+        top_holders = []
+        wallets = []
+        for node_id, data in graph.nodes(data=True):
+            address = str(node_id).lower()
+            is_top_holder = bool(data.get("is_top_holder", False))
+            if is_top_holder:
+                top_holders.append((address, token))
+            wallets.append((
+                address, float(data.get("balance", 0)), int(data.get("transaction_count", 0)),
+                _flag(is_top_holder), float(pagerank.get(node_id, 0)), _flag(node_id in mixers),
+            ))
+
+        transfers = (
+            (str(a).lower(), str(b).lower(), token, chain, str(data.get("tx_hash", "")),
+             float(data.get("weight", 0)), int(data.get("count", 1)))
+            for a, b, data in graph.edges(data=True)
+        )
+        counts = {
+            "wallets": self.write_rows("wallets", wallets),
+            "tokens": self.write_rows("tokens", [(
+                token, chain, graph.number_of_nodes(), graph.number_of_edges(), len(mixers),
+                len(analysis_results.get("wash_trade_pairs", [])),
+            )]),
+            "transfers": self.write_rows("transfers", transfers),
+            "holds": self.write_rows("holds", top_holders),
+        }
+        self.flush()
+        return counts
+
+    def flush(self):
+        """Vide les buffers et écrit le manifest (l'export est lisible après chaque graphe)"""
+        for f, _, _ in self._handles.values():
+            f.flush()
+        tmp_path = os.path.join(self.export_dir, MANIFEST + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"columns": COLUMNS, "files": self.files}, f, indent=1)
+        os.replace(tmp_path, os.path.join(self.export_dir, MANIFEST))
+
+    def close(self):
+        self.flush()
+        for f, _, _ in self._handles.values():
+            f.close()
+        self._handles = {}
+
+
+_export_locks: Dict[str, threading.Lock] = {}
+_export_locks_guard = threading.Lock()
+
+
+def export_graph(graph: nx.DiGraph, token_address: str, analysis_results: Dict,
+                 export_dir: Optional[str] = None) -> Dict[str, int]:
+    """Ajoute un graphe au dossier d'export (défaut GRAPH_EXPORT_DIR), sérialisé par dossier"""
+    export_dir = os.path.abspath(export_dir or Config.GRAPH_EXPORT_DIR)
+    with _export_locks_guard:
+        lock = _export_locks.setdefault(export_dir, threading.Lock())
+    with lock, CSVGraphExporter(export_dir) as exporter:
+        return exporter.add_graph(graph, token_address, analysis_results)
+
+
+def _read_manifest(export_dir: str) -> Dict[str, List[Dict]]:
+    with open(os.path.join(export_dir, MANIFEST)) as f:
+        return json.load(f)["files"]
+
+
+def admin_import_command(export_dir: str, database: str = "neo4j") -> str:
+    """Commande neo4j-admin (Neo4j 5) pour importer l'export dans une base vide"""
+    files = _read_manifest(export_dir)
+    parts = ["neo4j-admin database import full", database, "--skip-duplicate-nodes=true"]
+    for kind, entries in files.items():
+        if not entries:
+            continue
+        paths = [os.path.join(export_dir, f"{kind}_header.csv")]
+        paths += [os.path.join(export_dir, entry["file"]) for entry in entries]
+        option = "--nodes" if kind in NODE_LABELS else "--relationships"
+        label = NODE_LABELS.get(kind) or RELATIONSHIP_TYPES[kind]
+        parts.append(f"{option}={label}=\"{','.join(paths)}\"")
+    return " \\\n  ".join(parts)
+
+
+def load_export(
+    export_dir: str,
+    storage_type: str = "neo4j",
+    driver=None,
+    import_prefix: Optional[str] = None,
+    batch_rows: Optional[int] = None
+) -> Dict:
+    """
+    Charge un export dans une base existante via LOAD CSV (fichier par fichier).
+
+    Args:
+        storage_type: "neo4j" ou "memgraph"
+        driver: driver Bolt existant (sinon créé depuis Config puis fermé)
+        import_prefix: emplacement des fichiers vu par le serveur. Neo4j ne lit que son dossier
+                       import (défaut "file:///": copier l'export dedans); Memgraph lit un chemin
+                       local (défaut: chemin absolu du dossier d'export)
+        batch_rows: lignes par transaction Neo4j (CALL { } IN TRANSACTIONS); Memgraph charge
+                    un fichier par transaction, d'où le découpage en chunk_rows
+    """
+    storage_type = storage_type.lower()
+    if storage_type not in ("neo4j", "memgraph"):
+        raise ValueError(f"Storage type {storage_type} not supported. Use 'neo4j' or 'memgraph'")
+    files = _read_manifest(export_dir)
+    batch_rows = batch_rows or Config.GRAPH_DB_BATCH_SIZE
+    if import_prefix is None:
+        import_prefix = "file:///" if storage_type == "neo4j" else os.path.abspath(export_dir) + "/"
+
+    owns_driver = driver is None
+    if owns_driver:
+        from neo4j import GraphDatabase
+        if storage_type == "neo4j":
+            driver = GraphDatabase.driver(Config.NEO4J_URI, auth=(Config.NEO4J_USER, Config.NEO4J_PASSWORD))
+        elif Config.MEMGRAPH_USER or Config.MEMGRAPH_PASSWORD:
+            driver = GraphDatabase.driver(Config.MEMGRAPH_URI, auth=(Config.MEMGRAPH_USER, Config.MEMGRAPH_PASSWORD))
+        else:
+            driver = GraphDatabase.driver(Config.MEMGRAPH_URI)
+
+    # Index avant chargement (sinon chaque MATCH/MERGE parcourt tous les nœuds)
+    from src.graph_storage import SCHEMA_STATEMENTS
+
+    loaded = {kind: 0 for kind in LOAD_ORDER}
+    start = time.perf_counter()
+    try:
+        with driver.session() as session:
+            for statement in SCHEMA_STATEMENTS[storage_type]:
+                try:
+                    session.run(statement).consume()
+                except Exception:
+                    pass  # Existe déjà
+            for kind in LOAD_ORDER:
+                for entry in files.get(kind, []):
+                    # Chemin en littéral: LOAD CSV Memgraph n'accepte pas de paramètre pour la source
+                    source = json.dumps(import_prefix + entry["file"])
+                    if storage_type == "neo4j":
+                        cypher = (f"LOAD CSV FROM {source} AS row "
+                                  f"CALL {{ WITH row {LOAD_CYPHER[kind]} }} IN TRANSACTIONS OF {int(batch_rows)} ROWS")
+                    else:
+                        cypher = f"LOAD CSV FROM {source} NO HEADER AS row {LOAD_CYPHER[kind]}"
+                    session.run(cypher).consume()
+                    loaded[kind] += entry["rows"]
+                    print(f"  📥 {entry['file']}: {entry['rows']} rows")
+    finally:
+        if owns_driver:
+            driver.close()
+
+    seconds = time.perf_counter() - start
+    rows = sum(loaded.values())
+    return {
+        "storage_type": storage_type,
+        "rows": loaded,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("command", "load"):
+        print("Usage: python -m src.graph_export command <export_dir> [database]")
+        print("       python -m src.graph_export load <export_dir> [neo4j|memgraph] [import_prefix]")
+        sys.exit(1)
+    if sys.argv[1] == "command":
+        print(admin_import_command(sys.argv[2], *sys.argv[3:4]))
+    else:
+        result = load_export(sys.argv[2], *sys.argv[3:5])
+        print(f"✅ {sum(result['rows'].values())} rows loaded in {result['seconds']:.2f}s "
+              f"({result['rows_per_second']:.0f} rows/s)")
@@ -0,0 +1,153 @@
+"""
+Graph Format Module
+Format compact du graphe pour le frontend (graph_format="compact").
+Chaque adresse n'est écrite qu'une fois: les nœuds sont des tableaux parallèles,
+les liens des paires d'indices dans ces tableaux. Les booléens sont regroupés
+dans un champ `flags` (masque de bits).
+
+{
+  "format": "compact",
+  "nodes": {"id": [...], "group": [...], "pagerank": [...], "balance": [...], "flags": [...]},
+  "links": {"source": [i, ...], "target": [j, ...], "value": [...], "count": [...], "flags": [...]}
+}
+Layout précalculé (src/layout.py): colonnes nodes.x / nodes.y (null si non placé).
+Graphe résumé (src/level_of_detail.py): les supernœuds sont marqués NODE_FLAG_SUPERNODE
+et décrits dans "supernodes" {"index": [...], "community_id", "size", "volume", "risk_level"}.
+"""
+from typing import Dict, Iterable, Optional
+
+GRAPH_FORMATS = ("objects", "compact")
+
+# Bits de nodes.flags
+NODE_FLAG_MIXER = 1
+NODE_FLAG_WASH_TRADE = 2   # extrémité d'au moins un lien de wash trading
+NODE_FLAG_SUSPICIOUS = 4   # membre d'un cluster suspect
+NODE_FLAG_SUPERNODE = 8    # communauté repliée (graph_detail="summary")
+
+# Bits de links.flags
+LINK_FLAG_WASH_TRADE = 1
+
+
+def validate_graph_format(graph_format: Optional[str]) -> str:
+    """None = "objects" (format React Force Graph historique). ValueError si inconnu."""
+    graph_format = graph_format or "objects"
+    if graph_format not in GRAPH_FORMATS:
+        raise ValueError(f"Unknown graph_format: {graph_format}. Available: {', '.join(GRAPH_FORMATS)}")
+    return graph_format
+
+
+def compact_graph(graph_data: Dict, suspicious_wallets: Optional[Iterable[str]] = None) -> Dict:
+    """Convertit graph_data (format de format_for_react_force_graph) en format compact"""
+    suspicious = set(suspicious_wallets or ())
+    nodes = graph_data.get("nodes") or []
+    links = graph_data.get("links") or []
+
+    ids = [node["id"] for node in nodes]
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    node_flags = [
+        (NODE_FLAG_MIXER if node.get("is_mixer") else 0)
+        | (NODE_FLAG_SUSPICIOUS if node["id"] in suspicious else 0)
+        | (NODE_FLAG_SUPERNODE if node.get("is_supernode") else 0)
+        for node in nodes
+    ]
+    supernodes = [i for i, node in enumerate(nodes) if node.get("is_supernode")]
+
+    sources, targets, link_flags = [], [], []
+    for link in links:
+        source = index[link["source"]]
+        target = index[link["target"]]
+        sources.append(source)
+        targets.append(target)
+        if link.get("is_wash_trade"):
+            link_flags.append(LINK_FLAG_WASH_TRADE)
+            node_flags[source] |= NODE_FLAG_WASH_TRADE
+            node_flags[target] |= NODE_FLAG_WASH_TRADE
+        else:
+            link_flags.append(0)
+
+    compact = {
+        "format": "compact",
+        "nodes": {
+            "id": ids,
+            "group": [node.get("group", 0) for node in nodes],
+            "pagerank": [node.get("pagerank", 0) for node in nodes],
+            "balance": [node.get("balance", 0) for node in nodes],
+            "flags": node_flags,
+        },
+        "links": {
+            "source": sources,
+            "target": targets,
+            "value": [link.get("value", 0) for link in links],
+            "count": [link.get("count", 1) for link in links],
+            "flags": link_flags,
+        },
+    }
+    if any("x" in node for node in nodes):
+        compact["nodes"]["x"] = [node.get("x") for node in nodes]
+        compact["nodes"]["y"] = [node.get("y") for node in nodes]
+    if supernodes:
+        compact["supernodes"] = {
+            "index": supernodes,
+            **{key: [nodes[i].get(key) for i in supernodes]
+               for key in ("community_id", "size", "volume", "risk_level")},
+        }
+    if "level_of_detail" in graph_data:
+        compact["level_of_detail"] = graph_data["level_of_detail"]
+    return compact
+
+
+def expand_graph(compact: Dict) -> Dict:
+    """Inverse de compact_graph: retour au format {"nodes": [...], "links": [...]}"""
+    nodes, links = compact["nodes"], compact["links"]
+    ids = nodes["id"]
+    expanded = {
+        "nodes": [
+            {
+                "id": node_id,
+                "group": group,
+                "pagerank": pagerank,
+                "is_mixer": bool(flags & NODE_FLAG_MIXER),
+                "balance": balance,
+            }
+            for node_id, group, pagerank, balance, flags in zip(
+                ids, nodes["group"], nodes["pagerank"], nodes["balance"], nodes["flags"]
+            )
+        ],
+        "links": [
+            {
+                "source": ids[source],
+                "target": ids[target],
+                "value": value,
+                "count": count,
+                "is_wash_trade": bool(flags & LINK_FLAG_WASH_TRADE),
+            }
+            for source, target, value, count, flags in zip(
+                links["source"], links["target"], links["value"], links["count"], links["flags"]
+            )
+        ],
+    }
+    if "x" in nodes:
+        for node, x, y in zip(expanded["nodes"], nodes["x"], nodes["y"]):
+            if x is not None:
+                node["x"], node["y"] = x, y
+    supernodes = compact.get("supernodes")
+    if supernodes:
+        for position, i in enumerate(supernodes["index"]):
+            expanded["nodes"][i]["is_supernode"] = True
+            for key in ("community_id", "size", "volume", "risk_level"):
+                expanded["nodes"][i][key] = supernodes[key][position]
+    if "level_of_detail" in compact:
+        expanded["level_of_detail"] = compact["level_of_detail"]
+    return expanded
+
+
+def format_graph(result: Dict, graph_format: str) -> Dict:
+    """Réponse (éventuellement projetée) avec graph_data au format demandé; result n'est pas modifié"""
+    if graph_format == "objects" or not result.get("graph_data"):
+        return result
+    suspicious = (
+        wallet
+        for cluster in result.get("suspicious_clusters") or []
+        for wallet in cluster.get("wallets") or []
+    )
+    return {**result, "graph_data": compact_graph(result["graph_data"], suspicious)}
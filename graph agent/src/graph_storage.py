@@ -1,35 +1,156 @@
 """
 Graph Storage Module
-Optionnel: Sauvegarde le graphe dans Neo4j ou Memgraph pour visualisation locale
+Optionnel: Sauvegarde le graphe dans Neo4j ou Memgraph pour visualisation locale,
+dans le store SQLite embarqué (src/graph_store.py) ou en export CSV (src/graph_export.py)
+Écritures idempotentes (MERGE): un wallet par adresse, une relation TRANSFERRED par
+(from, to, token, chain). En mode "diff", seules les lignes modifiées depuis la dernière
+sauvegarde du token sont envoyées (snapshot local, GRAPH_DB_SNAPSHOT_PATH).
 """
-from typing import Dict, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import networkx as nx
 from config import Config
 
 
+# Lots UNWIND (adresses déjà en minuscules: lookup direct dans l'index)
+WALLETS_CYPHER = """
+UNWIND $nodes AS node
+MERGE (w:Wallet {address: node.address})
+ON CREATE SET w.is_top_holder = node.is_top_holder
+SET w.balance = node.balance,
+    w.transaction_count = node.transaction_count,
+    w.pagerank = node.pagerank,
+    w.is_mixer = node.is_mixer
+RETURN count(w) AS count
+"""
+
+# Une relation par (from, to, token, chain): ré-sauvegarder un token met à jour ses arêtes
+TRANSFERS_CYPHER = """
+UNWIND $edges AS edge
+MATCH (from:Wallet {address: edge.from})
+MATCH (to:Wallet {address: edge.to})
+MERGE (from)-[t:TRANSFERRED {tokenAddress: edge.token_address, chain: edge.chain}]->(to)
+ON CREATE SET t.timestamp = timestamp()
+SET t.txHash = edge.tx_hash,
+    t.value = edge.weight,
+    t.count = edge.count,
+    t.updated_at = timestamp()
+RETURN count(t) AS count
+"""
+
+# Schéma par backend (erreurs ignorées: existe déjà)
+SCHEMA_STATEMENTS = {
+    "neo4j": (
+        "CREATE CONSTRAINT wallet_address IF NOT EXISTS FOR (w:Wallet) REQUIRE w.address IS UNIQUE",
+        "CREATE CONSTRAINT token_address IF NOT EXISTS FOR (t:Token) REQUIRE t.address IS UNIQUE",
+    ),
+    # Memgraph: les contraintes ne créent pas d'index, sans index chaque MATCH parcourt tous les wallets
+    "memgraph": (
+        "CREATE INDEX ON :Wallet(address)",
+        "CREATE INDEX ON :Token(address)",
+        "CREATE CONSTRAINT ON (w:Wallet) ASSERT w.address IS UNIQUE",
+        "CREATE CONSTRAINT ON (t:Token) ASSERT t.address IS UNIQUE",
+    ),
+}
+
+WRITE_MODES = ("diff", "full")
+
+
+def _digest(row: Dict) -> str:
+    return hashlib.blake2b(json.dumps(row, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+class GraphSnapshot:
+    """
+    Dernier état persisté de chaque token (empreinte de chaque ligne wallet/transfert),
+    dans un fichier SQLite local. Scope = base cible + chaîne + token.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.GRAPH_DB_SNAPSHOT_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshot ("
+                " scope TEXT NOT NULL, kind TEXT NOT NULL, key TEXT NOT NULL, digest TEXT NOT NULL,"
+                " PRIMARY KEY (scope, kind, key))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def load(self, scope: str, kind: str) -> Dict[str, str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, digest FROM snapshot WHERE scope = ? AND kind = ?", (scope, kind)
+            ).fetchall()
+        return dict(rows)
+
+    def update(self, scope: str, kind: str, digests: Dict[str, str]):
+        """Enregistre les lignes écrites (appelé seulement après une écriture réussie)"""
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO snapshot (scope, kind, key, digest) VALUES (?, ?, ?, ?)",
+                [(scope, kind, key, digest) for key, digest in digests.items()],
+            )
+
+    def clear(self, scope: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM snapshot WHERE scope = ?", (scope,))
+
+
 class GraphStorage:
     """
     Sauvegarde le graphe dans une base de données graphe (Neo4j ou Memgraph)
     Optionnel - seulement si l'utilisateur le demande
     """
-    
-    def __init__(self, storage_type: str = "neo4j"):
+
+    def __init__(
+        self,
+        storage_type: str = "neo4j",
+        driver=None,
+        batch_size: Optional[int] = None,
+        write_sessions: Optional[int] = None,
+        write_mode: Optional[str] = None,
+        snapshot: Optional[GraphSnapshot] = None
+    ):
         """
         Args:
             storage_type: "neo4j" ou "memgraph"
+            driver: driver Bolt existant (sinon créé puis fermé à chaque sauvegarde)
+            batch_size: lignes par lot UNWIND (défaut GRAPH_DB_BATCH_SIZE)
+            write_sessions: sessions d'écriture en parallèle (défaut GRAPH_DB_WRITE_SESSIONS)
+            write_mode: "diff" (seulement les changements depuis la dernière sauvegarde du token)
+                        ou "full" (tout réécrire, resynchronise le snapshot) - défaut GRAPH_DB_WRITE_MODE
+            snapshot: snapshot local des sauvegardes (défaut: fichier GRAPH_DB_SNAPSHOT_PATH)
         """
         self.storage_type = storage_type.lower()
-        self.driver = None
-        
+        self.driver = driver
+        self.batch_size = max(1, batch_size or Config.GRAPH_DB_BATCH_SIZE)
+        self.write_sessions = max(1, write_sessions or Config.GRAPH_DB_WRITE_SESSIONS)
+        self.write_mode = (write_mode or Config.GRAPH_DB_WRITE_MODE).lower()
+        if self.write_mode not in WRITE_MODES:
+            raise ValueError(f"Write mode {self.write_mode} not supported. Use 'diff' or 'full'")
+        self._snapshot = snapshot
+
     def save_graph(
-        self, 
-        graph: nx.DiGraph, 
+        self,
+        graph: nx.DiGraph,
         token_address: str,
         analysis_results: Dict
     ) -> Dict:
         """
         Sauvegarde le graphe dans la base de données
-        
+
         Returns:
             Dict avec stats de sauvegarde
         """
@@ -37,295 +158,282 @@ class GraphStorage:
             return self._save_to_neo4j(graph, token_address, analysis_results)
         elif self.storage_type == "memgraph":
             return self._save_to_memgraph(graph, token_address, analysis_results)
+        elif self.storage_type == "csv":
+            return self._save_to_csv(graph, token_address, analysis_results)
+        elif self.storage_type == "sqlite":
+            return self._save_to_sqlite(graph, token_address, analysis_results)
         else:
-            raise ValueError(f"Storage type {self.storage_type} not supported. Use 'neo4j' or 'memgraph'")
-    
+            raise ValueError(
+                f"Storage type {self.storage_type} not supported. Use 'neo4j', 'memgraph', 'sqlite' or 'csv'"
+            )
+
+    @property
+    def snapshot(self) -> GraphSnapshot:
+        if self._snapshot is None:
+            self._snapshot = GraphSnapshot()
+        return self._snapshot
+
+    @staticmethod
+    def _node_rows(graph: nx.DiGraph, analysis_results: Dict) -> List[Dict]:
+        """Paramètres des nœuds Wallet (adresses en minuscules)"""
+        pagerank = analysis_results.get("metrics", {}).get("pagerank", {})
+        mixer_flags = {f["address"]: f["is_mixer"] for f in analysis_results.get("mixer_flags", [])}
+        return [
+            {
+                "address": str(node_id).lower(),
+                "balance": float(data.get("balance", 0)),
+                "transaction_count": int(data.get("transaction_count", 0)),
+                "is_top_holder": bool(data.get("is_top_holder", False)),
+                "pagerank": float(pagerank.get(node_id, 0)),
+                "is_mixer": bool(mixer_flags.get(node_id, False))
+            }
+            for node_id, data in graph.nodes(data=True)
+        ]
+
+    @staticmethod
+    def _edge_rows(graph: nx.DiGraph, token_address: str, chain: str) -> List[Dict]:
+        """Paramètres des relations TRANSFERRED (adresses en minuscules)"""
+        return [
+            {
+                "from": str(from_addr).lower(),
+                "to": str(to_addr).lower(),
+                "tx_hash": str(data.get("tx_hash", "")),
+                "weight": float(data.get("weight", 0)),
+                "count": int(data.get("count", 1)),
+                "token_address": token_address.lower(),
+                "chain": chain
+            }
+            for from_addr, to_addr, data in graph.edges(data=True)
+        ]
+
+    @staticmethod
+    def _changed_rows(
+        rows: List[Dict], key_fields: Tuple[str, ...], previous: Dict[str, str]
+    ) -> Tuple[List[Dict], Dict[str, str]]:
+        """Lignes absentes du snapshot ou modifiées, et leurs empreintes"""
+        changed, digests = [], {}
+        for row in rows:
+            key = "|".join(str(row[field]) for field in key_fields)
+            digest = _digest(row)
+            if previous.get(key) != digest:
+                changed.append(row)
+                digests[key] = digest
+        return changed, digests
+
+    @staticmethod
+    def _write_rows(tx, cypher: str, parameter: str, rows: List[Dict]) -> int:
+        return tx.run(cypher, **{parameter: rows}).single()["count"]
+
+    def _write_batches(self, driver, cypher: str, parameter: str, rows: List[Dict]) -> int:
+        """
+        Envoie rows par lots de batch_size (une requête UNWIND par lot).
+        Avec write_sessions > 1, les lots sont répartis sur plusieurs sessions en parallèle;
+        execute_write rejoue les lots en conflit (erreurs transitoires).
+        """
+        batches = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+
+        def write(group: List[List[Dict]]) -> int:
+            written = 0
+            with driver.session() as session:
+                for batch in group:
+                    written += session.execute_write(self._write_rows, cypher, parameter, batch)
+            return written
+
+        sessions = min(self.write_sessions, len(batches))
+        if sessions <= 1:
+            return write(batches)
+        with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="graph-write") as pool:
+            return sum(pool.map(write, [batches[i::sessions] for i in range(sessions)]))
+
     def _save_to_neo4j(
-        self, 
-        graph: nx.DiGraph, 
+        self,
+        graph: nx.DiGraph,
         token_address: str,
         analysis_results: Dict
     ) -> Dict:
         """Sauvegarde dans Neo4j"""
+        # Configuration Neo4j depuis .env ou defaults
+        neo4j_uri = Config.NEO4J_URI if hasattr(Config, 'NEO4J_URI') else "bolt://localhost:7687"
+        neo4j_user = Config.NEO4J_USER if hasattr(Config, 'NEO4J_USER') else "neo4j"
+        neo4j_password = Config.NEO4J_PASSWORD if hasattr(Config, 'NEO4J_PASSWORD') else "neo4j"
+        return self._save(graph, token_address, analysis_results, neo4j_uri, (neo4j_user, neo4j_password))
+
+    def _save_to_memgraph(
+        self,
+        graph: nx.DiGraph,
+        token_address: str,
+        analysis_results: Dict
+    ) -> Dict:
+        """Sauvegarde dans Memgraph (compatible Cypher comme Neo4j mais plus rapide)"""
+        # Memgraph utilise le même protocole Bolt que Neo4j
+        memgraph_uri = Config.MEMGRAPH_URI if hasattr(Config, 'MEMGRAPH_URI') else "bolt://localhost:7687"
+        memgraph_user = Config.MEMGRAPH_USER if hasattr(Config, 'MEMGRAPH_USER') else ""
+        memgraph_password = Config.MEMGRAPH_PASSWORD if hasattr(Config, 'MEMGRAPH_PASSWORD') else ""
+        # Use no-auth when credentials are blank (default Memgraph setup)
+        auth = (memgraph_user, memgraph_password) if (memgraph_user or memgraph_password) else None
+        return self._save(graph, token_address, analysis_results, memgraph_uri, auth)
+
+    def _save_to_csv(
+        self,
+        graph: nx.DiGraph,
+        token_address: str,
+        analysis_results: Dict
+    ) -> Dict:
+        """Ajoute le graphe à l'export CSV (GRAPH_EXPORT_DIR), chargé plus tard par neo4j-admin ou LOAD CSV"""
+        from src.graph_export import export_graph
+
         try:
-            from neo4j import GraphDatabase
-            
-            # Configuration Neo4j depuis .env ou defaults
-            neo4j_uri = Config.NEO4J_URI if hasattr(Config, 'NEO4J_URI') else "bolt://localhost:7687"
-            neo4j_user = Config.NEO4J_USER if hasattr(Config, 'NEO4J_USER') else "neo4j"
-            neo4j_password = Config.NEO4J_PASSWORD if hasattr(Config, 'NEO4J_PASSWORD') else "neo4j"
-            
-            print(f"  💾 Connecting to Neo4j at {neo4j_uri}...")
-            driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
-            driver.verify_connectivity()
-            
-            with driver.session() as session:
-                # Créer constraints
-                try:
-                    session.run("""
-                        CREATE CONSTRAINT wallet_address IF NOT EXISTS 
-                        FOR (w:Wallet) REQUIRE w.address IS UNIQUE
-                    """)
-                    session.run("""
-                        CREATE CONSTRAINT token_address IF NOT EXISTS 
-                        FOR (t:Token) REQUIRE t.address IS UNIQUE
-                    """)
-                except:
-                    pass  # Constraints may already exist
-                
-                # Créer node Token
-                session.run("""
-                    MERGE (t:Token {address: $address})
-                    ON CREATE SET t.created_at = timestamp()
-                """, address=token_address.lower())
-                
-                # Mapper PageRank et autres métriques
-                pagerank = analysis_results.get("metrics", {}).get("pagerank", {})
-                mixer_flags = {f["address"]: f["is_mixer"] for f in analysis_results.get("mixer_flags", [])}
-                
-                # Batch insert nodes et edges
-                batch_size = 500
-                nodes_list = list(graph.nodes(data=True))
-                edges_list = list(graph.edges(data=True))
-                
-                nodes_created = 0
-                relationships_created = 0
-                
-                # Insert nodes
-                for i in range(0, len(nodes_list), batch_size):
-                    batch = nodes_list[i:i + batch_size]
-                    
-                    cypher = """
-                    UNWIND $nodes AS node
-                    MERGE (w:Wallet {address: toLower(node.address)})
-                    ON CREATE SET 
-                        w.balance = node.balance,
-                        w.transaction_count = node.transaction_count,
-                        w.is_top_holder = node.is_top_holder,
-                        w.pagerank = node.pagerank,
-                        w.is_mixer = node.is_mixer
-                    ON MATCH SET
-                        w.balance = node.balance,
-                        w.transaction_count = node.transaction_count,
-                        w.pagerank = node.pagerank,
-                        w.is_mixer = node.is_mixer
-                    RETURN count(w) as count
-                    """
-                    
-                    nodes_data = []
-                    for node_id, data in batch:
-                        nodes_data.append({
-                            "address": str(node_id),
-                            "balance": float(data.get("balance", 0)),
-                            "transaction_count": int(data.get("transaction_count", 0)),
-                            "is_top_holder": bool(data.get("is_top_holder", False)),
-                            "pagerank": float(pagerank.get(node_id, 0)),
-                            "is_mixer": bool(mixer_flags.get(node_id, False))
-                        })
-                    
-                    result = session.run(cypher, nodes=nodes_data)
-                    nodes_created += result.single()["count"]
-                
-                # Insert edges
-                for i in range(0, len(edges_list), batch_size):
-                    batch = edges_list[i:i + batch_size]
-                    
-                    cypher = """
-                    UNWIND $edges AS edge
-                    MATCH (from:Wallet {address: toLower(edge.from)})
-                    MATCH (to:Wallet {address: toLower(edge.to)})
-                    CREATE (from)-[t:TRANSFERRED {
-                        txHash: edge.tx_hash,
-                        value: edge.weight,
-                        count: edge.count,
-                        tokenAddress: edge.token_address,
-                        chain: edge.chain,
-                        timestamp: timestamp()
-                    }]->(to)
-                    RETURN count(t) as count
-                    """
-                    
-                    edges_data = []
-                    for from_addr, to_addr, data in batch:
-                        edges_data.append({
-                            "from": str(from_addr),
-                            "to": str(to_addr),
-                            "tx_hash": str(data.get("tx_hash", "")),
-                            "weight": float(data.get("weight", 0)),
-                            "count": int(data.get("count", 1)),
-                            "token_address": token_address.lower(),
-                            "chain": str(analysis_results.get("metrics", {}).get("chain", "ethereum"))
-                        })
-                    
-                    result = session.run(cypher, edges=edges_data)
-                    relationships_created += result.consume().counters.relationships_created
-                
-                # Lier Token aux wallets
-                session.run("""
-                    MATCH (t:Token {address: $token_address})
-                    MATCH (w:Wallet)
-                    WHERE w.is_top_holder = true
-                    MERGE (w)-[:HOLDS]->(t)
-                """, token_address=token_address.lower())
-                
-                # Stats finales
-                stats = session.run("""
-                    MATCH (w:Wallet)
-                    WITH count(w) as wallet_count
-                    MATCH ()-[t:TRANSFERRED]->()
-                    RETURN wallet_count, count(t) as transfer_count
-                """).single()
-                
-                driver.close()
-                
-                return {
-                    "success": True,
-                    "storage_type": "neo4j",
-                    "nodes_created": nodes_created,
-                    "relationships_created": relationships_created,
-                    "total_wallets": stats["wallet_count"],
-                    "total_transfers": stats["transfer_count"],
-                    "uri": neo4j_uri
-                }
-                
-        except ImportError:
+            write_start = time.perf_counter()
+            rows = export_graph(graph, token_address, analysis_results)
+            write_seconds = time.perf_counter() - write_start
+            total = sum(rows.values())
             return {
-                "success": False,
-                "error": "Neo4j driver not installed. Run: pip install neo4j"
+                "success": True,
+                "storage_type": "csv",
+                "export_dir": os.path.abspath(Config.GRAPH_EXPORT_DIR),
+                "nodes_created": rows["wallets"],
+                "relationships_created": rows["transfers"],
+                "rows": rows,
+                "write_seconds": round(write_seconds, 3),
+                "rows_per_second": round(total / write_seconds, 1) if write_seconds > 0 else 0.0,
             }
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e)
             }
-    
-    def _save_to_memgraph(
-        self, 
-        graph: nx.DiGraph, 
+
+    def _save_to_sqlite(
+        self,
+        graph: nx.DiGraph,
         token_address: str,
         analysis_results: Dict
     ) -> Dict:
-        """Sauvegarde dans Memgraph (compatible Cypher comme Neo4j mais plus rapide)"""
+        """Sauvegarde dans le store SQLite embarqué (GRAPH_STORE_SQLITE_PATH), sans serveur"""
+        from src.graph_store import get_graph_store
+
+        try:
+            store = get_graph_store()
+            written = store.save_graph(graph, token_address, analysis_results)
+            print(f"  💾 SQLite: {written['wallets']} wallets + {written['transfers']} transfers "
+                  f"upserted in {written['write_seconds']:.3f}s")
+            return {
+                "success": True,
+                "storage_type": "sqlite",
+                "nodes_created": written["wallets"],
+                "relationships_created": written["transfers"],
+                "write_seconds": written["write_seconds"],
+                "rows_per_second": written["rows_per_second"],
+                "path": store.path,
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    def _save(
+        self,
+        graph: nx.DiGraph,
+        token_address: str,
+        analysis_results: Dict,
+        uri: str,
+        auth: Optional[Tuple[str, str]]
+    ) -> Dict:
+        """Même pipeline pour Neo4j et Memgraph (même driver Bolt, même Cypher)"""
+        name = "Neo4j" if self.storage_type == "neo4j" else "Memgraph"
         try:
             from neo4j import GraphDatabase  # Memgraph utilise le même driver Neo4j
-            
-            # Memgraph utilise le même protocole Bolt que Neo4j
-            memgraph_uri = Config.MEMGRAPH_URI if hasattr(Config, 'MEMGRAPH_URI') else "bolt://localhost:7687"
-            memgraph_user = Config.MEMGRAPH_USER if hasattr(Config, 'MEMGRAPH_USER') else ""
-            memgraph_password = Config.MEMGRAPH_PASSWORD if hasattr(Config, 'MEMGRAPH_PASSWORD') else ""
-            
-            print(f"  💾 Connecting to Memgraph at {memgraph_uri}...")
-            # Use no-auth when credentials are blank (default Memgraph setup)
-            if (memgraph_user or memgraph_password):
-                driver = GraphDatabase.driver(memgraph_uri, auth=(memgraph_user, memgraph_password))
+
+            print(f"  💾 Connecting to {name} at {uri}...")
+            if self.driver is not None:
+                driver = self.driver  # Driver fourni par l'appelant (benchmark, pool)
+            elif auth is not None:
+                driver = GraphDatabase.driver(uri, auth=auth)
             else:
-                driver = GraphDatabase.driver(memgraph_uri)
+                driver = GraphDatabase.driver(uri)
             driver.verify_connectivity()
-            
-            # Memgraph utilise le même Cypher que Neo4j, donc même code
-            # Mais généralement plus rapide pour les insertions
+
             with driver.session() as session:
-                # Créer constraints (Memgraph supporte aussi)
-                try:
-                    session.run("""
-                        CREATE CONSTRAINT ON (w:Wallet) ASSERT w.address IS UNIQUE
-                    """)
-                    session.run("""
-                        CREATE CONSTRAINT ON (t:Token) ASSERT t.address IS UNIQUE
-                    """)
-                except:
-                    pass
-                
-                # Même logique que Neo4j
-                pagerank = analysis_results.get("metrics", {}).get("pagerank", {})
-                mixer_flags = {f["address"]: f["is_mixer"] for f in analysis_results.get("mixer_flags", [])}
-                
+                for statement in SCHEMA_STATEMENTS[self.storage_type]:
+                    try:
+                        session.run(statement).consume()
+                    except Exception:
+                        pass  # Existe déjà
+
                 # Token node
                 session.run("""
                     MERGE (t:Token {address: $address})
                     ON CREATE SET t.created_at = timestamp()
-                """, address=token_address.lower())
-                
-                # Nodes (batch pour performance)
-                nodes_list = list(graph.nodes(data=True))
-                batch_size = 100
-                for i in range(0, len(nodes_list), batch_size):
-                    batch = nodes_list[i:i + batch_size]
-                    for node_id, data in batch:
-                        session.run("""
-                            MERGE (w:Wallet {address: toLower($address)})
-                            ON CREATE SET 
-                                w.balance = $balance,
-                                w.transaction_count = $tx_count,
-                                w.is_top_holder = $is_top,
-                                w.pagerank = $pagerank,
-                                w.is_mixer = $is_mixer
-                            ON MATCH SET
-                                w.balance = $balance,
-                                w.pagerank = $pagerank,
-                                w.is_mixer = $is_mixer
-                        """, 
-                            address=str(node_id),
-                            balance=float(data.get("balance", 0)),
-                            tx_count=int(data.get("transaction_count", 0)),
-                            is_top=bool(data.get("is_top_holder", False)),
-                            pagerank=float(pagerank.get(node_id, 0)),
-                            is_mixer=bool(mixer_flags.get(node_id, False))
-                        )
-                
-                # Edges (batch pour performance)
-                edges_list = list(graph.edges(data=True))
-                batch_size = 100
-                for i in range(0, len(edges_list), batch_size):
-                    batch = edges_list[i:i + batch_size]
-                    for from_addr, to_addr, data in batch:
-                        session.run("""
-                            MATCH (from:Wallet {address: toLower($from_addr)})
-                            MATCH (to:Wallet {address: toLower($to_addr)})
-                            CREATE (from)-[t:TRANSFERRED {
-                                txHash: $tx_hash,
-                                value: $weight,
-                                count: $count,
-                                tokenAddress: $token_address,
-                                chain: $chain,
-                                timestamp: timestamp()
-                            }]->(to)
-                        """,
-                            from_addr=str(from_addr),
-                            to_addr=str(to_addr),
-                            tx_hash=str(data.get("tx_hash", "")),
-                            weight=float(data.get("weight", 0)),
-                            count=int(data.get("count", 1)),
-                            token_address=token_address.lower(),
-                            chain=str(analysis_results.get("metrics", {}).get("chain", "ethereum"))
-                        )
-                
-                # Link Token
+                """, address=token_address.lower()).consume()
+
+            chain = str(analysis_results.get("metrics", {}).get("chain", "ethereum"))
+            node_rows = self._node_rows(graph, analysis_results)
+            edge_rows = self._edge_rows(graph, token_address, chain)
+
+            # Mode diff: seulement ce qui a changé depuis la dernière sauvegarde de ce token
+            scope = f"{self.storage_type}:{uri}:{chain}:{token_address.lower()}"
+            if self.write_mode == "full":
+                self.snapshot.clear(scope)
+                previous_nodes, previous_edges = {}, {}
+            else:
+                previous_nodes = self.snapshot.load(scope, "wallet")
+                previous_edges = self.snapshot.load(scope, "transfer")
+            nodes_to_write, node_digests = self._changed_rows(node_rows, ("address",), previous_nodes)
+            edges_to_write, edge_digests = self._changed_rows(edge_rows, ("from", "to"), previous_edges)
+
+            # Nodes puis edges: lots UNWIND paramétrés (une requête par lot, pas par ligne)
+            write_start = time.perf_counter()
+            nodes_written = self._write_batches(driver, WALLETS_CYPHER, "nodes", nodes_to_write)
+            relationships_written = self._write_batches(driver, TRANSFERS_CYPHER, "edges", edges_to_write)
+            write_seconds = time.perf_counter() - write_start
+            self.snapshot.update(scope, "wallet", node_digests)
+            self.snapshot.update(scope, "transfer", edge_digests)
+
+            rows = len(nodes_to_write) + len(edges_to_write)
+            rows_per_second = rows / write_seconds if write_seconds > 0 else 0.0
+            print(f"  💾 {name}: {len(nodes_to_write)}/{len(node_rows)} nodes + "
+                  f"{len(edges_to_write)}/{len(edge_rows)} edges written in {write_seconds:.2f}s "
+                  f"({rows_per_second:.0f} rows/s, {self.write_mode} mode, batch {self.batch_size}, "
+                  f"{self.write_sessions} session(s))")
+
+            with driver.session() as session:
+                # Lier Token aux wallets
                 session.run("""
                     MATCH (t:Token {address: $token_address})
                     MATCH (w:Wallet)
                     WHERE w.is_top_holder = true
                     MERGE (w)-[:HOLDS]->(t)
-                """, token_address=token_address.lower())
-                
-                # Stats
+                """, token_address=token_address.lower()).consume()
+
+                # Stats finales
                 stats = session.run("""
                     MATCH (w:Wallet)
                     WITH count(w) as wallet_count
                     MATCH ()-[t:TRANSFERRED]->()
                     RETURN wallet_count, count(t) as transfer_count
                 """).single()
-                
+
+            if self.driver is None:
                 driver.close()
-                
-                return {
-                    "success": True,
-                    "storage_type": "memgraph",
-                    "total_wallets": stats["wallet_count"],
-                    "total_transfers": stats["transfer_count"],
-                    "uri": memgraph_uri
-                }
-                
+
+            return {
+                "success": True,
+                "storage_type": self.storage_type,
+                "write_mode": self.write_mode,
+                "nodes_created": nodes_written,
+                "relationships_created": relationships_written,
+                "nodes_unchanged": len(node_rows) - len(nodes_to_write),
+                "relationships_unchanged": len(edge_rows) - len(edges_to_write),
+                "total_wallets": stats["wallet_count"],
+                "total_transfers": stats["transfer_count"],
+                "write_seconds": round(write_seconds, 3),
+                "rows_per_second": round(rows_per_second, 1),
+                "batch_size": self.batch_size,
+                "write_sessions": self.write_sessions,
+                "uri": uri
+            }
+
         except ImportError:
             return {
                 "success": False,
@@ -336,4 +444,3 @@ class GraphStorage:
                 "success": False,
                 "error": str(e)
             }
-
@@ -0,0 +1,287 @@
+"""
+Graph Store Module
+Stockage graphe embarqué (SQLite, dans le process): alternative à Neo4j/Memgraph pour les
+nœuds qui n'en ont pas. Assez rapide pour être alimenté à chaque analyse (GRAPH_STORE_AUTO_SAVE).
+
+Tables:
+    wallets       : un wallet par adresse (attributs globaux, dernière valeur connue)
+    token_wallets : attributs d'un wallet pour un token (balance, PageRank, top holder, mixer)
+    transfers     : une ligne par (from, to, token, chain), mise à jour en place (upsert)
+    analyses      : historique des analyses d'un token (score, gini, tailles)
+
+Requêtes indexées: voisinage d'un wallet (entrant/sortant), top-k wallets d'un token,
+plus gros transferts d'un token, historique des analyses.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import networkx as nx
+
+from config import Config
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS wallets (
+        address TEXT PRIMARY KEY,
+        balance REAL NOT NULL DEFAULT 0,
+        transaction_count INTEGER NOT NULL DEFAULT 0,
+        is_mixer INTEGER NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS token_wallets (
+        token_address TEXT NOT NULL,
+        chain TEXT NOT NULL,
+        address TEXT NOT NULL,
+        balance REAL NOT NULL DEFAULT 0,
+        pagerank REAL NOT NULL DEFAULT 0,
+        is_top_holder INTEGER NOT NULL DEFAULT 0,
+        is_mixer INTEGER NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (token_address, chain, address)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS transfers (
+        from_address TEXT NOT NULL,
+        to_address TEXT NOT NULL,
+        token_address TEXT NOT NULL,
+        chain TEXT NOT NULL,
+        tx_hash TEXT,
+        value REAL NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 1,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (from_address, to_address, token_address, chain)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS analyses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        token_address TEXT NOT NULL,
+        chain TEXT NOT NULL,
+        analyzed_at REAL NOT NULL,
+        risk_score REAL,
+        gini REAL,
+        wallet_count INTEGER NOT NULL,
+        transfer_count INTEGER NOT NULL,
+        mixer_count INTEGER NOT NULL,
+        wash_trade_pairs INTEGER NOT NULL,
+        suspicious_clusters INTEGER NOT NULL
+    )""",
+    # Voisinage entrant (le sortant utilise la clé primaire), top-k et transferts par token, historique
+    "CREATE INDEX IF NOT EXISTS transfers_to ON transfers(to_address, token_address)",
+    "CREATE INDEX IF NOT EXISTS transfers_token_value ON transfers(token_address, chain, value DESC)",
+    "CREATE INDEX IF NOT EXISTS token_wallets_pagerank ON token_wallets(token_address, chain, pagerank DESC)",
+    "CREATE INDEX IF NOT EXISTS token_wallets_balance ON token_wallets(token_address, chain, balance DESC)",
+    "CREATE INDEX IF NOT EXISTS token_wallets_address ON token_wallets(address)",
+    "CREATE INDEX IF NOT EXISTS analyses_token ON analyses(token_address, chain, analyzed_at DESC)",
+)
+
+UPSERT_WALLET = """
+INSERT INTO wallets (address, balance, transaction_count, is_mixer, updated_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (address) DO UPDATE SET
+    balance = excluded.balance,
+    transaction_count = excluded.transaction_count,
+    is_mixer = MAX(wallets.is_mixer, excluded.is_mixer),
+    updated_at = excluded.updated_at
+"""
+
+UPSERT_TOKEN_WALLET = """
+INSERT INTO token_wallets (token_address, chain, address, balance, pagerank, is_top_holder, is_mixer, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (token_address, chain, address) DO UPDATE SET
+    balance = excluded.balance,
+    pagerank = excluded.pagerank,
+    is_top_holder = excluded.is_top_holder,
+    is_mixer = excluded.is_mixer,
+    updated_at = excluded.updated_at
+"""
+
+UPSERT_TRANSFER = """
+INSERT INTO transfers (from_address, to_address, token_address, chain, tx_hash, value, count, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (from_address, to_address, token_address, chain) DO UPDATE SET
+    tx_hash = excluded.tx_hash,
+    value = excluded.value,
+    count = excluded.count,
+    updated_at = excluded.updated_at
+"""
+
+TOP_WALLET_ORDER = {"pagerank": "pagerank", "balance": "balance"}
+
+
+class SQLiteGraphStore:
+    """
+    Graphe wallets/transferts dans un fichier SQLite en mode WAL.
+    Une connexion par thread (et par process); une transaction par sauvegarde.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.GRAPH_STORE_SQLITE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connect()
+        for statement in SCHEMA:
+            conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _query(self, sql: str, params=()) -> List[Dict]:
+        return [dict(row) for row in self._connect().execute(sql, params)]
+
+    def save_graph(self, graph: nx.DiGraph, token_address: str, analysis_results: Dict) -> Dict:
+        """Upsert des wallets/transferts du graphe + une ligne d'historique, en une transaction"""
+        token = token_address.lower()
+        metrics = analysis_results.get("metrics", {})
+        chain = str(metrics.get("chain", "ethereum"))
+        pagerank = metrics.get("pagerank", {})
+        mixers = {f["address"] for f in analysis_results.get("mixer_flags", []) if f.get("is_mixer")}
+        now = time.time()
+
+        wallets, token_wallets = [], []
+        for node_id, data in graph.nodes(data=True):
+            address = str(node_id).lower()
+            balance = float(data.get("balance", 0))
+            is_mixer = int(node_id in mixers)
+            wallets.append((address, balance, int(data.get("transaction_count", 0)), is_mixer, now))
+            token_wallets.append((
+                token, chain, address, balance, float(pagerank.get(node_id, 0)),
+                int(bool(data.get("is_top_holder", False))), is_mixer, now,
+            ))
+        transfers = [
+            (str(a).lower(), str(b).lower(), token, chain, str(data.get("tx_hash", "")),
+             float(data.get("weight", 0)), int(data.get("count", 1)), now)
+            for a, b, data in graph.edges(data=True)
+        ]
+
+        start = time.perf_counter()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(UPSERT_WALLET, wallets)
+            conn.executemany(UPSERT_TOKEN_WALLET, token_wallets)
+            conn.executemany(UPSERT_TRANSFER, transfers)
+            cursor = conn.execute(
+                "INSERT INTO analyses (token_address, chain, analyzed_at, risk_score, gini, wallet_count,"
+                " transfer_count, mixer_count, wash_trade_pairs, suspicious_clusters)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    token, chain, now, analysis_results.get("risk_score"), metrics.get("gini"),
+                    len(wallets), len(transfers), len(mixers),
+                    len(analysis_results.get("wash_trade_pairs", [])),
+                    len(analysis_results.get("suspicious_clusters", [])),
+                ),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        write_seconds = time.perf_counter() - start
+        rows = len(wallets) + len(token_wallets) + len(transfers)
+        return {
+            "analysis_row_id": cursor.lastrowid,
+            "wallets": len(wallets),
+            "transfers": len(transfers),
+            "write_seconds": round(write_seconds, 4),
+            "rows_per_second": round(rows / write_seconds, 1) if write_seconds > 0 else 0.0,
+        }
+
+    def neighbours(self, address: str, direction: str = "both", token_address: Optional[str] = None,
+                   limit: int = 100) -> List[Dict]:
+        """Transferts autour d'un wallet (direction "out" | "in" | "both"), plus gros montants d'abord"""
+        if direction not in ("out", "in", "both"):
+            raise ValueError("direction must be 'out', 'in' or 'both'")
+        address = address.lower()
+        token_filter = " AND token_address = ?" if token_address else ""
+        token_params = (token_address.lower(),) if token_address else ()
+        parts, params = [], []
+        if direction in ("out", "both"):
+            parts.append(
+                "SELECT 'out' AS direction, to_address AS address, token_address, chain, value, count, tx_hash"
+                f" FROM transfers WHERE from_address = ?{token_filter}"
+            )
+            params += [address, *token_params]
+        if direction in ("in", "both"):
+            parts.append(
+                "SELECT 'in' AS direction, from_address AS address, token_address, chain, value, count, tx_hash"
+                f" FROM transfers WHERE to_address = ?{token_filter}"
+            )
+            params += [address, *token_params]
+        sql = " UNION ALL ".join(parts) + " ORDER BY value DESC LIMIT ?"
+        return self._query(sql, (*params, int(limit)))
+
+    def top_wallets(self, token_address: str, chain: str = "ethereum", by: str = "pagerank",
+                    k: int = 20) -> List[Dict]:
+        """Top-k wallets d'un token par PageRank ou balance"""
+        order = TOP_WALLET_ORDER.get(by)
+        if order is None:
+            raise ValueError(f"by must be one of {sorted(TOP_WALLET_ORDER)}")
+        return self._query(
+            "SELECT address, balance, pagerank, is_top_holder, is_mixer FROM token_wallets"
+            f" WHERE token_address = ? AND chain = ? ORDER BY {order} DESC LIMIT ?",
+            (token_address.lower(), chain, int(k)),
+        )
+
+    def token_transfers(self, token_address: str, chain: str = "ethereum", min_value: float = 0,
+                        limit: int = 100) -> List[Dict]:
+        """Plus gros transferts agrégés d'un token"""
+        return self._query(
+            "SELECT from_address, to_address, value, count, tx_hash FROM transfers"
+            " WHERE token_address = ? AND chain = ? AND value >= ? ORDER BY value DESC LIMIT ?",
+            (token_address.lower(), chain, float(min_value), int(limit)),
+        )
+
+    def analysis_history(self, token_address: str, chain: str = "ethereum", limit: int = 50) -> List[Dict]:
+        """Analyses passées d'un token, plus récentes d'abord"""
+        return self._query(
+            "SELECT analyzed_at, risk_score, gini, wallet_count, transfer_count, mixer_count,"
+            " wash_trade_pairs, suspicious_clusters FROM analyses"
+            " WHERE token_address = ? AND chain = ? ORDER BY analyzed_at DESC LIMIT ?",
+            (token_address.lower(), chain, int(limit)),
+        )
+
+    def wallet(self, address: str) -> Optional[Dict]:
+        """Attributs d'un wallet et tokens dans lesquels il apparaît"""
+        address = address.lower()
+        rows = self._query("SELECT * FROM wallets WHERE address = ?", (address,))
+        if not rows:
+            return None
+        wallet = rows[0]
+        wallet["tokens"] = self._query(
+            "SELECT token_address, chain, balance, pagerank, is_top_holder, is_mixer FROM token_wallets"
+            " WHERE address = ? ORDER BY pagerank DESC",
+            (address,),
+        )
+        return wallet
+
+    def stats(self) -> Dict:
+        conn = self._connect()
+        counts = {
+            table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+            for table in ("wallets", "transfers", "analyses")
+        }
+        counts["path"] = self.path
+        return counts
+
+
+_store: Optional[SQLiteGraphStore] = None
+_store_lock = threading.Lock()
+
+
+def get_graph_store() -> SQLiteGraphStore:
+    """Store partagé par le process (créé au premier appel)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SQLiteGraphStore()
+    return _store
@@ -0,0 +1,182 @@
+"""
+Jobs Module
+Analyses asynchrones: POST /jobs retourne immédiatement un identifiant,
+le pipeline tourne en tâche de fond et GET /jobs/{id} expose l'avancement puis le résultat.
+Nombre de jobs en attente ou en cours borné (JOB_MAX_PENDING): au-delà, refus immédiat (503).
+Avec un store partagé (CACHE_BACKEND=sqlite), l'état de chaque job y est écrit à chaque
+changement de statut: GET /jobs/{id} répond depuis n'importe quel worker uvicorn.
+"""
+import asyncio
+import math
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config import Config
+from src.progress import AnalysisProgress
+
+
+class JobRejected(Exception):
+    """Trop de jobs en attente: le job n'est pas créé (503), retry_after en secondes"""
+
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = 503
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AnalysisJob:
+    """Une analyse en tâche de fond"""
+
+    def __init__(self, job_id: str, params: Dict):
+        self.id = job_id
+        self.params = params
+        self.status = "queued"  # queued | running | done | failed
+        self.progress = AnalysisProgress()
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[Dict] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "progress": self.progress.snapshot(),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        if include_result and self.result is not None:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """
+    Registre des jobs en mémoire (par process).
+    - concurrence bornée (JOB_MAX_CONCURRENCY jobs exécutés en même temps)
+    - au plus JOB_MAX_PENDING jobs en attente ou en cours (au-delà: JobRejected)
+    - résultats conservés JOB_RESULT_TTL_SECONDS après la fin, puis purgés
+    - store (optionnel, cache partagé src/cache.py): copie de l'état de chaque job, lue par
+      lookup() quand le job tourne dans un autre process (bornes et annulation: par process)
+    """
+
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, max_concurrency: Optional[int] = None, result_ttl: Optional[float] = None,
+                 max_pending: Optional[int] = None, store: Optional[Any] = None):
+        self.max_concurrency = max_concurrency or Config.JOB_MAX_CONCURRENCY
+        self.result_ttl = result_ttl if result_ttl is not None else Config.JOB_RESULT_TTL_SECONDS
+        self.max_pending = max_pending or Config.JOB_MAX_PENDING
+        self.store = store
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+        # Durée moyenne d'un job (EWMA), pour le Retry-After des refus
+        self.service_seconds = Config.ADMISSION_INITIAL_SERVICE_SECONDS
+        self.rejected = 0
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(
+        self,
+        params: Dict,
+        runner: Callable[[AnalysisProgress], Awaitable[Dict]],
+        error_handler: Optional[Callable[[Exception], Dict]] = None,
+    ) -> AnalysisJob:
+        """
+        Crée un job et lance runner(progress) en tâche de fond.
+        runner retourne le résultat (dict sérialisable); error_handler convertit une exception en dict.
+        """
+        self._purge_expired()
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            # Jobs devant celui-ci, servis max_concurrency à la fois
+            retry_after = max(1, math.ceil(self._pending / self.max_concurrency * self.service_seconds))
+            raise JobRejected(f"Too many pending jobs ({self._pending}), retry later", retry_after)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        job = AnalysisJob(uuid.uuid4().hex, params)
+        self._jobs[job.id] = job
+        self._pending += 1
+
+        async def run():
+            try:
+                await self._save(job)
+                async with self._semaphore:
+                    job.status = "running"
+                    job.started_at = time.time()
+                    await self._save(job)
+                    job.result = await runner(job.progress)
+                    self.service_seconds += self.EWMA_ALPHA * (time.time() - job.started_at - self.service_seconds)
+                job.status = "done"
+                job.progress.finish("done")
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = {"detail": "cancelled"}
+                job.progress.finish("cancelled")
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = error_handler(e) if error_handler else {"detail": str(e)}
+                job.progress.finish("failed")
+            finally:
+                job.finished_at = time.time()
+                self._pending -= 1
+                await asyncio.shield(self._save(job))
+
+        job.task = asyncio.create_task(run())
+        return job
+
+    async def _save(self, job: AnalysisJob):
+        """Copie de l'état du job dans le store partagé (hors boucle: écriture SQLite)"""
+        if self.store is None:
+            return
+        try:
+            await asyncio.to_thread(self.store.set, job.id, job.to_dict())
+        except Exception as e:
+            print(f"  ⚠️ Job store write failed ({job.id}): {e}")
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    async def lookup(self, job_id: str) -> Optional[Dict]:
+        """État d'un job (to_dict): registre local, sinon store partagé (job d'un autre worker)"""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.store is None:
+            return None
+        data, _ = await asyncio.to_thread(self.store.get, job_id)
+        return data
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.task is None or job.task.done():
+            return False
+        job.task.cancel()
+        return True
+
+    def stats(self) -> Dict:
+        return {
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "max_concurrency": self.max_concurrency,
+            "service_seconds": round(self.service_seconds, 3),
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,454 @@
+"""
+Label Registry Module
+Registre d'adresses étiquetées (mixers, sanctions, CEX, DEX routers...)
+stocké dans un fichier binaire mappé en mémoire (mmap).
+
+Format du fichier (little-endian):
+    header  : magic b"BSLR" | version uint16 | reserved uint16 | count uint64
+    prefix  : count x uint64 (8 premiers octets de l'adresse, big-endian -> entier)
+    address : count x 20 octets, triés (ordre binaire)
+    padding : jusqu'à un multiple de 8 octets
+    labels  : count x uint32 (bitmask de labels)
+
+La recherche dichotomique se fait sur la colonne prefix (comparaisons entières,
+bien plus rapides que sur des chaînes de 20 octets), puis l'adresse complète est vérifiée.
+
+Le fichier n'est jamais lu entièrement: les pages sont chargées à la demande
+par l'OS et partagées entre tous les workers qui mappent le même fichier.
+"""
+import csv
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import Config
+
+
+# Bitmask des labels (un wallet peut cumuler plusieurs labels)
+LABEL_MIXER = 1 << 0
+LABEL_SANCTIONED = 1 << 1
+LABEL_PROTOCOL = 1 << 2
+LABEL_DEX_ROUTER = 1 << 3
+LABEL_CEX = 1 << 4
+
+LABEL_NAMES = {
+    LABEL_MIXER: "mixer",
+    LABEL_SANCTIONED: "sanctioned",
+    LABEL_PROTOCOL: "protocol",
+    LABEL_DEX_ROUTER: "dex_router",
+    LABEL_CEX: "cex",
+}
+LABEL_CODES = {name: code for code, name in LABEL_NAMES.items()}
+
+# Adresses légitimes à exclure de la détection de wash trading
+WHITELIST_MASK = LABEL_PROTOCOL | LABEL_DEX_ROUTER | LABEL_CEX
+
+_MAGIC = b"BSLR"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHQ")
+# Au-delà de cette taille de table, les requêtes sont triées avant la recherche
+_SORT_THRESHOLD = 1 << 16
+
+# Table de conversion ASCII -> nibble (255 = caractère invalide)
+_HEX_LUT = np.full(256, 255, dtype=np.uint8)
+for _i, _c in enumerate(b"0123456789abcdef"):
+    _HEX_LUT[_c] = _i
+for _i, _c in enumerate(b"ABCDEF"):
+    _HEX_LUT[_c] = 10 + _i
+
+
+def encode_addresses(addresses: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convertit des adresses hex "0x..." en tableau numpy de clés binaires (dtype S20).
+    Conversion vectorisée (pas de bytes.fromhex par adresse).
+    Retourne (keys, valid) où valid marque les adresses bien formées.
+    """
+    n = len(addresses)
+    if n == 0:
+        return np.empty(0, dtype="S20"), np.empty(0, dtype=bool)
+    if all(isinstance(a, str) and len(a) == 42 for a in addresses):
+        # Chemin rapide: un seul bytes.fromhex sur toutes les adresses concaténées
+        try:
+            chars = np.frombuffer("".join(addresses).encode("ascii"), dtype=np.uint8).reshape(n, 42)
+            if (chars[:, 0] == ord("0")).all() and ((chars[:, 1] | 0x20) == ord("x")).all():
+                body = np.ascontiguousarray(chars[:, 2:]).tobytes().decode("ascii")
+                keys = np.frombuffer(bytes.fromhex(body), dtype="S20")
+                return keys, np.ones(n, dtype=bool)
+        except (UnicodeEncodeError, ValueError):
+            pass
+    # Chemin générique: décodage par table, les adresses mal formées sont marquées invalides
+    # (longueur != 42 -> b"": S42 tronquerait silencieusement une adresse trop longue)
+    raw = np.array(
+        [a.encode("ascii", "replace") if isinstance(a, str) and len(a) == 42 else b"" for a in addresses],
+        dtype="S42",
+    )
+    chars = raw.view(np.uint8).reshape(n, 42)
+    nibbles = _HEX_LUT[chars[:, 2:]]
+    valid = (
+        (chars[:, 0] == ord("0"))
+        & ((chars[:, 1] == ord("x")) | (chars[:, 1] == ord("X")))
+        & (nibbles != 255).all(axis=1)
+    )
+    packed = (nibbles[:, 0::2] << 4) | (nibbles[:, 1::2] & 0x0F)
+    keys = np.ascontiguousarray(packed, dtype=np.uint8).view("S20").ravel()
+    return keys, valid
+
+
+def _prefixes(keys: np.ndarray) -> np.ndarray:
+    """8 premiers octets de chaque clé, en entier non signé (préserve l'ordre binaire)"""
+    if len(keys) == 0:
+        return np.empty(0, dtype=np.uint64)
+    raw = keys.view(np.uint8).reshape(len(keys), 20)[:, :8]
+    return np.ascontiguousarray(raw).view(">u8").ravel().astype(np.uint64)
+
+
+def label_names(code: int) -> List[str]:
+    """Retourne les noms de labels contenus dans un bitmask"""
+    return [name for bit, name in LABEL_NAMES.items() if code & bit]
+
+
+def write_label_file(path: str, entries: Iterable[Tuple[str, int]]) -> int:
+    """
+    Écrit un fichier de labels trié.
+    entries: itérable de (adresse, bitmask). Les doublons sont fusionnés (OR).
+    L'écriture passe par un fichier temporaire + os.replace (atomique):
+    les lecteurs qui ont déjà mappé l'ancien fichier ne sont pas affectés.
+    Retourne le nombre d'adresses écrites.
+    """
+    addresses, codes = [], []
+    for address, code in entries:
+        addresses.append(address)
+        codes.append(int(code))
+
+    keys, valid = encode_addresses(addresses)
+    keys = keys[valid]
+    codes_arr = np.asarray(codes, dtype=np.uint32)[valid] if codes else np.empty(0, dtype=np.uint32)
+
+    # Tri + fusion des doublons
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    codes_arr = codes_arr[order]
+    if len(keys):
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        codes_arr = np.bitwise_or.reduceat(codes_arr, starts).astype(np.uint32)
+        keys = keys[starts]
+
+    count = len(keys)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, 0, count))
+        f.write(_prefixes(keys).astype("<u8").tobytes())
+        f.write(keys.tobytes())
+        f.write(b"\x00" * (-(_HEADER.size + 20 * count) % 8))
+        f.write(codes_arr.astype("<u4").tobytes())
+    os.replace(tmp_path, path)
+    return count
+
+
+class _LabelTable:
+    """Vue (adresses triées, codes) sur un fichier mappé ou un petit tableau en mémoire"""
+
+    def __init__(self, keys: np.ndarray, prefixes: np.ndarray, codes: np.ndarray,
+                 mapping: Optional[mmap.mmap] = None, stat=None):
+        self.keys = keys
+        self.prefixes = prefixes
+        self.codes = codes
+        self.mapping = mapping
+        self.stat = stat
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def from_file(cls, path: str) -> "_LabelTable":
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_size < _HEADER.size:
+                raise ValueError(f"Label registry file too small: {path}")
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count = _HEADER.unpack_from(mapping, 0)
+        if magic != _MAGIC or version != _VERSION:
+            mapping.close()
+            raise ValueError(f"Invalid label registry file: {path}")
+        keys_offset = _HEADER.size + 8 * count
+        codes_offset = keys_offset + 20 * count
+        codes_offset += -codes_offset % 8
+        prefixes = np.frombuffer(mapping, dtype="<u8", count=count, offset=_HEADER.size)
+        keys = np.frombuffer(mapping, dtype="S20", count=count, offset=keys_offset)
+        codes = np.frombuffer(mapping, dtype="<u4", count=count, offset=codes_offset)
+        return cls(keys, prefixes, codes, mapping, (st.st_ino, st.st_mtime_ns, st.st_size))
+
+    @classmethod
+    def from_entries(cls, entries: Dict[str, int]) -> "_LabelTable":
+        keys, valid = encode_addresses(list(entries.keys()))
+        codes = np.fromiter(entries.values(), dtype=np.uint32, count=len(entries))
+        keys, codes = keys[valid], codes[valid]
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        return cls(keys, _prefixes(keys), codes[order])
+
+    def lookup(self, keys: np.ndarray, prefixes: np.ndarray, valid: np.ndarray,
+               order: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Recherche dichotomique vectorisée: retourne le bitmask (0 si absent).
+        order: permutation triant prefixes (requêtes triées -> accès mémoire
+        quasi séquentiels dans une grande table mappée)
+        """
+        out = np.zeros(len(keys), dtype=np.uint32)
+        n = len(self.keys)
+        if n == 0 or len(keys) == 0:
+            return out
+        if order is None:
+            idx = np.searchsorted(self.prefixes, prefixes)
+        else:
+            idx = np.empty(len(keys), dtype=np.intp)
+            idx[order] = np.searchsorted(self.prefixes, prefixes[order])
+        np.minimum(idx, n - 1, out=idx)
+        hit = valid & (self.keys[idx] == keys)
+        # Collisions de préfixe (rares: adresses "vanity" 0x0000...): recherche sur la clé complète
+        collisions = np.flatnonzero(valid & ~hit & (self.prefixes[idx] == prefixes))
+        if len(collisions):
+            full_idx = np.minimum(np.searchsorted(self.keys, keys[collisions]), n - 1)
+            idx[collisions] = full_idx
+            hit[collisions] = self.keys[full_idx] == keys[collisions]
+        out[hit] = self.codes[idx[hit]]
+        return out
+
+
+class LabelBloomFilter:
+    """
+    Filtre de Bloom compact sur les adresses du registre (~10 bits/adresse, 1% de faux positifs).
+    Les adresses EVM étant déjà des hash keccak, les fonctions de hachage sont dérivées
+    directement des octets de l'adresse (double hashing h1 + i*h2), sans rehachage.
+    Les octets de poids faible sont utilisés: les adresses "vanity" ne varient que par la fin.
+    Pas de faux négatifs: toute adresse étiquetée passe le filtre.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int):
+        # Taille en puissance de 2 -> modulo par masque
+        self.num_bits = 1 << max(6, int(num_bits - 1).bit_length())
+        self.num_hashes = num_hashes
+        self._mask = np.uint64(self.num_bits - 1)
+        self.bits = np.zeros(self.num_bits // 8, dtype=np.uint8)
+
+    @classmethod
+    def from_tables(cls, tables: Sequence["_LabelTable"], bits_per_key: int = 10,
+                    num_hashes: int = 7, chunk_size: int = 1 << 18) -> "LabelBloomFilter":
+        total = sum(len(t) for t in tables)
+        bloom = cls(max(total, 1) * bits_per_key, num_hashes)
+        flags = np.zeros(bloom.num_bits, dtype=bool)
+        for table in tables:
+            for start in range(0, len(table), chunk_size):
+                flags[bloom._positions(table.keys[start:start + chunk_size]).ravel()] = True
+        bloom.bits = np.packbits(flags, bitorder="little")
+        return bloom
+
+    def _positions(self, keys: np.ndarray) -> np.ndarray:
+        raw = keys.view(np.uint8).reshape(len(keys), 20)
+        h1 = np.ascontiguousarray(raw[:, 12:20]).view("<u8").ravel()
+        h2 = np.ascontiguousarray(raw[:, 4:12]).view("<u8").ravel() | np.uint64(1)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) & self._mask
+
+    def might_contain_keys(self, keys: np.ndarray) -> np.ndarray:
+        if len(keys) == 0:
+            return np.empty(0, dtype=bool)
+        pos = self._positions(keys)
+        hits = (self.bits[pos >> np.uint64(3)] >> (pos & np.uint64(7)).astype(np.uint8)) & 1
+        return hits.all(axis=1)
+
+    def might_contain(self, addresses: Sequence[str]) -> np.ndarray:
+        keys, valid = encode_addresses(addresses)
+        return valid & self.might_contain_keys(keys)
+
+
+def _builtin_entries() -> Dict[str, int]:
+    """Labels intégrés issus de Config (toujours présents, même sans fichier)"""
+    entries: Dict[str, int] = {}
+    for addr in getattr(Config, "KNOWN_MIXERS", set()):
+        entries[addr.lower()] = entries.get(addr.lower(), 0) | LABEL_MIXER | LABEL_SANCTIONED
+    for addr in getattr(Config, "PROTOCOL_WHITELIST", set()):
+        entries[addr.lower()] = entries.get(addr.lower(), 0) | LABEL_PROTOCOL
+    return entries
+
+
+class LabelRegistry:
+    """
+    Registre de labels d'adresses:
+    - fichier mmap trié (millions d'adresses, démarrage instantané, pages partagées entre workers)
+    - lookup batch vectorisé par recherche dichotomique (numpy.searchsorted)
+    - rechargement à chaud si le fichier est remplacé (vérification au plus toutes les N secondes)
+    - labels intégrés de Config (KNOWN_MIXERS, PROTOCOL_WHITELIST) fusionnés en OR
+    """
+
+    def __init__(self, path: Optional[str] = None, reload_interval: Optional[float] = None):
+        self.path = path if path is not None else Config.LABEL_REGISTRY_PATH
+        self.reload_interval = (
+            reload_interval if reload_interval is not None else Config.LABEL_REGISTRY_RELOAD_SECONDS
+        )
+        self._builtin = _LabelTable.from_entries(_builtin_entries())
+        self._table: Optional[_LabelTable] = None
+        self._bloom: Optional[Tuple[Optional[_LabelTable], LabelBloomFilter]] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._bloom_lock = threading.Lock()
+        self.reload(force=True)
+        self.bloom_filter()  # construit avec le registre (au démarrage, hors de la boucle asyncio)
+
+    def __len__(self) -> int:
+        table = self._table
+        return len(self._builtin) + (len(table) if table is not None else 0)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Recharge le fichier s'il a changé (inode/mtime/taille).
+        Le remplacement de la table est atomique (simple réassignation de référence);
+        le filtre de Bloom de la nouvelle table est construit dans un thread.
+        Retourne True si une nouvelle table a été chargée.
+        """
+        changed = self._load(force)
+        if changed and self._bloom is not None:
+            # screen() fait le lookup exact tant que le nouveau filtre n'est pas prêt
+            threading.Thread(target=self.bloom_filter, name="label-bloom", daemon=True).start()
+        return changed
+
+    def _load(self, force: bool) -> bool:
+        with self._lock:
+            self._last_check = time.monotonic()
+            if not self.path or not os.path.exists(self.path):
+                changed = self._table is not None
+                self._table = None
+                return changed
+            try:
+                st = os.stat(self.path)
+                signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+                if not force and self._table is not None and self._table.stat == signature:
+                    return False
+                self._table = _LabelTable.from_file(self.path)
+                print(f"  🏷️ Label registry loaded: {len(self._table)} addresses ({self.path})")
+                return True
+            except (OSError, ValueError) as e:
+                print(f"  ⚠️ Label registry load error: {e}")
+                return False
+
+    def _maybe_reload(self):
+        if self.reload_interval is not None and self.reload_interval >= 0:
+            if time.monotonic() - self._last_check >= self.reload_interval:
+                self.reload()
+
+    def lookup(self, addresses: Sequence[str]) -> np.ndarray:
+        """Retourne le bitmask de labels de chaque adresse (0 = non étiquetée)"""
+        self._maybe_reload()
+        keys, valid = encode_addresses(addresses)
+        prefixes = _prefixes(keys)
+        codes = self._builtin.lookup(keys, prefixes, valid)
+        table = self._table
+        if table is not None and len(table):
+            order = np.argsort(prefixes) if len(table) > _SORT_THRESHOLD else None
+            codes |= table.lookup(keys, prefixes, valid, order)
+        return codes
+
+    def labels_for(self, addresses: Sequence[str]) -> Dict[str, int]:
+        """Retourne {adresse: bitmask} pour les seules adresses étiquetées"""
+        addresses = list(addresses)
+        codes = self.lookup(addresses)
+        return {addresses[i]: int(codes[i]) for i in np.flatnonzero(codes)}
+
+    def addresses_with(self, addresses: Iterable[str], mask: int) -> set:
+        """Sous-ensemble des adresses portant au moins un des labels de mask"""
+        addresses = list(addresses)
+        codes = self.lookup(addresses)
+        return {addresses[i] for i in np.flatnonzero(codes & mask)}
+
+    def get(self, address: str) -> int:
+        return int(self.lookup([address])[0])
+
+    def bloom_filter(self) -> LabelBloomFilter:
+        """
+        Filtre de Bloom de la table courante, construit si besoin (bloquant: à appeler hors de la
+        boucle asyncio; le constructeur et les rechargements le font dans un thread)
+        """
+        with self._bloom_lock:
+            table = self._table
+            cached = self._bloom
+            if cached is None or cached[0] is not table:
+                start = time.time()
+                tables = [self._builtin] + ([table] if table is not None else [])
+                cached = (table, LabelBloomFilter.from_tables(tables))
+                self._bloom = cached
+                if table is not None:
+                    print(f"  🌸 Label Bloom filter built: {len(self)} addresses ({time.time() - start:.2f}s)")
+            return cached[1]
+
+    def screen(self, addresses: Sequence[str]) -> Dict[str, int]:
+        """
+        Pré-filtrage pour l'ingestion: le filtre de Bloom écarte presque toutes les adresses,
+        seules les probables correspondances passent par le lookup exact.
+        Retourne {adresse: bitmask} des adresses réellement étiquetées.
+        """
+        addresses = list(addresses)
+        if not addresses:
+            return {}
+        self._maybe_reload()
+        cached = self._bloom
+        if cached is None or cached[0] is not self._table:
+            # Filtre en cours de reconstruction (rechargement à chaud): lookup exact, jamais de construction ici
+            return self.labels_for(addresses)
+        candidates = np.flatnonzero(cached[1].might_contain(addresses))
+        if len(candidates) == 0:
+            return {}
+        return self.labels_for([addresses[i] for i in candidates])
+
+
+_registry: Optional[LabelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_label_registry() -> LabelRegistry:
+    """Registre partagé par le process (créé au premier appel)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LabelRegistry()
+    return _registry
+
+
+def build_from_csv(csv_path: str, out_path: str) -> int:
+    """
+    Construit un fichier de labels depuis un CSV "address,label[,label...]"
+    (labels: mixer, sanctioned, protocol, dex_router, cex).
+    """
+    def rows():
+        with open(csv_path, newline="") as f:
+            for row in csv.reader(f):
+                if not row or row[0].startswith("#") or row[0].lower() == "address":
+                    continue
+                code = 0
+                for name in row[1:]:
+                    for part in name.replace("|", ";").split(";"):
+                        part = part.strip().lower()
+                        if part:
+                            code |= LABEL_CODES.get(part, 0)
+                if code:
+                    yield row[0].strip().lower(), code
+
+    return write_label_file(out_path, rows())
+
+
+if __name__ == "__main__":
+    # Usage: python -m src.label_registry labels.csv data/labels.bin
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.label_registry <labels.csv> <output.bin>")
+        sys.exit(1)
+    start = time.time()
+    written = build_from_csv(sys.argv[1], sys.argv[2])
+    print(f"✅ {written} addresses written to {sys.argv[2]} ({time.time() - start:.2f}s)")
@@ -0,0 +1,152 @@
+"""
+Layout Module
+Positions des nœuds calculées côté serveur (igraph), une fois par analyse.
+Position initiale: chaque communauté Leiden/Louvain occupe sa zone (layout "multilevel"
+simplifié), les wallets déjà placés lors d'une analyse précédente du token reprennent
+leur ancienne position -> ré-analyse rapide (peu d'itérations) et visuellement stable.
+Algorithme: Fruchterman-Reingold, DrL au-delà de LAYOUT_DRL_THRESHOLD nœuds.
+Calculé hors requête (tâche de fond après /analyze, ou au premier appel viewport/graphe),
+jusqu'à LAYOUT_MAX_NODES nœuds, dans un process dédié (layout_graph_data): igraph n'appelle
+le générateur Python (seedé à chaque appel) que depuis le thread principal.
+"""
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+
+import igraph as ig
+import networkx as nx
+
+from config import Config
+
+Position = Tuple[float, float]
+
+
+
+def layout_key(chain: str, token_address: str) -> str:
+    """Clé du dernier layout d'un token (indépendante des données: réutilisé d'une analyse à l'autre)"""
+    return f"layout:{chain}:{token_address.lower()}"
+
+
+def _community_seed(
+    nodes: List[str],
+    communities: Dict,
+    previous: Dict[str, Position],
+    rng: random.Random,
+) -> List[Position]:
+    """
+    Positions initiales (rayon ~sqrt(n)): ancienne position si connue (ramenée de l'échelle
+    LAYOUT_SPACING à l'échelle du seed), sinon autour du centre de sa communauté
+    """
+    community_of = {wallet: cid for cid, wallets in communities.items() for wallet in wallets}
+    ranked = sorted(communities, key=lambda cid: len(communities[cid]), reverse=True)
+    radius = math.sqrt(len(nodes)) or 1.0
+
+    # Centres des communautés sur une spirale (les plus grandes au centre)
+    centers = {}
+    for rank, cid in enumerate(ranked):
+        angle = rank * 2.399963  # angle d'or: répartition homogène
+        distance = radius * math.sqrt(rank / max(1, len(ranked)))
+        centers[cid] = (distance * math.cos(angle), distance * math.sin(angle))
+
+    seed = []
+    for node in nodes:
+        if node in previous:
+            x, y = previous[node]
+            seed.append((x / Config.LAYOUT_SPACING, y / Config.LAYOUT_SPACING))
+            continue
+        cx, cy = centers.get(community_of.get(node), (0.0, 0.0))
+        spread = math.sqrt(len(communities.get(community_of.get(node), ()))) or 1.0
+        seed.append((cx + rng.uniform(-spread, spread), cy + rng.uniform(-spread, spread)))
+    return seed
+
+
+def compute_layout(
+    graph: nx.DiGraph,
+    communities: Optional[Dict] = None,
+    previous: Optional[Dict[str, Position]] = None,
+) -> Dict[str, Position]:
+    """
+    Coordonnées {adresse: (x, y)} centrées sur 0, dans un rayon LAYOUT_SPACING * sqrt(n)
+    communities: {community_id: [wallets]} (metrics.communities)
+    previous: positions d'une analyse précédente du même token
+    """
+    nodes = list(graph.nodes())
+    if not nodes:
+        return {}
+    previous = previous or {}
+    communities = communities or {}
+    rng = random.Random(Config.LAYOUT_SEED)
+
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = {tuple(sorted((index[a], index[b]))) for a, b in graph.edges() if a != b}
+    ig_graph = ig.Graph(n=len(nodes), edges=list(edges))
+
+    seed = _community_seed(nodes, communities, previous, rng)
+    reused = sum(1 for node in nodes if node in previous)
+    # Layout précédent presque complet: affinage court et à basse température (peu de déplacement);
+    # DrL: préréglage "refine" (affinage d'un layout existant) au lieu du layout complet
+    refine = reused >= 0.8 * len(nodes)
+    iterations = Config.LAYOUT_ITERATIONS
+    start_temp = math.sqrt(len(nodes)) / 10  # défaut igraph
+    if refine:
+        iterations = Config.LAYOUT_REFINE_ITERATIONS
+        start_temp /= 10
+
+    # Générateur seedé propre à l'appel (effectif dans le thread principal, cf. layout_graph_data)
+    ig.set_random_number_generator(random.Random(Config.LAYOUT_SEED))
+    try:
+        if len(nodes) > Config.LAYOUT_DRL_THRESHOLD:
+            layout = ig_graph.layout_drl(seed=seed, options="refine" if refine else "default")
+        else:
+            layout = ig_graph.layout_fruchterman_reingold(
+                seed=seed, niter=iterations, start_temp=start_temp
+            )
+    finally:
+        ig.set_random_number_generator(random)
+
+    coords = layout.coords
+    cx = sum(x for x, _ in coords) / len(coords)
+    cy = sum(y for _, y in coords) / len(coords)
+    extent = max((math.hypot(x - cx, y - cy) for x, y in coords), default=0.0) or 1.0
+    # Rayon final proportionnel à sqrt(n): densité d'affichage constante
+    scale = Config.LAYOUT_SPACING * math.sqrt(len(nodes)) / extent
+    return {
+        node: (round((x - cx) * scale, 1), round((y - cy) * scale, 1))
+        for node, (x, y) in zip(nodes, coords)
+    }
+
+
+def layout_graph_data(
+    graph_data: Dict,
+    communities: Optional[Dict] = None,
+    previous: Optional[Dict[str, Position]] = None,
+) -> Dict[str, Position]:
+    """
+    compute_layout sur un graph_data au format React Force Graph (nœuds + liens).
+    Point d'entrée du process de layout (main1._layout_executor)
+    """
+    graph = nx.DiGraph()
+    graph.add_nodes_from(node["id"] for node in graph_data.get("nodes") or [])
+    graph.add_edges_from(
+        (link["source"], link["target"]) for link in graph_data.get("links") or []
+        if link.get("source") in graph and link.get("target") in graph
+    )
+    return compute_layout(graph, communities, previous)
+
+
+def apply_layout(graph_data: Dict, positions: Dict[str, Position]) -> Dict:
+    """Ajoute x/y aux nœuds de graph_data (format React Force Graph), en place"""
+    for node in graph_data.get("nodes") or []:
+        position = positions.get(node["id"])
+        if position is not None:
+            node["x"], node["y"] = position
+    return graph_data
+
+
+def positions_from_graph_data(graph_data: Dict) -> Dict[str, Position]:
+    """Positions déjà présentes dans graph_data (x/y)"""
+    return {
+        node["id"]: (node["x"], node["y"])
+        for node in graph_data.get("nodes") or []
+        if "x" in node and "y" in node
+    }
@@ -0,0 +1,180 @@
+"""
+Level Of Detail Module
+Résumé du graphe pour le rendu des gros tokens (graph_detail="summary").
+Chaque communauté détectée par GraphAnalyzer est repliée en un supernœud
+(taille, volume interne, balance et PageRank cumulés, niveau de risque du cluster).
+Restent explicites: les wallets signalés (mixer, wash trading, cluster suspect)
+puis les top-k wallets par PageRank, dans la limite de LOD_MAX_NODES nœuds au total.
+Un supernœud se déplie à la demande (expand=<community_id>).
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+
+GRAPH_DETAILS = ("full", "summary", "auto")
+
+SUPERNODE_PREFIX = "community:"
+OTHER_SUPERNODE = SUPERNODE_PREFIX + "other"  # petites communautés au-delà de LOD_MAX_SUPERNODES
+
+
+def validate_graph_detail(graph_detail: Optional[str]) -> str:
+    """None = "full". ValueError si inconnu."""
+    graph_detail = graph_detail or "full"
+    if graph_detail not in GRAPH_DETAILS:
+        raise ValueError(f"Unknown graph_detail: {graph_detail}. Available: {', '.join(GRAPH_DETAILS)}")
+    return graph_detail
+
+
+def parse_expand(expand: Optional[Iterable[str]]) -> List[str]:
+    """Communautés à déplier: liste ou chaîne séparée par des virgules ("community:" optionnel)"""
+    if not expand:
+        return []
+    if isinstance(expand, str):
+        expand = expand.split(",")
+    return [str(item).strip().replace(SUPERNODE_PREFIX, "", 1) for item in expand if str(item).strip()]
+
+
+def _flagged_wallets(result: Dict, graph_data: Dict) -> set:
+    flagged = {node["id"] for node in graph_data.get("nodes") or [] if node.get("is_mixer")}
+    for link in graph_data.get("links") or []:
+        if link.get("is_wash_trade"):
+            flagged.add(link["source"])
+            flagged.add(link["target"])
+    for cluster in result.get("suspicious_clusters") or []:
+        flagged.update(cluster.get("wallets") or [])
+    return flagged
+
+
+def summarize_graph(
+    result: Dict,
+    expand: Optional[Iterable[str]] = None,
+    max_nodes: Optional[int] = None,
+    max_supernodes: Optional[int] = None,
+    top_k: Optional[int] = None,
+) -> Dict:
+    """
+    graph_data résumé à partir d'un résultat d'analyse (graph_data "objects" + metrics.communities).
+    Le nombre de nœuds rendus est borné par max_nodes (+1 pour le supernœud "other").
+    """
+    max_nodes = max_nodes or Config.LOD_MAX_NODES
+    max_supernodes = max_supernodes or Config.LOD_MAX_SUPERNODES
+    top_k = Config.LOD_TOP_K if top_k is None else top_k
+    graph_data = result.get("graph_data") or {}
+    nodes = graph_data.get("nodes") or []
+    links = graph_data.get("links") or []
+    communities = (result.get("metrics") or {}).get("communities") or {}
+    risk_levels = {
+        str(cluster.get("cluster_id")): cluster.get("risk_level")
+        for cluster in result.get("suspicious_clusters") or []
+    }
+
+    community_of = {wallet: str(cid) for cid, wallets in communities.items() for wallet in wallets}
+    by_pagerank = sorted(nodes, key=lambda node: node.get("pagerank", 0), reverse=True)
+
+    # Supernœuds: les plus grandes communautés, le reste regroupé dans "other"
+    ranked_communities = sorted(communities.items(), key=lambda item: len(item[1]), reverse=True)
+    kept_communities = {str(cid) for cid, _ in ranked_communities[:max_supernodes]}
+
+    # Nœuds explicites: communautés dépliées, wallets signalés, puis top-k PageRank
+    budget = max(0, max_nodes - len(kept_communities))
+    expanded = set(parse_expand(expand))
+    flagged = _flagged_wallets(result, graph_data)
+    explicit: Dict[str, None] = {}
+    candidates = (
+        [node["id"] for node in by_pagerank if community_of.get(node["id"]) in expanded]
+        + [node["id"] for node in by_pagerank if node["id"] in flagged]
+        + [node["id"] for node in by_pagerank[:top_k]]
+    )
+    for node_id in candidates:
+        if len(explicit) >= budget:
+            break
+        explicit.setdefault(node_id)
+
+    def representative(node_id: str) -> str:
+        if node_id in explicit:
+            return node_id
+        community = community_of.get(node_id)
+        return SUPERNODE_PREFIX + community if community in kept_communities else OTHER_SUPERNODE
+
+    # Agrégation des nœuds repliés
+    out_nodes = []
+    supernodes: Dict[str, Dict] = {}
+    centroids: Dict[str, List[float]] = {}  # somme x, somme y, nombre de membres placés
+    for node in nodes:
+        rep = representative(node["id"])
+        if rep == node["id"]:
+            out_nodes.append(node)
+            continue
+        supernode = supernodes.get(rep)
+        if supernode is None:
+            community = rep[len(SUPERNODE_PREFIX):]
+            supernode = supernodes[rep] = {
+                "id": rep,
+                "group": int(community) if community.isdigit() else 0,
+                "pagerank": 0.0,
+                "is_mixer": False,
+                "balance": 0,
+                "is_supernode": True,
+                "community_id": community,
+                "size": 0,
+                "volume": 0,
+                "risk_level": risk_levels.get(community, "low"),
+            }
+        supernode["size"] += 1
+        supernode["pagerank"] += node.get("pagerank", 0)
+        supernode["balance"] += node.get("balance", 0)
+        if "x" in node:
+            centroid = centroids.setdefault(rep, [0.0, 0.0, 0])
+            centroid[0] += node["x"]
+            centroid[1] += node["y"]
+            centroid[2] += 1
+
+    # Agrégation des liens entre représentants (les liens internes à un supernœud deviennent son volume)
+    aggregated: Dict[Tuple[str, str], Dict] = {}
+    for link in links:
+        source, target = representative(link["source"]), representative(link["target"])
+        if source == target and source in supernodes:
+            supernodes[source]["volume"] += link.get("value", 0)
+            continue
+        entry = aggregated.get((source, target))
+        if entry is None:
+            entry = aggregated[(source, target)] = {
+                "source": source, "target": target, "value": 0, "count": 0, "is_wash_trade": False
+            }
+        entry["value"] += link.get("value", 0)
+        entry["count"] += link.get("count", 1)
+        entry["is_wash_trade"] = entry["is_wash_trade"] or bool(link.get("is_wash_trade"))
+
+    for rep, supernode in supernodes.items():
+        supernode["pagerank"] = round(supernode["pagerank"], 4)
+        # Supernœud placé au centre de ses membres (layout précalculé)
+        if rep in centroids:
+            x_sum, y_sum, placed = centroids[rep]
+            supernode["x"], supernode["y"] = round(x_sum / placed, 1), round(y_sum / placed, 1)
+
+    return {
+        "nodes": out_nodes + list(supernodes.values()),
+        "links": list(aggregated.values()),
+        "level_of_detail": {
+            "detail": "summary",
+            "total_nodes": len(nodes),
+            "total_links": len(links),
+            "explicit_nodes": len(out_nodes),
+            "supernodes": len(supernodes),
+            "expanded": sorted(expanded),
+            "flagged_collapsed": sum(1 for node in nodes if node["id"] in flagged and node["id"] not in explicit),
+        },
+    }
+
+
+def apply_level_of_detail(result: Dict, graph_detail: str, expand: Optional[Iterable[str]] = None) -> Dict:
+    """
+    Réponse avec graph_data résumé si demandé; result n'est pas modifié.
+    "auto": résumé seulement au-delà de LOD_AUTO_THRESHOLD_NODES nœuds (ou si expand est fourni).
+    """
+    graph_data = result.get("graph_data")
+    if graph_detail == "full" or not graph_data:
+        return result
+    if graph_detail == "auto" and not expand and len(graph_data.get("nodes") or []) <= Config.LOD_AUTO_THRESHOLD_NODES:
+        return result
+    return {**result, "graph_data": summarize_graph(result, expand=expand)}
@@ -0,0 +1,238 @@
+"""
+Persistence Module
+Sauvegarde graph DB (save_to_graph_db) en tâche de fond: /analyze met le graphe dans une
+file bornée et répond tout de suite avec un identifiant de job de persistance.
+- workers dédiés (threads, le driver neo4j est bloquant) hors de la boucle asyncio
+- drivers Bolt partagés du process (src.graph_db: un par backend, pool GRAPH_DB_POOL_SIZE)
+- nouvelles tentatives avec backoff exponentiel (écritures MERGE: rejouer un lot est sans effet)
+- backpressure: file pleine -> refus immédiat (PersistenceRejected), l'analyse n'attend jamais
+- métriques: file, en cours, succès/échecs/nouvelles tentatives, latences d'attente et d'écriture
+"""
+import asyncio
+import time
+import uuid
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Optional
+
+import networkx as nx
+
+from config import Config
+from src.graph_db import BACKENDS, check_health, get_driver
+from src.graph_storage import GraphStorage
+
+
+class PersistenceRejected(Exception):
+    """File de persistance pleine: la sauvegarde n'est pas planifiée"""
+
+
+def _percentiles(samples: Deque[float]) -> Dict:
+    if not samples:
+        return {"p50": None, "p95": None, "max": None}
+    ordered = sorted(samples)
+    return {
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class PersistenceJob:
+    """Une sauvegarde de graphe en attente ou en cours"""
+
+    def __init__(self, job_id: str, graph: nx.DiGraph, token_address: str, analysis_results: Dict,
+                 storage_type: str):
+        self.id = job_id
+        self.graph: Optional[nx.DiGraph] = graph
+        self.token_address = token_address
+        self.analysis_results: Optional[Dict] = analysis_results
+        self.storage_type = storage_type
+        self.status = "queued"  # queued | running | retrying | done | failed
+        self.attempts = 0
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "token_address": self.token_address,
+            "storage_type": self.storage_type,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        if self.result is not None:
+            data["result"] = self.result
+        return data
+
+
+class PersistenceQueue:
+    """
+    max_queue: sauvegardes en attente au maximum (au-delà: PersistenceRejected)
+    workers: sauvegardes exécutées simultanément
+    max_attempts: tentatives par sauvegarde (backoff retry_backoff * 2^n entre deux)
+    saver: fonction (job) -> dict résultat de GraphStorage.save_graph (tests); défaut GraphStorage
+    """
+
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        workers: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        result_ttl: Optional[float] = None,
+        saver: Optional[Callable[[PersistenceJob], Dict]] = None,
+    ):
+        self.max_queue = max_queue or Config.PERSISTENCE_MAX_QUEUE
+        self.workers = workers or Config.PERSISTENCE_WORKERS
+        self.max_attempts = max_attempts or Config.PERSISTENCE_MAX_ATTEMPTS
+        self.retry_backoff = (
+            retry_backoff if retry_backoff is not None else Config.PERSISTENCE_RETRY_BACKOFF_SECONDS
+        )
+        self.result_ttl = result_ttl if result_ttl is not None else Config.JOB_RESULT_TTL_SECONDS
+        self._saver = saver or self._save
+        self._jobs: Dict[str, PersistenceJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._running = 0
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.wait_seconds: Deque[float] = deque(maxlen=256)
+        self.write_seconds: Deque[float] = deque(maxlen=256)
+        self.last_error: Optional[str] = None
+
+    def _save(self, job: PersistenceJob) -> Dict:
+        storage_type = job.storage_type.lower()
+        driver = get_driver(storage_type) if storage_type in BACKENDS else None  # sqlite/csv: pas de driver
+        storage = GraphStorage(storage_type=storage_type, driver=driver)
+        result = storage.save_graph(job.graph, job.token_address, job.analysis_results)
+        if driver is not None and not result.get("success"):
+            check_health(storage_type, force=True)  # état à jour dans /health avant la nouvelle tentative
+        return result
+
+    # ----- File -----
+
+    def _start(self):
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="graph-persist")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, graph: nx.DiGraph, token_address: str, analysis_results: Dict,
+               storage_type: str = "neo4j") -> PersistenceJob:
+        """Planifie une sauvegarde et retourne tout de suite son job (PersistenceRejected si file pleine)"""
+        self._purge_expired()
+        self._start()
+        job = PersistenceJob(uuid.uuid4().hex, graph, token_address, analysis_results, storage_type)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            raise PersistenceRejected(f"Graph persistence queue is full ({self.max_queue} pending), retry later")
+        self._jobs[job.id] = job
+        self.counters["submitted"] += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[PersistenceJob]:
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job, loop)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: PersistenceJob, loop):
+        job.started_at = time.time()
+        self.wait_seconds.append(job.started_at - job.created_at)
+        self._running += 1
+        try:
+            while True:
+                job.status = "running"
+                job.attempts += 1
+                start = time.perf_counter()
+                try:
+                    result = await loop.run_in_executor(self._executor, self._saver, job)
+                    error = None if result.get("success") else result.get("error", "Unknown error")
+                except Exception as e:
+                    result, error = None, str(e)
+                self.write_seconds.append(time.perf_counter() - start)
+
+                if error is None:
+                    job.status, job.result, job.error = "done", result, None
+                    self.counters["succeeded"] += 1
+                    break
+                job.error = error
+                self.last_error = error
+                if job.attempts >= self.max_attempts:
+                    job.status, job.result = "failed", result
+                    self.counters["failed"] += 1
+                    print(f"  ⚠️ Graph persistence failed for {job.token_address} "
+                          f"after {job.attempts} attempt(s): {error}")
+                    break
+                job.status = "retrying"
+                self.counters["retries"] += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** (job.attempts - 1))
+        finally:
+            self._running -= 1
+            job.finished_at = time.time()
+            job.graph = job.analysis_results = None  # libérer le graphe
+
+    async def drain(self, timeout: float) -> bool:
+        """Attend la fin des sauvegardes en file (True si tout a été écrit avant timeout)"""
+        if self._queue is None:
+            return True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self, timeout: Optional[float] = None):
+        """Arrêt: vide la file (au plus timeout secondes) et arrête les workers (drivers: src.graph_db.close_drivers)"""
+        drained = await self.drain(timeout if timeout is not None else Config.PERSISTENCE_DRAIN_SECONDS)
+        if not drained:
+            print(f"  ⚠️ Graph persistence: {self._queue.qsize()} save(s) dropped at shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._queue, self._tasks, self._executor = None, [], None
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "max_queue": self.max_queue,
+            "workers": self.workers,
+            "submitted": self.counters["submitted"],
+            "succeeded": self.counters["succeeded"],
+            "failed": self.counters["failed"],
+            "retries": self.counters["retries"],
+            "rejected": self.counters["rejected"],
+            "wait_seconds": _percentiles(self.wait_seconds),
+            "write_seconds": _percentiles(self.write_seconds),
+            "last_error": self.last_error,
+        }
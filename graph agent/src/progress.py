@@ -0,0 +1,99 @@
+"""
+Progress Module
+Suivi d'avancement d'une analyse: étape courante, pages récupérées,
+transferts décodés et durée de chaque étape du pipeline.
+Publie aussi les résultats partiels (métadonnées, top holders, PageRank...) dès qu'ils sont prêts
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class AnalysisProgress:
+    """
+    Avancement d'une analyse, mis à jour depuis la boucle asyncio (fetch)
+    et depuis le pool de threads (étapes CPU): accès protégés par un verrou.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage = "queued"
+        self.pages_fetched = 0
+        self.transfers_decoded = 0
+        self.stage_timings: Dict[str, float] = {}
+        self._stage_started: Optional[float] = None
+        self._created = time.time()
+        self._last_event = self._created
+        self._listeners: List[Callable[[Dict], None]] = []
+
+    def _close_stage(self, now: float):
+        if self._stage_started is not None:
+            self.stage_timings[self.stage] = round(
+                self.stage_timings.get(self.stage, 0.0) + now - self._stage_started, 3
+            )
+            self._stage_started = None
+
+    def start_stage(self, name: str):
+        """Démarre une étape (et clôt la précédente)"""
+        with self._lock:
+            now = time.time()
+            self._close_stage(now)
+            self.stage = name
+            self._stage_started = now
+
+    def finish(self, stage: str = "done"):
+        """Clôt l'étape en cours"""
+        with self._lock:
+            self._close_stage(time.time())
+            self.stage = stage
+
+    def page_decoded(self, transfers: int):
+        """Appelé par DataFetcher à chaque page de provider décodée"""
+        with self._lock:
+            self.pages_fetched += 1
+            self.transfers_decoded += transfers
+
+    def subscribe(self, listener: Callable[[Dict], None]):
+        """
+        Enregistre un listener appelé à chaque emit().
+        Peut être appelé depuis un thread du pool d'analyse: le listener doit être thread-safe.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def has_listeners(self) -> bool:
+        """True si quelqu'un écoute les résultats partiels (sinon inutile de les préparer)"""
+        with self._lock:
+            return bool(self._listeners)
+
+    def emit(self, stage: str, data: Any):
+        """
+        Publie un résultat partiel: {stage, elapsed_seconds, stage_seconds, data}
+        stage_seconds: temps écoulé depuis l'événement précédent (production de ce résultat)
+        """
+        with self._lock:
+            now = time.time()
+            event = {
+                "stage": stage,
+                "elapsed_seconds": round(now - self._created, 3),
+                "stage_seconds": round(now - self._last_event, 3),
+                "data": data,
+            }
+            self._last_event = now
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(event)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            timings = dict(self.stage_timings)
+            if self._stage_started is not None:
+                timings[self.stage] = round(
+                    timings.get(self.stage, 0.0) + time.time() - self._stage_started, 3
+                )
+            return {
+                "stage": self.stage,
+                "pages_fetched": self.pages_fetched,
+                "transfers_decoded": self.transfers_decoded,
+                "stage_timings": timings,
+            }
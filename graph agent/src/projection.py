@@ -0,0 +1,71 @@
+"""
+Projection Module
+Sélection des sections d'une réponse /analyze (paramètre `fields`).
+Les sections lourdes (PageRank de chaque nœud, mapping complet des communautés,
+wallets de chaque cluster) ne sont renvoyées que si elles sont demandées explicitement;
+sinon elles restent accessibles via /analysis/{analysis_id}/...
+"""
+from typing import Dict, Iterable, List, Optional, Set
+
+# Toujours présentes
+BASE_FIELDS = ("token_address", "analysis_time_seconds", "risk_score", "analysis_id")
+
+SECTION_FIELDS = (
+    "top_holders",
+    "suspicious_clusters",
+    "mixer_flags",
+    "wash_trade_pairs",
+    "graph_data",
+    "metrics",
+    "storage_result",
+)
+
+# Sous-sections lourdes: "section.clé"
+HEAVY_FIELDS = (
+    "metrics.pagerank",
+    "metrics.communities",
+    "suspicious_clusters.wallets",
+)
+
+
+def parse_fields(fields: Optional[Iterable[str]]) -> Optional[List[str]]:
+    """
+    Normalise `fields` (liste ou chaîne séparée par des virgules).
+    None = réponse complète (comportement historique). ValueError si un champ est inconnu.
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    parsed = sorted({f.strip() for f in fields if f and f.strip()})
+    unknown = [f for f in parsed if f not in BASE_FIELDS + SECTION_FIELDS + HEAVY_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. "
+            f"Available: {', '.join(SECTION_FIELDS + HEAVY_FIELDS)}"
+        )
+    return parsed
+
+
+def project_response(result: Dict, fields: Optional[List[str]]) -> Dict:
+    """Réponse réduite aux sections demandées (fields déjà normalisé par parse_fields)"""
+    if fields is None:
+        return result
+    requested: Set[str] = set(fields)
+    # Une sous-section lourde implique sa section
+    sections = requested | {f.split(".", 1)[0] for f in requested if "." in f}
+    projected = {key: result.get(key) for key in BASE_FIELDS if key in result}
+
+    for section in SECTION_FIELDS:
+        if section not in sections or section not in result:
+            continue
+        value = result[section]
+        if section == "metrics" and isinstance(value, dict):
+            value = {
+                k: v for k, v in value.items()
+                if f"metrics.{k}" not in HEAVY_FIELDS or f"metrics.{k}" in requested
+            }
+        elif section == "suspicious_clusters" and "suspicious_clusters.wallets" not in requested:
+            value = [{k: v for k, v in cluster.items() if k != "wallets"} for cluster in value or []]
+        projected[section] = value
+    return projected
@@ -0,0 +1,71 @@
+"""
+Rate Limiter Module
+Token bucket asynchrone partagé par provider (Etherscan, Alchemy, BitQuery)
+Toutes les requêtes d'un process (y compris celles d'un batch) consomment le même quota
+"""
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from config import Config
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket: `rate` requêtes/seconde, rafale max `burst`.
+    Les appelants sont servis dans l'ordre d'arrivée (le verrou est conservé pendant l'attente).
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def provider_for_host(host: str) -> Optional[str]:
+    """Associe un hôte HTTP à son provider (pour appliquer le bon quota)"""
+    host = (host or "").lower()
+    if "etherscan" in host:
+        return "etherscan"
+    if "alchemy" in host:
+        return "alchemy"
+    if "bitquery" in host:
+        return "bitquery"
+    return None
+
+
+# Limiteurs par (provider, event loop): un asyncio.Lock est lié à sa boucle
+_limiters: Dict[str, Tuple[asyncio.AbstractEventLoop, AsyncRateLimiter]] = {}
+
+
+def get_rate_limiter(provider: str) -> AsyncRateLimiter:
+    """Limiteur partagé du provider (créé au premier appel dans la boucle courante)"""
+    loop = asyncio.get_running_loop()
+    entry = _limiters.get(provider)
+    if entry is None or entry[0] is not loop:
+        rate = Config.PROVIDER_REQUESTS_PER_SECOND.get(provider, Config.REQUESTS_PER_SECOND)
+        entry = (loop, AsyncRateLimiter(rate))
+        _limiters[provider] = entry
+    return entry[1]
+
+
+async def throttle_request(request):
+    """Hook httpx (event_hooks["request"]): attend le quota du provider ciblé"""
+    provider = provider_for_host(request.url.host)
+    if provider:
+        await get_rate_limiter(provider).acquire()
@@ -0,0 +1,109 @@
+"""
+Response Cache Module
+Cache des réponses /analyze sérialisées (bytes), indexé par
+(chaîne, token, watermark des données, paramètres d'analyse).
+Un token déjà analysé sur les mêmes données ne repasse ni par le graphe, ni par Leiden/PageRank,
+ni par la sérialisation; l'ETag permet aux clients de revalider (If-None-Match -> 304).
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from config import Config, AnalysisSettings
+from src.token_summary import TokenSummary
+
+
+def data_watermark(token_data: Dict) -> str:
+    """
+    Identifie l'état des données fetchées: dernier transfert vu + nombre de transferts.
+    Change dès qu'un nouveau transfert apparaît (les transactions sont triées du plus récent au plus ancien).
+    """
+    summary = TokenSummary.from_token_data(token_data)
+    transactions = token_data.get("transactions") or []
+    newest_hash = transactions[0].get("hash", "") if transactions else ""
+    return f"{summary.max_timestamp or 0}:{summary.transfer_count}:{newest_hash}"
+
+
+def analysis_params(settings: AnalysisSettings, community_mode: Optional[str]) -> Dict:
+    """Paramètres qui changent le résultat d'une analyse (les timeouts n'en font pas partie)"""
+    return {
+        "max_transactions": settings.max_transactions,
+        "max_holders": settings.max_holders,
+        "wash_trade_burst_window_seconds": settings.wash_trade_burst_window_seconds,
+        "wash_trade_volume_normalizer": settings.wash_trade_volume_normalizer,
+        "risk_weights": dict(settings.risk_weights),
+        "community_mode": community_mode or "auto",
+    }
+
+
+def response_cache_key(chain: str, token_address: str, watermark: str, params: Dict) -> str:
+    raw = json.dumps([chain, token_address.lower(), watermark, params], sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def latest_analysis_key(chain: str, token_address: str) -> str:
+    """Clé (dans le store des analyses) de l'analysis_id le plus récent d'un token"""
+    return f"latest:{chain}:{token_address.lower()}"
+
+
+def etag_for(key: str) -> str:
+    """
+    ETag faible: deux analyses des mêmes données avec les mêmes paramètres sont équivalentes
+    (seul analysis_time_seconds peut différer)
+    """
+    return f'W/"{key}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible (RFC 9110) d'un en-tête If-None-Match avec l'ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any((tag[2:] if tag.startswith("W/") else tag) == opaque for tag in candidates)
+
+
+class CachedResponse:
+    """Réponse sérialisée + ETag (+ versions compressées, par encodage)"""
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.etag = etag
+        self.variants: Dict[str, bytes] = {}
+        self.created_at = time.time()
+
+
+class ResponseCache:
+    """Cache LRU en mémoire (TTL + nombre max d'entrées) des réponses sérialisées"""
+
+    def __init__(self, max_items: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_items = max_items if max_items is not None else Config.RESPONSE_CACHE_MAX_ITEMS
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.RESPONSE_CACHE_TTL_SECONDS
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.created_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body, etag_for(key))
+        if self.max_items <= 0:
+            return entry
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
@@ -2,8 +2,9 @@
 Risk Scorer Module
 Calcule le score de risque global basé sur plusieurs facteurs
 """
-from typing import Dict, List
-from config import Config
+from typing import Dict, List, Optional
+from config import AnalysisSettings
+from src.token_summary import TokenSummary
 
 
 class RiskScorer:
@@ -12,8 +13,9 @@ class RiskScorer:
     Basé sur: Gini, Mixers, Wash Trading, Clusters
     """
     
-    def __init__(self):
-        self.weights = Config.RISK_WEIGHTS
+    def __init__(self, settings: Optional[AnalysisSettings] = None):
+        self.settings = settings or AnalysisSettings.from_config()
+        self.weights = self.settings.risk_weights
     
     def calculate_risk_score(
         self, 
@@ -25,6 +27,8 @@ class RiskScorer:
         """
         metrics = analysis_results.get("metrics", {})
         reasoning: List[str] = []
+        # Statistiques agrégées calculées à l'ingestion (pas de re-parcours des transferts)
+        summary = TokenSummary.from_token_data(token_data)
         
         # 1. Score Gini (centralisation) — NE PAS modifier le calcul
         gini = metrics.get("gini", 0.0)
@@ -43,7 +47,7 @@ class RiskScorer:
         
         # 3. Score Wash Trading (pondération par volume + normalisation diversité)
         wash_trade_pairs = analysis_results.get("wash_trade_pairs", [])
-        wash_trade_score, wash_context = self._calculate_wash_trade_score(wash_trade_pairs, token_data)
+        wash_trade_score, wash_context = self._calculate_wash_trade_score(wash_trade_pairs, summary)
         if wash_trade_score > 0:
             reasoning.append(wash_context)
         
@@ -71,7 +75,7 @@ class RiskScorer:
             "cluster": cluster_score
         }
         metrics["reasoning"] = reasoning
-        metrics["confidence"], metrics["dataQuality"] = self._compute_confidence(token_data)
+        metrics["confidence"], metrics["dataQuality"] = self._compute_confidence(summary)
         analysis_results["metrics"] = metrics
         
         return min(risk_score, 1.0)  # Cap à 1.0
@@ -90,7 +94,7 @@ class RiskScorer:
         # Score proportionnel au nombre de mixers
         return min(mixer_count / max(total_addresses, 1), 1.0)
     
-    def _calculate_wash_trade_score(self, wash_trade_pairs: List[Dict], token_data: Dict) -> (float, str):
+    def _calculate_wash_trade_score(self, wash_trade_pairs: List[Dict], summary: TokenSummary) -> (float, str):
         """Score pondéré par volume et burst pour wash trading, avec normalisation dynamique.
         Retourne (score, contexte_raisonnement).
         """
@@ -103,12 +107,11 @@ class RiskScorer:
         high_burst_pairs = sum(1 for p in wash_trade_pairs if p.get("window_seconds", 0) > 0 and p.get("transaction_count", 0) >= 5)
         
         # Contexte global du token pour normalisation
-        txs = token_data.get("transactions", []) or []
-        total_transferred_volume = sum(float(t.get("value", 0.0)) for t in txs)
-        wallet_count = len(token_data.get("all_wallets", []) or [])
+        total_transferred_volume = summary.total_volume
+        wallet_count = summary.wallet_count
         
-        # Normalisation du volume: ratio du volume suspect / volume total (ou fallback sur Config)
-        normalizer = total_transferred_volume if total_transferred_volume > 0 else max(Config.__dict__.get("WASH_TRADE_VOLUME_NORMALIZER", 100000.0), 1.0)
+        # Normalisation du volume: ratio du volume suspect / volume total (ou fallback sur les settings)
+        normalizer = total_transferred_volume if total_transferred_volume > 0 else max(self.settings.wash_trade_volume_normalizer, 1.0)
         volume_component = min(total_suspicious_volume / normalizer, 1.0)
         
         # Normalisation du compte de paires par diversité (plus il y a de wallets, plus le seuil augmente)
@@ -158,32 +161,25 @@ class RiskScorer:
         # Normaliser: 20+ wallets suspects = score 1.0
         return min(total_suspicious_wallets / 20.0, 1.0)
     
-    def _compute_confidence(self, token_data: Dict) -> (str, Dict):
+    def _compute_confidence(self, summary: TokenSummary) -> (str, Dict):
         """Calcule niveau de confiance et qualité des données pour transparence."""
-        txs = token_data.get("transactions", []) or []
-        wallets = token_data.get("all_wallets", []) or []
-        
-        # Estimer période couverte si timestamps présents
-        timestamps = [t.get("timestamp") for t in txs if t.get("timestamp")]
-        time_span_days = 0
-        if timestamps:
-            try:
-                time_span_days = max(0, (max(timestamps) - min(timestamps)) / 86400.0)
-            except Exception:
-                time_span_days = 0
-        
-        sufficient_data = (len(txs) >= 100 and time_span_days >= 7)
-        if len(txs) >= 1000 and time_span_days >= 30:
+        tx_count = summary.transfer_count
+        
+        # Période couverte (bornes calculées à l'ingestion)
+        time_span_days = summary.time_span_seconds / 86400.0
+        
+        sufficient_data = (tx_count >= 100 and time_span_days >= 7)
+        if tx_count >= 1000 and time_span_days >= 30:
             confidence = "high"
-        elif len(txs) >= 100 and time_span_days >= 7:
+        elif tx_count >= 100 and time_span_days >= 7:
             confidence = "medium"
         else:
             confidence = "low"
         
         data_quality = {
-            "transactionCount": len(txs),
+            "transactionCount": tx_count,
             "timeSpanDays": round(time_span_days, 1),
-            "walletCount": len(wallets),
+            "walletCount": summary.wallet_count,
             "sufficientData": sufficient_data
         }
         return confidence, data_quality
@@ -0,0 +1,121 @@
+"""
+Serialization Module
+Encodage JSON rapide des grosses réponses (orjson si installé, sinon json standard),
+MessagePack sur demande (Accept: application/msgpack, si msgpack est installé)
+et compression négociée via Accept-Encoding (brotli si installé, sinon gzip).
+Les gros corps sont compressés dans un thread (la boucle asyncio reste libre).
+"""
+import asyncio
+import gzip
+import json
+from typing import Any, Dict, Optional
+
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # dépendance optionnelle
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(obj: Any) -> bytes:
+    """JSON en bytes; les types inconnus sont convertis en str (comme json.dumps(default=str))"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=str, separators=(",", ":")).encode()
+
+
+def packb(obj: Any) -> bytes:
+    """MessagePack; les types inconnus sont convertis en str"""
+    return msgpack.packb(obj, default=str, use_bin_type=True)
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """MessagePack si le client le demande explicitement et si msgpack est installé, sinon JSON"""
+    if msgpack is None or not accept:
+        return JSON_MEDIA_TYPE
+    for part in accept.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() in (MSGPACK_MEDIA_TYPE, "application/x-msgpack"):
+            return JSON_MEDIA_TYPE if params.strip().replace(" ", "") in ("q=0", "q=0.0") else MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def encode_body(obj: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    return packb(obj) if media_type == MSGPACK_MEDIA_TYPE else dumps(obj)
+
+
+def available_encodings() -> tuple:
+    """Encodages supportés, par ordre de préférence"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Choisit l'encodage préféré accepté par le client (q=0 exclut), None = identity"""
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in available_encodings():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=Config.BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=Config.GZIP_LEVEL)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+async def encode_for_client(
+    body: bytes,
+    accept_encoding: Optional[str],
+    variants: Optional[Dict[str, bytes]] = None,
+) -> tuple:
+    """
+    Retourne (corps, encodage ou None). Les petits corps ne sont pas compressés,
+    ceux d'au moins COMPRESS_THREAD_MIN_BYTES sont compressés hors de la boucle (asyncio.to_thread).
+    variants: cache des versions déjà compressées (par encodage) pour ce corps
+    """
+    if len(body) < Config.COMPRESS_MIN_BYTES:
+        return body, None
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is None:
+        return body, None
+    if variants is not None and encoding in variants:
+        return variants[encoding], encoding
+    if len(body) >= Config.COMPRESS_THREAD_MIN_BYTES:
+        encoded = await asyncio.to_thread(compress, body, encoding)
+    else:
+        encoded = compress(body, encoding)
+    if variants is not None:
+        variants[encoding] = encoded
+    return encoded, encoding
@@ -0,0 +1,96 @@
+"""
+Token Summary Module
+Statistiques agrégées d'un token calculées une seule fois à l'ingestion
+(volume total, bornes temporelles, comptages, distribution des balances).
+RiskScorer et GraphAnalyzer les consomment au lieu de re-parcourir les transferts.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class TokenSummary:
+    """
+    Résumé d'un lot de transferts.
+    balances: balances non nulles des wallets telles que vues par le graphe
+    (top holders), triées par ordre croissant. Les autres wallets ont une balance 0.
+    """
+
+    def __init__(
+        self,
+        total_volume: float = 0.0,
+        min_timestamp: Optional[int] = None,
+        max_timestamp: Optional[int] = None,
+        transfer_count: int = 0,
+        wallet_count: int = 0,
+        balances: Optional[Sequence[float]] = None,
+    ):
+        self.total_volume = float(total_volume)
+        self.min_timestamp = min_timestamp
+        self.max_timestamp = max_timestamp
+        self.transfer_count = int(transfer_count)
+        self.set_wallets(wallet_count, balances)
+
+    def set_wallets(self, wallet_count: int, balances: Optional[Sequence[float]] = None):
+        """Nombre de wallets et balances (top holders), connus une fois les transferts parcourus"""
+        self.wallet_count = int(wallet_count)
+        self.balances = np.sort(np.asarray(balances if balances is not None else [], dtype=float))
+
+    def add_transfer(self, value: float, timestamp: Optional[int]):
+        """Ajoute un transfert au résumé (volume, bornes temporelles, comptage)"""
+        self.total_volume += value
+        if timestamp:
+            if self.min_timestamp is None or timestamp < self.min_timestamp:
+                self.min_timestamp = timestamp
+            if self.max_timestamp is None or timestamp > self.max_timestamp:
+                self.max_timestamp = timestamp
+        self.transfer_count += 1
+
+    @classmethod
+    def from_transactions(cls, transactions: List[Dict], wallet_count: int = 0,
+                          balances: Optional[Sequence[float]] = None) -> "TokenSummary":
+        """Calcule le résumé en un seul passage sur les transferts"""
+        summary = cls(wallet_count=wallet_count, balances=balances)
+        for tx in transactions:
+            summary.add_transfer(float(tx.get("value", 0.0)), tx.get("timestamp"))
+        return summary
+
+    @classmethod
+    def from_token_data(cls, token_data: Dict) -> "TokenSummary":
+        """Résumé attaché par DataFetcher, ou recalculé pour des données plus anciennes"""
+        summary = token_data.get("summary")
+        if isinstance(summary, cls):
+            return summary
+        return cls.from_transactions(
+            token_data.get("transactions", []) or [],
+            wallet_count=len(token_data.get("all_wallets", []) or []),
+            balances=[h.get("balance", 0) for h in token_data.get("top_holders", []) or []],
+        )
+
+    @property
+    def time_span_seconds(self) -> float:
+        if self.min_timestamp is None or self.max_timestamp is None:
+            return 0.0
+        return max(0.0, float(self.max_timestamp - self.min_timestamp))
+
+    def gini(self, node_count: Optional[int] = None) -> float:
+        """
+        Coefficient de Gini sur node_count wallets (défaut: wallet_count),
+        les wallets absents de balances comptant pour 0.
+        """
+        n = max(int(node_count if node_count is not None else self.wallet_count), len(self.balances))
+        total = float(np.sum(self.balances))
+        if n == 0 or total == 0:
+            return 0.0
+        # Les zéros occupent les premiers rangs de la distribution triée
+        ranks = np.arange(n - len(self.balances) + 1, n + 1)
+        return float((2 * np.sum(ranks * self.balances)) / (n * total) - (n + 1) / n)
+
+    def to_dict(self) -> Dict:
+        return {
+            "total_volume": self.total_volume,
+            "min_timestamp": self.min_timestamp,
+            "max_timestamp": self.max_timestamp,
+            "transfer_count": self.transfer_count,
+            "wallet_count": self.wallet_count,
+        }
@@ -2,19 +2,24 @@
 Utility Functions
 Helpers pour mixer detection, etc.
 """
-from typing import Dict, List
-from config import Config
+from typing import Dict, List, Optional
+from src.label_registry import get_label_registry, label_names, LABEL_MIXER
 
 
-def check_mixer_flags(addresses: List[str]) -> List[Dict]:
+def check_mixer_flags(addresses: List[str], address_labels: Optional[Dict[str, int]] = None) -> List[Dict]:
     """
     Vérifie si des adresses sont liées à des mixers connus
+    address_labels: labels déjà repérés à l'ingestion (token_data["address_labels"]),
+    sinon lookup batch dans le registre de labels
     """
     flags = []
-    known_mixers_lower = {m.lower() for m in Config.KNOWN_MIXERS}
+    if address_labels is not None:
+        codes = [address_labels.get(a.lower(), 0) for a in addresses]
+    else:
+        codes = get_label_registry().lookup([a.lower() for a in addresses])
     
-    for address in addresses:
-        is_mixer = address.lower() in known_mixers_lower
+    for address, code in zip(addresses, codes):
+        is_mixer = bool(code & LABEL_MIXER)
         
         # Vérifier aussi les connexions directes (si on a les données)
         # Pour MVP, on vérifie seulement les adresses exactes
@@ -22,7 +27,7 @@ def check_mixer_flags(addresses: List[str]) -> List[Dict]:
         flags.append({
             "address": address,
             "is_mixer": is_mixer,
-            "mixer_type": "Tornado Cash" if is_mixer else None
+            "labels": label_names(int(code))
         })
     
     return flags
@@ -0,0 +1,168 @@
+"""
+Viewport Module
+Index spatial (grille) sur le layout précalculé d'une analyse (x/y de graph_data).
+Une requête viewport (bbox + zoom) renvoie les nœuds visibles, plafonnés par cellule
+d'écran (les plus gros PageRank d'abord), les liens entre les nœuds renvoyés et un
+échantillon clairsemé du reste du graphe pour garder le contexte.
+"""
+import math
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config import Config
+
+BBox = Tuple[float, float, float, float]
+
+
+def parse_bbox(bbox: str) -> BBox:
+    """"min_x,min_y,max_x,max_y" -> tuple (ValueError si invalide)"""
+    try:
+        min_x, min_y, max_x, max_y = (float(value) for value in bbox.split(","))
+    except (AttributeError, ValueError):
+        raise ValueError("bbox must be 'min_x,min_y,max_x,max_y'")
+    if not all(math.isfinite(value) for value in (min_x, min_y, max_x, max_y)):
+        raise ValueError("bbox values must be finite numbers")
+    if min_x > max_x or min_y > max_y:
+        raise ValueError("bbox min must be <= max")
+    return min_x, min_y, max_x, max_y
+
+
+def _bucket_top(indices: Sequence[int], xs: List[float], ys: List[float], cell: float, per_cell: int) -> List[int]:
+    """Garde au plus per_cell nœuds par cellule de taille cell (indices déjà triés par priorité)"""
+    counts: Dict[Tuple[int, int], int] = defaultdict(int)
+    kept = []
+    for i in indices:
+        key = (math.floor(xs[i] / cell), math.floor(ys[i] / cell))
+        if counts[key] < per_cell:
+            counts[key] += 1
+            kept.append(i)
+    return kept
+
+
+class ViewportIndex:
+    """
+    Grille uniforme sur les positions des nœuds d'un graph_data (format "objects" avec x/y).
+    Chaque cellule liste ses nœuds par priorité décroissante (mixer, puis PageRank).
+    """
+
+    def __init__(self, graph_data: Dict, cell_size: Optional[float] = None):
+        placed = [node for node in graph_data.get("nodes") or [] if "x" in node and "y" in node]
+        # Ordre de priorité global: l'ordre des listes est conservé dans chaque cellule
+        placed.sort(key=lambda node: (not node.get("is_mixer"), -node.get("pagerank", 0)))
+        self.nodes = placed
+        self.xs = [node["x"] for node in placed]
+        self.ys = [node["y"] for node in placed]
+        self.position = {node["id"]: i for i, node in enumerate(placed)}
+
+        if placed:
+            self.extent = (min(self.xs), min(self.ys), max(self.xs), max(self.ys))
+        else:
+            self.extent = (0.0, 0.0, 0.0, 0.0)
+        width = max(self.extent[2] - self.extent[0], self.extent[3] - self.extent[1], 1.0)
+        # ~4 nœuds par cellule en moyenne
+        self.cell_size = cell_size or width / max(1.0, math.sqrt(len(placed) / 4))
+
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i in range(len(placed)):
+            self.cells[self._cell(self.xs[i], self.ys[i])].append(i)
+
+        # Liens sortants par nœud (indices dans graph_data["links"])
+        self.links = graph_data.get("links") or []
+        self.outgoing: Dict[int, List[int]] = defaultdict(list)
+        for link_index, link in enumerate(self.links):
+            source = self.position.get(link["source"])
+            if source is not None and link["target"] in self.position:
+                self.outgoing[source].append(link_index)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _in_bbox(self, i: int, bbox: BBox) -> bool:
+        return bbox[0] <= self.xs[i] <= bbox[2] and bbox[1] <= self.ys[i] <= bbox[3]
+
+    def query(self, bbox: BBox) -> List[int]:
+        """Indices des nœuds dans bbox, par priorité décroissante"""
+        min_cx, min_cy = self._cell(bbox[0], bbox[1])
+        max_cx, max_cy = self._cell(bbox[2], bbox[3])
+        found = []
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self.cells):
+            # bbox plus grande que le graphe: parcourir les cellules existantes
+            candidates = (
+                indices for (cx, cy), indices in self.cells.items()
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy
+            )
+        else:
+            candidates = (
+                self.cells[(cx, cy)]
+                for cx in range(min_cx, max_cx + 1)
+                for cy in range(min_cy, max_cy + 1)
+                if (cx, cy) in self.cells
+            )
+        for indices in candidates:
+            found.extend(i for i in indices if self._in_bbox(i, bbox))
+        found.sort()
+        return found
+
+    def viewport(self, bbox: BBox, zoom: float = 1.0) -> Dict:
+        """
+        Nœuds visibles (plafonnés par cellule d'écran de VIEWPORT_CELL_PIXELS pixels),
+        échantillon hors viewport (1 nœud par cellule VIEWPORT_CONTEXT_FACTOR fois plus grande)
+        et liens entre tous les nœuds renvoyés
+        """
+        zoom = max(zoom, 1e-6)
+        screen_cell = Config.VIEWPORT_CELL_PIXELS / zoom  # taille d'une cellule d'écran en unités du layout
+
+        visible = self.query(bbox)
+        shown = _bucket_top(visible, self.xs, self.ys, screen_cell, Config.VIEWPORT_NODES_PER_CELL)
+        shown = shown[:Config.VIEWPORT_MAX_NODES]
+
+        # Contexte: tête de chaque cellule de la grille, hors bbox, clairsemée
+        leaders = sorted(
+            indices[0] for indices in self.cells.values()
+            if not self._in_bbox(indices[0], bbox)
+        )
+        context = _bucket_top(
+            leaders, self.xs, self.ys, screen_cell * Config.VIEWPORT_CONTEXT_FACTOR, 1
+        )[:Config.VIEWPORT_MAX_CONTEXT_NODES]
+
+        returned = set(shown) | set(context)
+        links = [
+            self.links[link_index]
+            for i in returned
+            for link_index in self.outgoing.get(i, ())
+            if self.position[self.links[link_index]["target"]] in returned
+        ]
+        return {
+            "nodes": [self.nodes[i] for i in shown],
+            "context": [self.nodes[i] for i in context],
+            "links": links,
+            "stats": {
+                "visible_total": len(visible),
+                "returned": len(shown),
+                "context": len(context),
+                "links": len(links),
+                "total_nodes": len(self.nodes),
+                "extent": list(self.extent),
+            },
+        }
+
+
+class ViewportIndexCache:
+    """Index construits récemment (LRU par analysis_id): la construction est O(n), les requêtes non"""
+
+    def __init__(self, max_items: Optional[int] = None):
+        self.max_items = max_items or Config.VIEWPORT_INDEX_CACHE_ITEMS
+        self._indexes: "OrderedDict[str, ViewportIndex]" = OrderedDict()
+
+    def get(self, analysis_id: str) -> Optional[ViewportIndex]:
+        index = self._indexes.get(analysis_id)
+        if index is not None:
+            self._indexes.move_to_end(analysis_id)
+        return index
+
+    def put(self, analysis_id: str, index: ViewportIndex) -> ViewportIndex:
+        self._indexes[analysis_id] = index
+        self._indexes.move_to_end(analysis_id)
+        while len(self._indexes) > self.max_items:
+            self._indexes.popitem(last=False)
+        return index
@@ -4,8 +4,9 @@ Détecte les transactions répétées entre mêmes paires (wash trading)
 Amélioré: fenêtre temporelle (burst) et filtrage whitelist protocoles
 """
 import networkx as nx
-from typing import Dict, List
-from config import Config
+from typing import Dict, List, Optional
+from config import AnalysisSettings
+from src.label_registry import get_label_registry, WHITELIST_MASK
 
 
 class WashTradeDetector:
@@ -17,16 +18,27 @@ class WashTradeDetector:
     - Filtrage des adresses de protocoles connus (DEX, staking, bridges)
     """
     
-    def __init__(self, graph: nx.DiGraph):
+    def __init__(self, graph: nx.DiGraph, settings: Optional[AnalysisSettings] = None):
         self.graph = graph
+        self.settings = settings or AnalysisSettings.from_config()
     
     def detect(self) -> List[Dict]:
         """
         Détecte les paires suspectes de wash trading
         """
         wash_trade_pairs = []
-        whitelist = {addr.lower() for addr in getattr(Config, "PROTOCOL_WHITELIST", set())}
-        burst_window = getattr(Config, "WASH_TRADE_BURST_WINDOW_SECONDS", 2 * 60 * 60)  # défaut: 2h
+        # Whitelist (protocoles, DEX routers, CEX): labels posés à l'ingestion si disponibles,
+        # sinon lookup batch dans le registre de labels
+        if self.graph.graph.get("labels_screened"):
+            whitelist = {
+                node.lower() for node, labels in self.graph.nodes(data="labels", default=0)
+                if labels & WHITELIST_MASK
+            }
+        else:
+            whitelist = get_label_registry().addresses_with(
+                (node.lower() for node in self.graph.nodes()), WHITELIST_MASK
+            )
+        burst_window = self.settings.wash_trade_burst_window_seconds  # défaut: 2h
         
         # Parcourir toutes les edges
         for from_addr, to_addr, data in self.graph.edges(data=True):
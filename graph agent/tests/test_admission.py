@@ -0,0 +1,103 @@
+"""
+Tests pour le contrôle d'admission (/analyze)
+"""
+import asyncio
+import pytest
+from src.admission import (
+    AdmissionController, AdmissionRejected, PRIORITY_CACHED, PRIORITY_DEFAULT
+)
+
+
+def test_priority_order_and_rejections():
+    async def scenario():
+        controller = AdmissionController(
+            max_concurrent=1, max_queue=2, per_client=1, sla_seconds=10, initial_service_seconds=1
+        )
+        order = []
+        release = asyncio.Event()
+
+        async def run(client, priority, name):
+            async with controller.admit(client, priority):
+                order.append(name)
+                await release.wait()
+
+        first = asyncio.create_task(run("a", PRIORITY_DEFAULT, "first"))
+        await asyncio.sleep(0)
+        slow = asyncio.create_task(run("b", PRIORITY_DEFAULT, "slow"))
+        await asyncio.sleep(0)
+        cached = asyncio.create_task(run("c", PRIORITY_CACHED, "cached"))
+        await asyncio.sleep(0)
+
+        # File pleine -> 503
+        with pytest.raises(AdmissionRejected) as queue_full:
+            async with controller.admit("d", PRIORITY_DEFAULT):
+                pass
+        # Limite par client (le client "a" a déjà une analyse en cours) -> 429
+        with pytest.raises(AdmissionRejected) as client_limit:
+            async with controller.admit("a", PRIORITY_CACHED):
+                pass
+
+        release.set()
+        await asyncio.gather(first, slow, cached)
+        return order, queue_full.value, client_limit.value, controller.stats()
+
+    order, queue_full, client_limit, stats = asyncio.run(scenario())
+    # La requête "cached" passe devant "slow", arrivée plus tôt
+    assert order == ["first", "cached", "slow"]
+    assert queue_full.status_code == 503 and queue_full.retry_after >= 1
+    assert client_limit.status_code == 429
+    assert stats["active"] == 0 and stats["queued"] == 0
+    assert stats["rejected"] == {"queue_full": 1, "client_limit": 1}
+
+
+def test_sla_rejection():
+    async def scenario():
+        controller = AdmissionController(
+            max_concurrent=1, max_queue=10, per_client=10, sla_seconds=5, initial_service_seconds=4
+        )
+        hold = asyncio.Event()
+
+        async def run():
+            async with controller.admit("a"):
+                await hold.wait()
+
+        tasks = [asyncio.create_task(run()) for _ in range(2)]
+        await asyncio.sleep(0)
+        # 1 en cours + 1 en attente: (1 + 1) / 1 * 4s = 8s > 5s
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.admit("b"):
+                pass
+        hold.set()
+        await asyncio.gather(*tasks)
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert rejected.retry_after == 8
+
+
+def test_rejected_clients_leave_no_entries():
+    async def scenario():
+        controller = AdmissionController(
+            max_concurrent=1, max_queue=0, per_client=1, sla_seconds=10, initial_service_seconds=1
+        )
+        release = asyncio.Event()
+
+        async def run():
+            async with controller.admit("a"):
+                await release.wait()
+
+        task = asyncio.create_task(run())
+        await asyncio.sleep(0)
+        for client in ("b", "c", "d"):
+            with pytest.raises(AdmissionRejected):
+                async with controller.admit(client):
+                    pass
+        clients_while_busy = dict(controller._clients)
+        release.set()
+        await task
+        return clients_while_busy, dict(controller._clients)
+
+    busy, idle = asyncio.run(scenario())
+    assert busy == {"a": 1}
+    assert idle == {}
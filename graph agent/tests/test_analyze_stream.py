@@ -0,0 +1,29 @@
+"""
+Tests pour /analyze/stream (ordre des événements SSE)
+"""
+from fastapi.testclient import TestClient
+
+from config import Config
+
+if not (Config.ALCHEMY_API_KEY or Config.BITQUERY_ACCESS_TOKEN or Config.ETHERSCAN_API_KEY):
+    Config.ALCHEMY_API_KEY = "test-key"  # Config.validate() à l'import de main1 (aucun appel réseau ici)
+
+import main1  # noqa: E402
+
+
+def _stages(body: bytes):
+    return [line[len(b"event: "):].decode() for line in body.splitlines() if line.startswith(b"event: ")]
+
+
+def test_stream_emits_metadata_then_top_holders_once(monkeypatch):
+    async def fake_fetch(self, token_address):
+        return {"metadata": {"symbol": "TKN"}, "top_holders": [{"address": "0x" + "a" * 40}], "transactions": []}
+
+    async def fake_finish(request, settings, token_data, progress, start_time):
+        return {"token_address": request.token_address}
+
+    monkeypatch.setattr(main1.DataFetcher, "fetch_token_data", fake_fetch)
+    monkeypatch.setattr(main1, "_finish_analysis", fake_finish)
+    response = TestClient(main1.app).post("/analyze/stream", json={"token_address": "0x" + "1" * 40})
+    assert response.status_code == 200
+    assert _stages(response.content) == ["metadata", "top_holders", "result"]
@@ -35,8 +35,23 @@ def test_simple_graph():
     assert len(results["top_holders"]) > 0
 
 
+def test_partial_results_in_order():
+    """Les résultats partiels sont publiés dans l'ordre: pagerank puis clusters"""
+    graph = nx.DiGraph()
+    graph.add_edge("0x1", "0x2", weight=100, count=1)
+    graph.add_edge("0x2", "0x3", weight=50, count=1)
+    
+    stages = []
+    results = GraphAnalyzer(graph).analyze(on_stage=lambda stage, data: stages.append((stage, data)))
+    
+    assert [stage for stage, _ in stages] == ["pagerank", "clusters"]
+    assert stages[0][1] == results["metrics"]["pagerank"]
+    assert stages[1][1]["suspicious_clusters"] == results["suspicious_clusters"]
+
+
 if __name__ == "__main__":
     test_empty_graph()
     test_simple_graph()
+    test_partial_results_in_order()
     print("✅ Tests passed")
 
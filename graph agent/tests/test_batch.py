@@ -0,0 +1,94 @@
+"""
+Tests pour /analyze/batch (concurrence bornée, flux NDJSON)
+"""
+import asyncio
+
+import orjson
+from fastapi.testclient import TestClient
+
+from config import Config
+
+if not (Config.ALCHEMY_API_KEY or Config.BITQUERY_ACCESS_TOKEN or Config.ETHERSCAN_API_KEY):
+    Config.ALCHEMY_API_KEY = "test-key"  # Config.validate() à l'import de main1 (aucun appel réseau ici)
+
+import main1  # noqa: E402
+
+TOKENS = ["0x" + f"{i:040x}" for i in range(1, 7)]
+
+
+def _post_batch(monkeypatch, delays, **body):
+    state = {"running": 0, "peak": 0}
+
+    async def fake_run_analysis(request, progress=None):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        try:
+            await asyncio.sleep(delays[request.token_address])
+            if request.token_address == TOKENS[-1]:
+                raise main1.HTTPException(status_code=404, detail="No transactions found")
+            return {"token_address": request.token_address}
+        finally:
+            state["running"] -= 1
+
+    monkeypatch.setattr(main1, "run_analysis", fake_run_analysis)
+    response = TestClient(main1.app).post(
+        "/analyze/batch", json={"tokens": [{"token_address": t} for t in TOKENS], **body}
+    )
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    return response, lines, state
+
+
+def test_batch_bounded_concurrency(monkeypatch):
+    response, lines, state = _post_batch(monkeypatch, {t: 0.02 for t in TOKENS}, concurrency=2)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert state["peak"] == 2
+    assert sorted(line["index"] for line in lines) == list(range(len(TOKENS)))
+
+
+def test_batch_streams_in_completion_order(monkeypatch):
+    # Les premiers tokens sont les plus lents: ils arrivent en dernier
+    delays = {t: 0.01 * (len(TOKENS) - i) for i, t in enumerate(TOKENS)}
+    monkeypatch.setattr(main1.admission, "per_client", len(TOKENS))
+    _, lines, _ = _post_batch(monkeypatch, delays, concurrency=len(TOKENS))
+    assert [line["index"] for line in lines] == list(reversed(range(len(TOKENS))))
+    for line in lines:
+        assert line["token_address"] == TOKENS[line["index"]]
+    assert lines[0]["status"] == "error" and lines[0]["status_code"] == 404
+    assert all(line["status"] == "ok" for line in lines[1:])
+
+
+def test_batch_concurrency_capped_by_admission(monkeypatch):
+    monkeypatch.setattr(main1.admission, "per_client", 3)
+    _, lines, state = _post_batch(monkeypatch, {t: 0.02 for t in TOKENS}, concurrency=50)
+    assert state["peak"] == 3
+    assert main1.admission.stats()["active"] == 0
+
+
+def test_batch_admission_rejection_is_a_line(monkeypatch):
+    monkeypatch.setattr(main1.admission, "max_concurrent", 1)
+    monkeypatch.setattr(main1.admission, "max_queue", 0)
+    _, lines, _ = _post_batch(monkeypatch, {t: 0.02 for t in TOKENS}, concurrency=2)
+    rejected = [line for line in lines if line["status"] == "error" and line["status_code"] == 503]
+    assert rejected and all(line["retry_after"] >= 1 for line in rejected)
+
+
+def test_batch_rejects_empty_and_oversized(monkeypatch):
+    client = TestClient(main1.app)
+    assert client.post("/analyze/batch", json={"tokens": []}).status_code == 400
+    monkeypatch.setattr(Config, "BATCH_MAX_TOKENS", 2)
+    too_many = {"tokens": [{"token_address": t} for t in TOKENS]}
+    assert client.post("/analyze/batch", json=too_many).status_code == 400
+
+
+def test_batch_applies_fields_and_rejects_bad_options(monkeypatch):
+    async def fake_run_analysis(request, progress=None):
+        return {"token_address": request.token_address, "top_holders": [], "graph_data": {"nodes": []}}
+
+    monkeypatch.setattr(main1, "run_analysis", fake_run_analysis)
+    client = TestClient(main1.app)
+    tokens = [{"token_address": t} for t in TOKENS[:2]]
+    response = client.post("/analyze/batch", json={"tokens": tokens, "fields": ["top_holders"]})
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    assert all(set(line["result"]) == {"token_address", "top_holders"} for line in lines)
+    assert client.post("/analyze/batch", json={"tokens": tokens, "graph_format": "xml"}).status_code == 400
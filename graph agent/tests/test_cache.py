@@ -0,0 +1,96 @@
+"""
+Tests pour le cache compressé borné en octets (et stale-while-revalidate du DataFetcher)
+"""
+import asyncio
+import time
+from config import Config
+from src.cache import CompressedLRUCache, SQLiteCache, FRESH, STALE
+from src.data_fetcher import DataFetcher
+
+
+def _payload(n):
+    return {"transactions": [{"hash": f"0x{i:064x}", "value": float(i)} for i in range(n)]}
+
+
+def test_byte_budget_eviction():
+    small = CompressedLRUCache(max_bytes=10**9, ttl_seconds=60, stale_seconds=0)
+    big_size = small.set("big", _payload(5000))
+    small_size = small.set("small", _payload(10))
+    assert small_size < big_size
+
+    cache = CompressedLRUCache(max_bytes=big_size + small_size * 3, ttl_seconds=60, stale_seconds=0)
+    cache.set("big", _payload(5000))
+    for i in range(3):
+        cache.set(f"small{i}", _payload(10))
+    assert cache.get("big")[1] == FRESH  # "big" redevient la plus récente
+    cache.set("small3", _payload(10))
+    # Les petites entrées les moins récentes sont évincées en premier
+    assert cache.get("small0") == (None, None)
+    assert cache.get("big")[0] == _payload(5000)
+    assert cache.size_bytes <= cache.max_bytes
+    # Entrée plus grosse que le budget: ignorée, le cache n'est pas vidé
+    tiny = CompressedLRUCache(max_bytes=small_size * 2, ttl_seconds=60, stale_seconds=0)
+    tiny.set("small", _payload(10))
+    tiny.set("big", _payload(5000))
+    assert tiny.get("big") == (None, None)
+    assert tiny.get("small")[1] == FRESH
+
+
+def test_stale_window_and_copies():
+    cache = CompressedLRUCache(max_bytes=10**6, ttl_seconds=0.05, stale_seconds=60)
+    cache.set("k", {"a": [1]})
+    value, state = cache.get("k")
+    assert state == FRESH
+    value["a"].append(2)
+    assert cache.get("k")[0] == {"a": [1]}
+    time.sleep(0.06)
+    assert cache.get("k")[1] == STALE
+
+
+def test_stale_entry_served_while_refreshing(monkeypatch):
+    monkeypatch.setattr(Config, "ETHERSCAN_API_KEY", "test")
+    monkeypatch.setattr(DataFetcher, "_cache", CompressedLRUCache(max_bytes=10**6, ttl_seconds=0, stale_seconds=60))
+    fetches = []
+
+    async def fake_fetch(self, token_address, key):
+        fetches.append(token_address)
+        await asyncio.sleep(0.01)
+        result = {"total_transactions_fetched": 1, "version": len(fetches)}
+        await self._cache_set(key, result)
+        return result
+
+    monkeypatch.setattr(DataFetcher, "_fetch_token_data_uncached", fake_fetch)
+
+    async def scenario():
+        fetcher = DataFetcher(preferred_provider="etherscan")
+        first = await fetcher.fetch_token_data("0xabc")
+        time.sleep(0.01)
+        # Périmée: servie immédiatement, un seul rafraîchissement lancé
+        stale = await asyncio.gather(*(fetcher.fetch_token_data("0xabc") for _ in range(3)))
+        assert len(DataFetcher._refresh_tasks) == 1
+        await asyncio.gather(*DataFetcher._refresh_tasks.values())
+        return first, stale
+
+    first, stale = asyncio.run(scenario())
+    assert first["version"] == 1
+    assert [s["version"] for s in stale] == [1, 1, 1]
+    assert len(fetches) == 2
+
+
+def test_sqlite_cache_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    size = CompressedLRUCache(max_bytes=10**9).set("probe", _payload(200))
+    worker1 = SQLiteCache(path=path, max_bytes=size * 3 + size // 2, ttl_seconds=60, stale_seconds=0)
+    worker2 = SQLiteCache(path=path, max_bytes=size * 3 + size // 2, ttl_seconds=60, stale_seconds=0)
+    worker1.set("a", _payload(200))
+    # Écrit par un worker, lu par l'autre (et après "redémarrage")
+    assert worker2.get("a") == (_payload(200), FRESH)
+    assert SQLiteCache(path=path, ttl_seconds=60).get("a")[0] == _payload(200)
+    for key in ("b", "c", "d"):
+        worker2.set(key, _payload(200))
+    assert worker1.get("a") == (None, None)
+    assert len(worker1) == 3
+    assert worker1.size_bytes <= worker1.max_bytes
+
+    expired = SQLiteCache(path=path, ttl_seconds=0, stale_seconds=60)
+    assert expired.get("d")[1] == STALE
@@ -0,0 +1,73 @@
+"""
+Tests pour l'exécution Cypher asynchrone de /chat (driver async factice)
+"""
+import asyncio
+import pytest
+from src.agents import chat_agent
+
+
+class FakeRecord:
+    def __init__(self, i):
+        self.i = i
+
+    def data(self):
+        return {"i": self.i}
+
+
+class FakeAsyncResult:
+    def __init__(self, rows, delay):
+        self.rows = rows
+        self.delay = delay
+
+    async def __aiter__(self):
+        for i in range(self.rows):
+            await asyncio.sleep(self.delay)
+            yield FakeRecord(i)
+
+
+class FakeAsyncSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, params):
+        self.driver.queries.append((query.text, query.timeout, params))
+        return FakeAsyncResult(self.driver.rows, self.driver.delay)
+
+
+class FakeAsyncDriver:
+    def __init__(self, rows=5, delay=0.0):
+        self.rows = rows
+        self.delay = delay
+        self.queries = []
+
+    def session(self, **kwargs):
+        return FakeAsyncSession(self)
+
+
+def test_run_cypher_async_caps_rows(monkeypatch):
+    driver = FakeAsyncDriver(rows=5)
+    monkeypatch.setattr(chat_agent, "get_async_driver", lambda storage_type: driver)
+    rows = asyncio.run(chat_agent.run_cypher_async("MATCH (w) RETURN w", {"a": 1}, timeout=5, max_rows=3))
+    assert rows == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert driver.queries == [("MATCH (w) RETURN w", 5, {"a": 1})]
+
+
+def test_stream_cypher_times_out(monkeypatch):
+    driver = FakeAsyncDriver(rows=100, delay=0.05)
+    monkeypatch.setattr(chat_agent, "get_async_driver", lambda storage_type: driver)
+
+    async def scenario():
+        rows = []
+        with pytest.raises(TimeoutError):
+            async for row in chat_agent.stream_cypher("MATCH (w) RETURN w", timeout=0.12):
+                rows.append(row)
+        return rows
+
+    rows = asyncio.run(scenario())
+    assert 0 < len(rows) < 100  # lignes reçues avant l'expiration déjà transmises
@@ -0,0 +1,166 @@
+"""
+Tests pour DataFetcher (fetch partagé entre requêtes concurrentes, pagination Etherscan)
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+from config import AnalysisSettings
+from src.data_fetcher import DataFetcher
+
+
+def _fetcher(fetch):
+    fetcher = DataFetcher.__new__(DataFetcher)  # sans clés API: le fetch réel est remplacé
+    fetcher._fetch_token_data_uncached = fetch
+    return fetcher
+
+
+def test_single_flight_survives_leader_cancellation():
+    calls = []
+
+    async def fetch(token_address, key):
+        calls.append(token_address)
+        await asyncio.sleep(0.05)
+        return {"token_address": token_address}
+
+    async def scenario():
+        leader = asyncio.create_task(_fetcher(fetch)._fetch_single_flight("0xabc", "sf-cancel"))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(_fetcher(fetch)._fetch_single_flight("0xabc", "sf-cancel"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        result = await follower
+        return leader.cancelled(), result, "sf-cancel" in DataFetcher._inflight
+
+    leader_cancelled, result, still_inflight = asyncio.run(scenario())
+    assert leader_cancelled
+    assert result == {"token_address": "0xabc"}
+    assert calls == ["0xabc"]  # un seul fetch pour les deux appelants
+    assert not still_inflight
+
+
+def test_single_flight_shares_errors():
+    async def fetch(token_address, key):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def scenario():
+        results = await asyncio.gather(
+            _fetcher(fetch)._fetch_single_flight("0xdef", "sf-error"),
+            _fetcher(fetch)._fetch_single_flight("0xdef", "sf-error"),
+            return_exceptions=True,
+        )
+        return results, "sf-error" in DataFetcher._inflight
+
+    results, still_inflight = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not still_inflight
+
+
+class FakeEtherscanResponse:
+    status_code = 200
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        if not self._rows:
+            return {"status": "0", "message": "No transactions found", "result": []}
+        return {"status": "1", "result": self._rows}
+
+
+class FakeEtherscanClient:
+    """Pages tokentx de 1000 lignes (sort=desc); délai et nombre de lignes par page configurables"""
+
+    def __init__(self, sizes, delays):
+        self.sizes = sizes
+        self.delays = delays
+        self.requested = []
+        self.cancelled = []
+
+    async def get(self, url, params=None):
+        page = int(params["page"])
+        self.requested.append(page)
+        try:
+            await asyncio.sleep(self.delays.get(page, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(page)
+            raise
+        rows = [
+            {
+                "hash": f"0x{page:02d}{i:04d}",
+                "from": "0x" + "a" * 40,
+                "to": "0x" + "b" * 40,
+                "value": "1000000000000000000",
+                "tokenDecimal": "18",
+                "timeStamp": str(10_000_000 - page * 1000 - i),  # desc: décroissant au fil des pages
+                "blockNumber": "1",
+            }
+            for i in range(self.sizes.get(page, 0))
+        ]
+        return FakeEtherscanResponse(rows)
+
+
+def _etherscan_fetcher(client, max_transactions):
+    fetcher = DataFetcher.__new__(DataFetcher)
+    fetcher.chain = "ethereum"
+    fetcher.progress = None
+    fetcher.address_labels = {}
+    fetcher.settings = AnalysisSettings(max_transactions=max_transactions, max_concurrent_requests=10)
+
+    @asynccontextmanager
+    async def http_client(timeout):
+        yield client
+
+    fetcher._http_client = http_client
+    return fetcher
+
+
+def test_tokentx_short_page_cancels_higher_pages_immediately():
+    # Page 2 courte arrive tout de suite, page 1 est lente: les pages 3..5 ne doivent pas attendre page 1
+    client = FakeEtherscanClient(
+        sizes={1: 1000, 2: 10, 3: 1000, 4: 1000, 5: 1000},
+        delays={1: 0.2, 2: 0.0, 3: 5, 4: 5, 5: 5},
+    )
+    fetcher = _etherscan_fetcher(client, max_transactions=5000)
+
+    async def scenario():
+        task = asyncio.create_task(fetcher._fetch_transactions_etherscan_tokentx("0xtoken"))
+        await asyncio.sleep(0.05)  # page 2 reçue, page 1 toujours en cours
+        cancelled_early = sorted(client.cancelled)
+        return cancelled_early, await asyncio.wait_for(task, 2)
+
+    cancelled_early, transfers = asyncio.run(scenario())
+    assert cancelled_early == [3, 4, 5]
+    assert len(transfers) == 1010
+
+
+def test_tokentx_merges_pages_in_order():
+    # Pages reçues dans le désordre: fusion dans l'ordre des pages (timestamps décroissants)
+    client = FakeEtherscanClient(
+        sizes={1: 1000, 2: 1000, 3: 500},
+        delays={1: 0.06, 2: 0.03, 3: 0.0},
+    )
+    fetcher = _etherscan_fetcher(client, max_transactions=3000)
+    transfers = asyncio.run(fetcher._fetch_transactions_etherscan_tokentx("0xtoken"))
+    assert len(transfers) == 2500
+    assert [t["hash"] for t in transfers[:2]] == ["0x010000", "0x010001"]
+    assert transfers[1000]["hash"] == "0x020000"
+    assert transfers[-1]["hash"] == "0x030499"
+    timestamps = [t["timestamp"] for t in transfers]
+    assert timestamps == sorted(timestamps, reverse=True)
+    assert client.cancelled == []
+
+
+def test_tokentx_empty_page_stops_listing():
+    client = FakeEtherscanClient(sizes={1: 1000, 2: 0, 3: 1000}, delays={3: 5})
+    fetcher = _etherscan_fetcher(client, max_transactions=3000)
+
+    async def scenario():
+        return await asyncio.wait_for(fetcher._fetch_transactions_etherscan_tokentx("0xtoken"), 2)
+
+    transfers = asyncio.run(scenario())
+    assert len(transfers) == 1000
+    assert client.cancelled == [3]
@@ -0,0 +1,88 @@
+"""
+Tests des endpoints (main1) sans appel réseau: validation des paramètres, layout, cache et admission
+"""
+from fastapi.testclient import TestClient
+
+from config import Config
+from src.cache import CompressedLRUCache
+
+if not (Config.ALCHEMY_API_KEY or Config.BITQUERY_ACCESS_TOKEN or Config.ETHERSCAN_API_KEY):
+    Config.ALCHEMY_API_KEY = "test-key"  # Config.validate() à l'import de main1 (aucun appel réseau ici)
+
+import main1  # noqa: E402
+
+
+def test_viewport_rejects_non_finite_values():
+    client = TestClient(main1.app)
+    url = "/graph/0x" + "1" * 40 + "/viewport"
+    assert client.get(url, params={"bbox": "nan,0,1,1"}).status_code == 400
+    assert client.get(url, params={"bbox": "0,0,1,1", "zoom": "inf"}).status_code == 400
+
+
+def test_layout_is_built_off_request_then_stored(monkeypatch):
+    monkeypatch.setattr(main1, "analysis_store", CompressedLRUCache())
+    monkeypatch.setattr(main1, "layout_store", CompressedLRUCache())
+    nodes = [{"id": f"0x{i}"} for i in range(6)]
+    links = [{"source": f"0x{i}", "target": f"0x{i + 1}"} for i in range(5)]
+    main1.analysis_store.set("a1", {
+        "token_address": "0x" + "1" * 40,
+        "metrics": {"chain": "ethereum"},
+        "graph_data": {"nodes": nodes, "links": links},
+    })
+    result = main1.asyncio.run(main1._ensure_layout("a1"))
+    assert all("x" in node and "y" in node for node in result["graph_data"]["nodes"])
+    stored, _ = main1.analysis_store.get("a1")
+    assert main1.positions_from_graph_data(stored["graph_data"]) == main1.positions_from_graph_data(result["graph_data"])
+    assert not main1._layout_tasks
+
+
+def test_stream_and_jobs_validate_render_options():
+    client = TestClient(main1.app)
+    body = {"token_address": "0x" + "1" * 40, "graph_detail": "tiny"}
+    assert client.post("/analyze/stream", json=body).status_code == 400
+    assert client.post("/jobs", json={**body, "graph_detail": "full", "fields": ["nope"]}).status_code == 400
+
+
+def test_large_graphs_render_off_the_loop(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(Config, "RENDER_THREAD_MIN_ITEMS", 3)
+    result = {"token_address": "0xabc", "graph_data": {"nodes": [{"id": "a"}, {"id": "b"}], "links": []}}
+
+    def where(_result):
+        return threading.current_thread() is threading.main_thread()
+
+    async def scenario():
+        small = await main1._off_loop(main1._graph_size(result), where, result)
+        result["graph_data"]["links"].append({"source": "a", "target": "b"})
+        large = await main1._off_loop(main1._graph_size(result), where, result)
+        return small, large
+
+    assert main1.asyncio.run(scenario()) == (True, False)
+
+
+def test_cached_responses_bypass_admission(monkeypatch):
+    token_data = {"total_transactions_fetched": 3, "transactions": [], "metadata": {}}
+
+    async def fresh_cached_data(chain, token_address, max_transactions):
+        return token_data
+
+    def overloaded(client_id, priority):
+        raise main1.AdmissionRejected(503, "Server overloaded", 5)
+
+    monkeypatch.setattr(main1.DataFetcher, "fresh_cached_data", fresh_cached_data)
+    monkeypatch.setattr(main1.admission, "admit", overloaded)
+    request = main1.TokenAnalysisRequest(token_address="0x" + "2" * 40)
+    _, key = main1._response_keys(
+        request, main1._request_settings(request), token_data, None, "objects", "full", "application/json"
+    )
+    entry = main1.response_cache.put(key, b'{"token_address": "0x2"}')
+    client = TestClient(main1.app)
+    response = client.post("/analyze", json={"token_address": request.token_address})
+    assert response.status_code == 200 and response.headers["X-Cache"] == "HIT"
+    response = client.post("/analyze", json={"token_address": request.token_address},
+                           headers={"If-None-Match": entry.etag})
+    assert response.status_code == 304
+    # Pas en cache: l'admission s'applique
+    response = client.post("/analyze", json={"token_address": "0x" + "3" * 40})
+    assert response.status_code == 503 and response.headers["Retry-After"] == "5"
@@ -0,0 +1,112 @@
+"""
+Tests pour les drivers graph DB partagés et l'agent /chat construit une seule fois
+"""
+import asyncio
+
+import src.graph_db as graph_db
+from src.agents import chat_agent
+
+
+class FlakyDriver:
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.closed = False
+        self.checks = 0
+
+    def verify_connectivity(self):
+        self.checks += 1
+        if not self.healthy:
+            raise ConnectionError("connection refused")
+
+    def close(self):
+        self.closed = True
+
+
+def test_health_check_is_cached_and_keeps_failed_driver(monkeypatch):
+    monkeypatch.setattr(graph_db, "_drivers", {"neo4j": FlakyDriver()})
+    monkeypatch.setattr(graph_db, "_health", {})
+    driver = graph_db.get_driver("neo4j")
+    assert graph_db.check_health("neo4j")["healthy"]
+    graph_db.check_health("neo4j")  # dans l'intervalle: pas de nouvel aller-retour
+    assert driver.checks == 1
+
+    driver.healthy = False
+    status = graph_db.check_health("neo4j", force=True)
+    assert not status["healthy"] and status["error"] == "connection refused"
+    # Marqué non sain, mais pas fermé sous les écritures en cours
+    assert not driver.closed and graph_db._drivers["neo4j"] is driver
+    assert graph_db.health_status()["neo4j"]["healthy"] is False
+
+
+def test_chat_agent_is_built_once(monkeypatch):
+    built = []
+    monkeypatch.setattr(chat_agent, "_agent", None)
+    monkeypatch.setattr(chat_agent, "_build_chat_agent", lambda: built.append(1) or object())
+    assert chat_agent.get_chat_agent() is chat_agent.get_chat_agent()
+    assert built == [1]
+
+
+class FlakyAsyncDriver:
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.closed = False
+        self.checks = 0
+
+    async def verify_connectivity(self):
+        self.checks += 1
+        if not self.healthy:
+            raise ConnectionError("connection refused")
+
+    async def close(self):
+        self.closed = True
+
+
+def test_async_health_check_keeps_failed_driver(monkeypatch):
+    driver = FlakyAsyncDriver(healthy=False)
+    monkeypatch.setattr(graph_db, "_async_drivers", {"neo4j": driver})
+    monkeypatch.setattr(graph_db, "_async_health", {})
+    monkeypatch.setattr(graph_db, "_health", {})
+    status = asyncio.run(graph_db.check_async_health("neo4j"))
+    assert not status["healthy"] and status["error"] == "connection refused"
+    assert not driver.closed and graph_db._async_drivers["neo4j"] is driver
+    reported = graph_db.health_status()["neo4j"]
+    assert reported["async"]["healthy"] is False and reported["async_connected"] is True
+
+
+def test_monitor_refreshes_health_periodically(monkeypatch):
+    sync_driver, async_driver = FlakyDriver(), FlakyAsyncDriver()
+    monkeypatch.setattr(graph_db, "_drivers", {"neo4j": sync_driver})
+    monkeypatch.setattr(graph_db, "_async_drivers", {"neo4j": async_driver})
+    monkeypatch.setattr(graph_db, "_health", {})
+    monkeypatch.setattr(graph_db, "_async_health", {})
+
+    async def scenario():
+        monitor = asyncio.create_task(graph_db.monitor_health(interval=0.01))
+        await asyncio.sleep(0.1)
+        sync_driver.healthy = False  # panne détectée sans requête ni appel à /health
+        await asyncio.sleep(0.1)
+        monitor.cancel()
+        await asyncio.gather(monitor, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert sync_driver.checks >= 2 and async_driver.checks >= 2 and not sync_driver.closed
+    status = graph_db.health_status()["neo4j"]
+    assert status["healthy"] is False and status["async"]["healthy"] is True
+
+
+def test_monitor_skips_backends_without_driver(monkeypatch):
+    monkeypatch.setattr(graph_db, "_drivers", {})
+    monkeypatch.setattr(graph_db, "_async_drivers", {})
+    monkeypatch.setattr(graph_db, "_health", {})
+    monkeypatch.setattr(graph_db, "_async_health", {})
+
+    async def scenario():
+        monitor = asyncio.create_task(graph_db.monitor_health(interval=0.01))
+        await asyncio.sleep(0.05)
+        monitor.cancel()
+        await asyncio.gather(monitor, return_exceptions=True)
+
+    asyncio.run(scenario())
+    # Aucun driver créé ni sondé (Neo4j non configuré)
+    assert graph_db._drivers == {} and graph_db._async_drivers == {}
+    assert graph_db.health_status() == {}
@@ -0,0 +1,72 @@
+"""
+Tests pour l'export CSV découpé (neo4j-admin / LOAD CSV)
+"""
+import csv
+import json
+import os
+import networkx as nx
+from src.graph_export import CSVGraphExporter, admin_import_command, load_export
+from tests.test_graph_storage import FakeDriver
+
+ANALYSIS = {
+    "metrics": {"chain": "ethereum", "pagerank": {"0xA0": 0.5}},
+    "mixer_flags": [{"address": "0xA1", "is_mixer": True}],
+}
+
+
+def _graph(edges):
+    graph = nx.DiGraph()
+    for i in range(edges):
+        graph.add_edge(f"0xA{i}", f"0xB{i % 5}", weight=float(i), count=1, tx_hash=f"0x{i}")
+    graph.nodes["0xA0"]["is_top_holder"] = True
+    return graph
+
+
+def _rows(export_dir, kind):
+    with open(os.path.join(export_dir, "manifest.json")) as f:
+        entries = json.load(f)["files"][kind]
+    rows = []
+    for entry in entries:
+        with open(os.path.join(export_dir, entry["file"]), newline="") as f:
+            file_rows = list(csv.reader(f))
+        assert len(file_rows) == entry["rows"] <= 10
+        rows.extend(file_rows)
+    return rows
+
+
+def test_export_is_chunked_and_resumable(tmp_path):
+    export_dir = str(tmp_path / "export")
+    with CSVGraphExporter(export_dir, chunk_rows=10) as exporter:
+        counts = exporter.add_graph(_graph(25), "0xTOKEN1", ANALYSIS)
+    assert counts == {"wallets": 30, "tokens": 1, "transfers": 25, "holds": 1}
+
+    # Reprise: le dernier fichier (5 lignes) est complété avant d'en ouvrir un nouveau
+    with CSVGraphExporter(export_dir, chunk_rows=10) as exporter:
+        exporter.add_graph(_graph(7), "0xTOKEN2", ANALYSIS)
+    transfers = _rows(export_dir, "transfers")
+    assert len(transfers) == 32
+    assert transfers[0] == ["0xa0", "0xb0", "0xtoken1", "ethereum", "0x0", "0.0", "1"]
+
+    wallets = {row[0]: row for row in _rows(export_dir, "wallets")}
+    assert wallets["0xa0"][3:5] == ["true", "0.5"] and wallets["0xa1"][5] == "true"
+    with open(os.path.join(export_dir, "transfers_header.csv")) as f:
+        assert f.read().startswith(":START_ID(Wallet),:END_ID(Wallet)")
+
+    command = admin_import_command(export_dir)
+    assert "--nodes=Wallet=" in command and "--relationships=TRANSFERRED=" in command
+    assert "transfers_00003.csv" in command
+
+
+def test_load_export_runs_load_csv_per_file(tmp_path):
+    export_dir = str(tmp_path / "export")
+    with CSVGraphExporter(export_dir, chunk_rows=10) as exporter:
+        exporter.add_graph(_graph(25), "0xTOKEN", ANALYSIS)
+    driver = FakeDriver()
+    result = load_export(export_dir, "memgraph", driver=driver)
+
+    loads = [cypher for cypher, _ in driver.calls if cypher.startswith("LOAD CSV")]
+    assert len(loads) == 3 + 1 + 3 + 1
+    assert all("NO HEADER" in cypher for cypher in loads)
+    # Nœuds avant relations
+    assert "MERGE (w:Wallet" in loads[0] and "MERGE (w)-[:HOLDS]" in loads[-1]
+    assert result["rows"]["transfers"] == 25 and not driver.closed
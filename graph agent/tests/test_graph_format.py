@@ -0,0 +1,43 @@
+"""
+Tests pour le format compact du graphe (graph_format="compact")
+"""
+import pytest
+from src.graph_format import (
+    LINK_FLAG_WASH_TRADE, NODE_FLAG_MIXER, NODE_FLAG_SUSPICIOUS, NODE_FLAG_WASH_TRADE,
+    compact_graph, expand_graph, format_graph, validate_graph_format
+)
+
+
+def _graph_data():
+    return {
+        "nodes": [
+            {"id": "0xa", "group": 1, "pagerank": 0.5, "is_mixer": True, "balance": 10},
+            {"id": "0xb", "group": 0, "pagerank": 0.3, "is_mixer": False, "balance": 0},
+            {"id": "0xc", "group": 1, "pagerank": 0.2, "is_mixer": False, "balance": 5.5},
+        ],
+        "links": [
+            {"source": "0xa", "target": "0xb", "value": 100.0, "count": 2, "is_wash_trade": False},
+            {"source": "0xb", "target": "0xc", "value": 7.5, "count": 1, "is_wash_trade": True},
+        ],
+    }
+
+
+def test_compact_roundtrip_and_flags():
+    compact = compact_graph(_graph_data(), suspicious_wallets=["0xc"])
+    assert compact["links"]["source"] == [0, 1] and compact["links"]["target"] == [1, 2]
+    assert compact["links"]["flags"] == [0, LINK_FLAG_WASH_TRADE]
+    assert compact["nodes"]["flags"] == [
+        NODE_FLAG_MIXER, NODE_FLAG_WASH_TRADE, NODE_FLAG_WASH_TRADE | NODE_FLAG_SUSPICIOUS
+    ]
+    assert expand_graph(compact) == _graph_data()
+
+
+def test_format_graph_leaves_result_untouched():
+    result = {"graph_data": _graph_data(), "suspicious_clusters": [{"cluster_id": 1, "wallets": ["0xa"]}]}
+    assert format_graph(result, "objects") is result
+    compact = format_graph(result, "compact")
+    assert compact["graph_data"]["format"] == "compact"
+    assert result["graph_data"] == _graph_data()
+    assert validate_graph_format(None) == "objects"
+    with pytest.raises(ValueError):
+        validate_graph_format("arrow")
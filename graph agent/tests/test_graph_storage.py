@@ -0,0 +1,131 @@
+"""
+Tests pour les écritures par lots (UNWIND) et idempotentes (MERGE + diff) de GraphStorage,
+avec un driver factice
+"""
+import threading
+import networkx as nx
+from src.graph_storage import GraphSnapshot, GraphStorage
+
+
+class FakeResult:
+    def __init__(self, count):
+        self.count = count
+
+    def single(self):
+        return {"count": self.count, "wallet_count": 0, "transfer_count": 0}
+
+    def consume(self):
+        return self
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, cypher, **params):
+        with self.driver.lock:
+            self.driver.calls.append((cypher, params))
+        rows = next((v for v in params.values() if isinstance(v, list)), None)
+        return FakeResult(len(rows) if rows is not None else 1)
+
+    def execute_write(self, fn, *args):
+        return fn(self, *args)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+        self.closed = False
+
+    def verify_connectivity(self):
+        pass
+
+    def session(self, **kwargs):
+        return FakeSession(self)
+
+    def close(self):
+        self.closed = True
+
+
+def _graph(edges=250):
+    graph = nx.DiGraph()
+    for i in range(edges):
+        graph.add_edge(f"0xA{i}", f"0xB{i % 50}", weight=1.0, count=1)
+    return graph
+
+
+ANALYSIS = {"metrics": {"chain": "ethereum"}, "mixer_flags": []}
+
+
+def test_memgraph_writes_unwind_batches(tmp_path):
+    driver = FakeDriver()
+    storage = GraphStorage("memgraph", driver=driver, batch_size=100, write_sessions=3,
+                           snapshot=GraphSnapshot(str(tmp_path / "snapshot.sqlite3")))
+    result = storage.save_graph(_graph(), "0xTOKEN", ANALYSIS)
+
+    assert result["success"], result
+    node_batches = [p["nodes"] for _, p in driver.calls if "nodes" in p]
+    edge_batches = [p["edges"] for _, p in driver.calls if "edges" in p]
+    assert sorted(len(b) for b in node_batches) == [100, 100, 100]
+    assert sorted(len(b) for b in edge_batches) == [50, 100, 100]
+    assert result["nodes_created"] == 300 and result["relationships_created"] == 250
+    assert all(row["from"] == row["from"].lower() for batch in edge_batches for row in batch)
+    assert result["rows_per_second"] > 0
+    # Driver fourni par l'appelant: pas fermé
+    assert not driver.closed
+
+
+def _written(driver, parameter):
+    return [row for _, params in driver.calls for row in params.get(parameter, [])]
+
+
+def test_repeat_save_writes_only_the_diff(tmp_path):
+    snapshot = GraphSnapshot(str(tmp_path / "snapshot.sqlite3"))
+    graph = _graph(100)
+    first = FakeDriver()
+    GraphStorage("neo4j", driver=first, snapshot=snapshot).save_graph(graph, "0xTOKEN", ANALYSIS)
+    assert len(_written(first, "edges")) == 100
+    assert all("MERGE (from)-[t:TRANSFERRED" in cypher for cypher, p in first.calls if "edges" in p)
+
+    # Même graphe: rien à écrire
+    second = FakeDriver()
+    result = GraphStorage("neo4j", driver=second, snapshot=snapshot).save_graph(graph, "0xTOKEN", ANALYSIS)
+    assert result["success"], result
+    assert _written(second, "edges") == [] and _written(second, "nodes") == []
+    assert result["relationships_unchanged"] == 100
+
+    # Une arête modifiée + une nouvelle: seules ces lignes (et le nouveau wallet) partent
+    graph["0xA1"]["0xB1"]["weight"] = 5.0
+    graph.add_edge("0xA1", "0xNEW", weight=1.0)
+    third = FakeDriver()
+    GraphStorage("neo4j", driver=third, snapshot=snapshot).save_graph(graph, "0xTOKEN", ANALYSIS)
+    assert sorted((r["from"], r["to"]) for r in _written(third, "edges")) == [("0xa1", "0xb1"), ("0xa1", "0xnew")]
+    assert [r["address"] for r in _written(third, "nodes")] == ["0xnew"]
+
+    # Mode full: tout est réécrit
+    full = FakeDriver()
+    GraphStorage("neo4j", driver=full, snapshot=snapshot, write_mode="full").save_graph(graph, "0xTOKEN", ANALYSIS)
+    assert len(_written(full, "edges")) == 101
+
+
+def test_failed_write_does_not_update_snapshot(tmp_path):
+    snapshot = GraphSnapshot(str(tmp_path / "snapshot.sqlite3"))
+
+    class FailingDriver(FakeDriver):
+        def session(self, **kwargs):
+            session = FakeSession(self)
+            session.execute_write = lambda *args: (_ for _ in ()).throw(RuntimeError("connection lost"))
+            return session
+
+    result = GraphStorage("neo4j", driver=FailingDriver(), snapshot=snapshot).save_graph(_graph(10), "0xTOKEN", ANALYSIS)
+    assert not result["success"]
+    retry = FakeDriver()
+    GraphStorage("neo4j", driver=retry, snapshot=snapshot).save_graph(_graph(10), "0xTOKEN", ANALYSIS)
+    assert len(_written(retry, "edges")) == 10
@@ -0,0 +1,62 @@
+"""
+Tests pour le store graphe embarqué (SQLite)
+"""
+import networkx as nx
+import pytest
+from src.graph_store import SQLiteGraphStore
+from src.graph_storage import GraphStorage
+
+
+def _analysis(**extra):
+    return {
+        "metrics": {"chain": "ethereum", "pagerank": {"0xA": 0.6, "0xB": 0.3, "0xC": 0.1}, "gini": 0.8},
+        "mixer_flags": [{"address": "0xC", "is_mixer": True}],
+        "wash_trade_pairs": [], "suspicious_clusters": [{}], **extra,
+    }
+
+
+def _graph(weight=10.0):
+    graph = nx.DiGraph()
+    graph.add_node("0xA", balance=100.0, is_top_holder=True)
+    graph.add_node("0xB", balance=50.0)
+    graph.add_node("0xC", balance=1.0)
+    graph.add_edge("0xA", "0xB", weight=weight, count=2, tx_hash="0x1")
+    graph.add_edge("0xB", "0xC", weight=5.0, count=1, tx_hash="0x2")
+    return graph
+
+
+def test_save_is_idempotent_and_keeps_history(tmp_path):
+    store = SQLiteGraphStore(str(tmp_path / "store.sqlite3"))
+    store.save_graph(_graph(), "0xTOKEN", _analysis(risk_score=0.4))
+    store.save_graph(_graph(weight=20.0), "0xTOKEN", _analysis(risk_score=0.7))
+
+    stats = store.stats()
+    assert (stats["wallets"], stats["transfers"], stats["analyses"]) == (3, 2, 2)
+    assert store.token_transfers("0xtoken")[0] == {
+        "from_address": "0xa", "to_address": "0xb", "value": 20.0, "count": 2, "tx_hash": "0x1"
+    }
+    assert [a["risk_score"] for a in store.analysis_history("0xTOKEN")] == [0.7, 0.4]
+
+
+def test_neighbourhood_and_top_k(tmp_path):
+    store = SQLiteGraphStore(str(tmp_path / "store.sqlite3"))
+    store.save_graph(_graph(), "0xTOKEN", _analysis())
+    store.save_graph(_graph(), "0xOTHER", _analysis())
+
+    around_b = store.neighbours("0xB", token_address="0xTOKEN")
+    assert [(n["direction"], n["address"]) for n in around_b] == [("in", "0xa"), ("out", "0xc")]
+    assert len(store.neighbours("0xb", direction="out")) == 2
+    assert [w["address"] for w in store.top_wallets("0xTOKEN", k=2)] == ["0xa", "0xb"]
+    assert store.top_wallets("0xTOKEN", by="balance", k=1)[0]["is_top_holder"] == 1
+    wallet = store.wallet("0xC")
+    assert wallet["is_mixer"] == 1 and len(wallet["tokens"]) == 2
+    with pytest.raises(ValueError):
+        store.top_wallets("0xTOKEN", by="address")
+
+
+def test_graph_storage_sqlite_backend(tmp_path, monkeypatch):
+    import src.graph_store as graph_store
+    monkeypatch.setattr(graph_store, "_store", SQLiteGraphStore(str(tmp_path / "store.sqlite3")))
+    result = GraphStorage("sqlite").save_graph(_graph(), "0xTOKEN", _analysis())
+    assert result["success"], result
+    assert result["nodes_created"] == 3 and result["relationships_created"] == 2
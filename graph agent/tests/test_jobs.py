@@ -0,0 +1,112 @@
+"""
+Tests pour les jobs asynchrones et le suivi d'avancement
+"""
+import asyncio
+from src.jobs import JobManager
+
+
+def test_job_reports_progress_and_result():
+    async def scenario():
+        manager = JobManager(max_concurrency=1, result_ttl=60)
+
+        async def runner(progress):
+            progress.start_stage("fetch")
+            progress.page_decoded(100)
+            progress.page_decoded(50)
+            await asyncio.sleep(0)
+            progress.start_stage("analyze")
+            return {"ok": True}
+
+        job = manager.submit({"token_address": "0xabc"}, runner)
+        assert job.status == "queued"
+        await job.task
+        return manager.get(job.id).to_dict()
+
+    data = asyncio.run(scenario())
+    assert data["status"] == "done"
+    assert data["result"] == {"ok": True}
+    assert data["progress"]["pages_fetched"] == 2
+    assert data["progress"]["transfers_decoded"] == 150
+    assert set(data["progress"]["stage_timings"]) == {"fetch", "analyze"}
+
+
+def test_failed_job_and_expiry():
+    async def scenario():
+        manager = JobManager(max_concurrency=1, result_ttl=0)
+
+        async def runner(progress):
+            raise ValueError("boom")
+
+        job = manager.submit({}, runner, error_handler=lambda e: {"status_code": 400, "detail": str(e)})
+        await job.task
+        failed = job.to_dict()
+        job.finished_at -= 1
+        return failed, manager.get(job.id)
+
+    failed, expired = asyncio.run(scenario())
+    assert failed["status"] == "failed"
+    assert failed["error"] == {"status_code": 400, "detail": "boom"}
+    assert expired is None
+
+
+def test_pending_jobs_are_capped():
+    from src.jobs import JobRejected
+
+    async def scenario():
+        manager = JobManager(max_concurrency=1, result_ttl=60, max_pending=2)
+        release = asyncio.Event()
+
+        async def runner(progress):
+            await release.wait()
+            return {"ok": True}
+
+        jobs = [manager.submit({"i": i}, runner) for i in range(2)]
+        try:
+            manager.submit({"i": 2}, runner)
+            rejected = None
+        except JobRejected as e:
+            rejected = e
+        release.set()
+        await asyncio.gather(*(job.task for job in jobs))
+        # Place libérée: nouveau job accepté
+        accepted = manager.submit({"i": 3}, runner)
+        await accepted.task
+        return rejected, manager.stats()
+
+    rejected, stats = asyncio.run(scenario())
+    assert rejected is not None and rejected.status_code == 503 and rejected.retry_after >= 1
+    assert stats["pending"] == 0
+    assert stats["rejected"] == 1
+
+
+def test_progress_has_listeners():
+    from src.progress import AnalysisProgress
+
+    progress = AnalysisProgress()
+    assert not progress.has_listeners()
+    events = []
+    progress.subscribe(events.append)
+    assert progress.has_listeners()
+    progress.emit("metadata", {"symbol": "TKN"})
+    assert [e["stage"] for e in events] == ["metadata"]
+
+
+def test_job_state_shared_through_store():
+    from src.cache import CompressedLRUCache
+
+    store = CompressedLRUCache()
+
+    async def scenario():
+        worker_a = JobManager(max_concurrency=1, result_ttl=60, store=store)
+        worker_b = JobManager(max_concurrency=1, result_ttl=60, store=store)
+
+        async def runner(progress):
+            return {"ok": True}
+
+        job = worker_a.submit({"token_address": "0xabc"}, runner)
+        await job.task
+        return await worker_b.lookup(job.id), await worker_b.lookup("missing")
+
+    data, missing = asyncio.run(scenario())
+    assert data["status"] == "done" and data["result"] == {"ok": True}
+    assert missing is None
@@ -0,0 +1,88 @@
+"""
+Tests pour le registre de labels (fichier mmap + lookup batch)
+"""
+import os
+import threading
+from src.label_registry import (
+    LabelRegistry, write_label_file, encode_addresses,
+    LABEL_MIXER, LABEL_CEX, LABEL_SANCTIONED, WHITELIST_MASK,
+)
+
+TORNADO = "0x12d66f87a04a9e220743712ce6d9bb1b5616b8fc"
+CEX = "0x" + "ab" * 20
+OTHER = "0x" + "00" * 19 + "01"
+
+
+def test_encode_addresses_rejects_malformed():
+    keys, valid = encode_addresses([CEX, "0x1234", "not-an-address", CEX.upper().replace("0X", "0x")])
+    assert list(valid) == [True, False, False, True]
+    assert keys[0] == keys[3]
+
+
+def test_encode_addresses_rejects_overlong_instead_of_truncating():
+    # Adresse valide suivie de caractères en trop (padding, format non EVM): pas de troncature à 42
+    keys, valid = encode_addresses([CEX + "00", CEX + " ", CEX])
+    assert list(valid) == [False, False, True]
+
+
+def test_lookup_from_file(tmp_path):
+    path = str(tmp_path / "labels.bin")
+    written = write_label_file(path, [(CEX, LABEL_CEX), (OTHER, LABEL_SANCTIONED), (CEX, LABEL_SANCTIONED)])
+    assert written == 2
+
+    registry = LabelRegistry(path=path, reload_interval=-1)
+    codes = registry.lookup([CEX, OTHER, "0x" + "cd" * 20, TORNADO])
+    assert codes[0] == LABEL_CEX | LABEL_SANCTIONED
+    assert codes[1] == LABEL_SANCTIONED
+    assert codes[2] == 0
+    # Labels intégrés (Config.KNOWN_MIXERS) toujours présents
+    assert codes[3] & LABEL_MIXER
+    assert registry.addresses_with([CEX, OTHER], WHITELIST_MASK) == {CEX}
+
+
+def test_hot_reload(tmp_path):
+    path = str(tmp_path / "labels.bin")
+    registry = LabelRegistry(path=path, reload_interval=0)
+    assert registry.get(CEX) == 0
+
+    write_label_file(path, [(CEX, LABEL_CEX)])
+    assert registry.get(CEX) == LABEL_CEX
+
+    os.remove(path)
+    assert registry.get(CEX) == 0
+
+
+def test_bloom_prescreen(tmp_path):
+    path = str(tmp_path / "labels.bin")
+    labeled = ["0x%040x" % (i * 7919 + 1) for i in range(2000)]
+    write_label_file(path, [(a, LABEL_SANCTIONED) for a in labeled])
+    registry = LabelRegistry(path=path, reload_interval=-1)
+
+    bloom = registry.bloom_filter()
+    # Pas de faux négatifs
+    assert bloom.might_contain(labeled).all()
+    assert bloom.might_contain([TORNADO])[0]
+
+    unlabeled = ["0x%040x" % (i * 7919 + 2) for i in range(2000)]
+    hits = registry.screen(labeled[:10] + unlabeled)
+    assert hits == {a: LABEL_SANCTIONED for a in labeled[:10]}
+
+
+def test_bloom_rebuilt_off_request_path_after_reload(tmp_path):
+    path = str(tmp_path / "labels.bin")
+    registry = LabelRegistry(path=path, reload_interval=-1)
+    built = registry._bloom
+    assert built is not None  # construit avec le registre
+
+    write_label_file(path, [(CEX, LABEL_CEX)])
+    registry._load(force=False)  # nouvelle table, filtre pas encore reconstruit
+    # screen() ne construit pas le filtre: lookup exact en attendant
+    assert registry.screen([CEX, OTHER]) == {CEX: LABEL_CEX}
+    assert registry._bloom is built
+
+    assert registry.reload(force=True)
+    for thread in threading.enumerate():
+        if thread.name == "label-bloom":
+            thread.join()
+    assert registry._bloom[0] is registry._table
+    assert registry.screen([CEX, OTHER]) == {CEX: LABEL_CEX}
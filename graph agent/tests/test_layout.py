@@ -0,0 +1,73 @@
+"""
+Tests pour le layout précalculé (x/y dans graph_data)
+"""
+import math
+import networkx as nx
+from src.layout import apply_layout, compute_layout, layout_graph_data, positions_from_graph_data
+
+
+def _graph():
+    graph = nx.DiGraph()
+    communities = {}
+    for c in range(4):
+        wallets = [f"0x{c}_{i}" for i in range(10)]
+        communities[c] = wallets
+        for i in range(1, 10):
+            graph.add_edge(wallets[i - 1], wallets[i])
+        graph.add_edge(wallets[0], f"0x{(c + 1) % 4}_0")
+    return graph, communities
+
+
+def test_layout_is_deterministic_and_complete():
+    graph, communities = _graph()
+    first = compute_layout(graph, communities)
+    assert set(first) == set(graph.nodes())
+    assert compute_layout(graph, communities) == first
+    graph_data = {"nodes": [{"id": node} for node in graph.nodes()]}
+    assert positions_from_graph_data(apply_layout(graph_data, first)) == first
+
+
+def test_previous_layout_keeps_positions_stable():
+    graph, communities = _graph()
+    previous = compute_layout(graph, communities)
+    graph.add_edge("0x0_0", "0xnew")
+    relayout = compute_layout(graph, communities, previous)
+    assert "0xnew" in relayout
+    radius = max(math.hypot(x, y) for x, y in previous.values())
+    moved = [math.hypot(relayout[n][0] - x, relayout[n][1] - y) for n, (x, y) in previous.items()]
+    # Les wallets déjà placés bougent peu par rapport à la taille du graphe
+    assert sum(moved) / len(moved) < 0.25 * radius
+
+
+def test_drl_refines_previous_layout(monkeypatch):
+    from config import Config
+
+    monkeypatch.setattr(Config, "LAYOUT_DRL_THRESHOLD", 10)
+    graph, communities = _graph()
+    previous = compute_layout(graph, communities)
+    graph.add_edge("0x0_0", "0xnew")
+    relayout = compute_layout(graph, communities, previous)
+    scratch = compute_layout(graph, communities)
+    radius = max(math.hypot(x, y) for x, y in previous.values())
+
+    def mean_moved(layout):
+        return sum(math.hypot(layout[n][0] - x, layout[n][1] - y) for n, (x, y) in previous.items()) / len(previous)
+
+    # Préréglage "refine": bien plus proche du layout précédent qu'un layout DrL complet
+    assert mean_moved(relayout) < 0.25 * radius
+    assert mean_moved(relayout) < mean_moved(scratch)
+
+
+def test_layout_process_is_deterministic():
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    graph, communities = _graph()
+    graph_data = {
+        "nodes": [{"id": node} for node in graph.nodes()],
+        "links": [{"source": u, "target": v} for u, v in graph.edges()],
+    }
+    expected = compute_layout(graph, communities)
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = list(pool.map(layout_graph_data, [graph_data] * 4, [communities] * 4))
+    assert all(result == expected for result in results)
@@ -0,0 +1,54 @@
+"""
+Tests pour le résumé du graphe (supernœuds par communauté, dépliage)
+"""
+from src.level_of_detail import apply_level_of_detail, summarize_graph
+
+
+def _result(communities=5, size=20):
+    nodes, links, comm = [], [], {}
+    for c in range(communities):
+        wallets = [f"0x{c}_{i}" for i in range(size)]
+        comm[c] = wallets
+        for i, wallet in enumerate(wallets):
+            nodes.append({"id": wallet, "group": 0, "pagerank": (c * size + i) / 1000,
+                          "is_mixer": wallet == "0x0_0", "balance": 1})
+            if i:
+                links.append({"source": wallets[i - 1], "target": wallet, "value": 10, "count": 1,
+                              "is_wash_trade": False})
+        # Lien vers la communauté suivante
+        links.append({"source": wallets[0], "target": f"0x{(c + 1) % communities}_0", "value": 5,
+                      "count": 2, "is_wash_trade": c == 1})
+    return {
+        "graph_data": {"nodes": nodes, "links": links},
+        "metrics": {"communities": comm},
+        "suspicious_clusters": [{"cluster_id": 2, "wallets": ["0x2_5"], "risk_level": "high"}],
+    }
+
+
+def test_summary_is_bounded_and_keeps_flagged_wallets():
+    result = _result()
+    summary = summarize_graph(result, max_nodes=12, max_supernodes=3, top_k=3)
+    ids = {node["id"] for node in summary["nodes"]}
+    assert len(summary["nodes"]) <= 12 + 1
+    # Mixer, extrémités de wash trade, membre de cluster suspect, top PageRank
+    assert {"0x0_0", "0x1_0", "0x2_0", "0x2_5", "0x4_19"} <= ids
+    supernodes = [node for node in summary["nodes"] if node.get("is_supernode")]
+    assert "community:other" in {node["id"] for node in supernodes}
+    # Aucun wallet perdu, aucun volume perdu
+    assert sum(node.get("size", 1) for node in summary["nodes"]) == 100
+    total = sum(link["value"] for link in result["graph_data"]["links"])
+    assert sum(link["value"] for link in summary["links"]) + sum(n["volume"] for n in supernodes) == total
+    assert summary["level_of_detail"]["total_nodes"] == 100
+    assert result["graph_data"]["nodes"][0] == {"id": "0x0_0", "group": 0, "pagerank": 0.0,
+                                                "is_mixer": True, "balance": 1}
+
+
+def test_expand_and_auto_threshold():
+    result = _result()
+    expanded = summarize_graph(result, expand="community:3", max_nodes=40, max_supernodes=5, top_k=0)
+    ids = {node["id"] for node in expanded["nodes"]}
+    assert all(f"0x3_{i}" in ids for i in range(20))
+    assert "community:3" not in ids
+    # "auto": petits graphes renvoyés tels quels
+    assert apply_level_of_detail(result, "auto") is result
+    assert apply_level_of_detail(result, "summary")["graph_data"]["level_of_detail"]["detail"] == "summary"
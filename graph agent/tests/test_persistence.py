@@ -0,0 +1,59 @@
+"""
+Tests pour la persistance graph DB en tâche de fond (file, nouvelles tentatives, backpressure)
+"""
+import asyncio
+import threading
+import networkx as nx
+import pytest
+from src.persistence import PersistenceQueue, PersistenceRejected
+
+
+def test_save_is_retried_then_succeeds():
+    calls = []
+
+    def saver(job):
+        calls.append(job.token_address)
+        if len(calls) == 1:
+            return {"success": False, "error": "connection refused"}
+        return {"success": True, "nodes_created": job.graph.number_of_nodes()}
+
+    async def scenario():
+        queue = PersistenceQueue(max_queue=4, workers=1, max_attempts=3, retry_backoff=0, saver=saver)
+        graph = nx.DiGraph([("0xa", "0xb")])
+        job = queue.submit(graph, "0xTOKEN", {}, "neo4j")
+        assert job.status == "queued"
+        assert await queue.drain(5)
+        stats = queue.stats()
+        await queue.close(0)
+        return queue.get(job.id).to_dict(), stats
+
+    data, stats = asyncio.run(scenario())
+    assert data["status"] == "done" and data["attempts"] == 2
+    assert data["result"] == {"success": True, "nodes_created": 2}
+    assert stats["succeeded"] == 1 and stats["retries"] == 1 and stats["failed"] == 0
+    assert stats["last_error"] == "connection refused"
+    assert stats["write_seconds"]["p50"] is not None
+
+
+def test_full_queue_rejects_and_failures_are_counted():
+    release = threading.Event()
+
+    def saver(job):
+        release.wait(5)
+        raise RuntimeError("database unavailable")
+
+    async def scenario():
+        queue = PersistenceQueue(max_queue=1, workers=1, max_attempts=1, retry_backoff=0, saver=saver)
+        running = queue.submit(nx.DiGraph(), "0x1", {})
+        await asyncio.sleep(0.05)  # le worker prend le premier job
+        queue.submit(nx.DiGraph(), "0x2", {})
+        with pytest.raises(PersistenceRejected):
+            queue.submit(nx.DiGraph(), "0x3", {})
+        release.set()
+        assert await queue.drain(5)
+        await queue.close(0)
+        return queue.get(running.id).to_dict(), queue.stats()
+
+    data, stats = asyncio.run(scenario())
+    assert data["status"] == "failed" and data["error"] == "database unavailable"
+    assert stats["rejected"] == 1 and stats["failed"] == 2 and stats["submitted"] == 2
@@ -0,0 +1,42 @@
+"""
+Tests pour la projection des réponses /analyze (paramètre fields)
+"""
+import pytest
+from src.projection import parse_fields, project_response
+
+
+def _result():
+    return {
+        "token_address": "0xabc",
+        "analysis_time_seconds": 1.0,
+        "risk_score": 0.5,
+        "analysis_id": "id",
+        "top_holders": [{"address": "0x1"}],
+        "suspicious_clusters": [{"cluster_id": 0, "wallets": ["0x1", "0x2"], "size": 2}],
+        "mixer_flags": [],
+        "wash_trade_pairs": [],
+        "graph_data": {"nodes": [], "links": []},
+        "metrics": {"gini": 0.4, "pagerank": {"0x1": 0.5}, "communities": {0: ["0x1", "0x2"]}},
+        "storage_result": None,
+    }
+
+
+def test_full_response_by_default():
+    assert project_response(_result(), parse_fields(None)) == _result()
+
+
+def test_heavy_sections_are_opt_in():
+    projected = project_response(_result(), parse_fields("metrics, suspicious_clusters"))
+    assert set(projected) == {"token_address", "analysis_time_seconds", "risk_score", "analysis_id",
+                              "metrics", "suspicious_clusters"}
+    assert projected["metrics"] == {"gini": 0.4}
+    assert projected["suspicious_clusters"] == [{"cluster_id": 0, "size": 2}]
+
+    heavy = project_response(_result(), parse_fields(["metrics.pagerank", "suspicious_clusters.wallets"]))
+    assert heavy["metrics"] == {"gini": 0.4, "pagerank": {"0x1": 0.5}}
+    assert heavy["suspicious_clusters"][0]["wallets"] == ["0x1", "0x2"]
+
+
+def test_unknown_field_rejected():
+    with pytest.raises(ValueError):
+        parse_fields(["graph_data", "everything"])
@@ -0,0 +1,56 @@
+"""
+Tests pour le token bucket asynchrone partagé par provider
+"""
+import asyncio
+import time
+
+from src.rate_limiter import AsyncRateLimiter, provider_for_host
+
+
+def test_burst_then_rate():
+    async def scenario():
+        limiter = AsyncRateLimiter(rate=20, burst=2)
+        start = time.monotonic()
+        times = []
+        for _ in range(4):
+            await limiter.acquire()
+            times.append(time.monotonic() - start)
+        return times
+
+    times = asyncio.run(scenario())
+    # Rafale servie tout de suite, puis un jeton toutes les 1/rate secondes
+    assert times[1] < 0.03
+    assert times[3] >= 2 / 20 - 0.01
+
+
+def test_waiters_served_in_arrival_order():
+    async def scenario():
+        limiter = AsyncRateLimiter(rate=50, burst=1)
+        order = []
+
+        async def caller(i):
+            await limiter.acquire()
+            order.append(i)
+
+        await asyncio.gather(*(caller(i) for i in range(5)))
+        return order
+
+    assert asyncio.run(scenario()) == [0, 1, 2, 3, 4]
+
+
+def test_zero_rate_disables_limit():
+    async def scenario():
+        limiter = AsyncRateLimiter(rate=0)
+        start = time.monotonic()
+        for _ in range(100):
+            await limiter.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(scenario()) < 0.05
+
+
+def test_provider_for_host():
+    assert provider_for_host("api.etherscan.io") == "etherscan"
+    assert provider_for_host("eth-mainnet.g.alchemy.com") == "alchemy"
+    assert provider_for_host("streaming.bitquery.io") == "bitquery"
+    assert provider_for_host("example.com") is None
@@ -0,0 +1,39 @@
+"""
+Tests pour le cache de réponses /analyze (clé, ETag, If-None-Match)
+"""
+from config import AnalysisSettings
+from src.response_cache import (
+    ResponseCache, analysis_params, data_watermark, etag_for, etag_matches, response_cache_key
+)
+
+
+def _token_data(n):
+    transactions = [{"hash": f"0x{i}", "value": 1.0, "timestamp": 1_700_000_000 - i} for i in range(n)]
+    return {"transactions": transactions, "all_wallets": [], "top_holders": []}
+
+
+def test_key_changes_with_data_and_params():
+    params = analysis_params(AnalysisSettings(), "auto")
+    key = response_cache_key("ethereum", "0xABC", data_watermark(_token_data(3)), params)
+    assert key == response_cache_key("ethereum", "0xabc", data_watermark(_token_data(3)), params)
+    assert key != response_cache_key("ethereum", "0xabc", data_watermark(_token_data(4)), params)
+    assert key != response_cache_key("ethereum", "0xabc", data_watermark(_token_data(3)), analysis_params(AnalysisSettings(), "leiden"))
+    # Le timeout ne change pas le résultat
+    assert params == analysis_params(AnalysisSettings(timeout_seconds=5), "auto")
+
+
+def test_etag_matching_and_eviction():
+    etag = etag_for("abc")
+    assert etag_matches(etag, etag)
+    assert etag_matches('"abc", W/"other"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"other"', etag)
+    assert not etag_matches(None, etag)
+
+    cache = ResponseCache(max_items=2, ttl_seconds=60)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a").body == b"1"
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a").etag == etag_for("a")
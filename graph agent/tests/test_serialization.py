@@ -0,0 +1,60 @@
+"""
+Tests pour l'encodage rapide et la compression négociée des réponses
+"""
+import asyncio
+import gzip
+import json
+import threading
+
+from config import Config
+from src.serialization import dumps, encode_for_client, negotiate_encoding
+
+
+def test_dumps_matches_json():
+    payload = {"nodes": [{"id": "0x1", "balance": 1.5}], "communities": {0: ["0x1"]}, "none": None}
+    assert json.loads(dumps(payload)) == json.loads(json.dumps(payload, default=str))
+
+
+def test_negotiation():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("*") in ("br", "gzip")
+
+
+def test_gzip_roundtrip_and_variant_cache():
+    body = dumps({"links": [{"source": "0x1", "target": "0x2", "value": i} for i in range(500)]})
+    variants = {}
+    encoded, encoding = asyncio.run(encode_for_client(body, "gzip", variants))
+    assert encoding == "gzip" and len(encoded) < len(body)
+    assert gzip.decompress(encoded) == body
+    assert variants == {"gzip": encoded}
+    # Petit corps: jamais compressé
+    assert asyncio.run(encode_for_client(b"{}", "gzip")) == (b"{}", None)
+
+
+def test_large_bodies_compressed_off_the_event_loop(monkeypatch):
+    import src.serialization as serialization
+
+    threads = []
+    real_compress = serialization.compress
+
+    def recording_compress(body, encoding):
+        threads.append(threading.current_thread() is threading.main_thread())
+        return real_compress(body, encoding)
+
+    monkeypatch.setattr(serialization, "compress", recording_compress)
+    monkeypatch.setattr(Config, "COMPRESS_THREAD_MIN_BYTES", 4096)
+    small = dumps({"values": list(range(300))})
+    large = dumps({"values": list(range(5000))})
+    assert Config.COMPRESS_MIN_BYTES <= len(small) < 4096 <= len(large)
+
+    async def scenario():
+        await encode_for_client(small, "gzip")
+        encoded, _ = await encode_for_client(large, "gzip")
+        return encoded
+
+    assert gzip.decompress(asyncio.run(scenario())) == large
+    # Petit corps sur la boucle (thread principal), gros corps dans un thread
+    assert threads == [True, False]
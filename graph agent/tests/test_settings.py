@@ -0,0 +1,37 @@
+"""
+Tests pour les paramètres d'analyse par requête
+"""
+import dataclasses
+import networkx as nx
+import pytest
+from config import Config, AnalysisSettings
+from src.analyzer import GraphAnalyzer
+from src.risk_scorer import RiskScorer
+
+
+def test_settings_are_immutable_and_isolated():
+    default_max = Config.MAX_TRANSACTIONS_TO_FETCH
+    settings = AnalysisSettings.from_config(max_transactions=default_max + 1, timeout_seconds=None)
+    assert settings.max_transactions == default_max + 1
+    assert settings.timeout_seconds is None
+    # Config n'est pas modifié par les overrides
+    assert Config.MAX_TRANSACTIONS_TO_FETCH == default_max
+    assert AnalysisSettings().max_transactions == default_max
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        settings.max_transactions = 10
+    with pytest.raises(TypeError):
+        settings.risk_weights["gini"] = 1.0
+    assert settings.with_overrides(max_holders=3, max_transactions=None).max_holders == 3
+    assert settings.with_overrides(max_holders=3).max_transactions == default_max + 1
+
+
+def test_components_use_request_settings():
+    graph = nx.DiGraph()
+    for i in range(10):
+        graph.add_edge(f"0x{i}", f"0x{i + 1}", weight=10, count=1)
+    settings = AnalysisSettings.from_config(max_holders=3)
+    results = GraphAnalyzer(graph, settings=settings).analyze()
+    assert len(results["top_holders"]) == 3
+    assert len(GraphAnalyzer(graph).analyze()["top_holders"]) == min(Config.MAX_HOLDERS, 11)
+    weights = {"gini": 1.0, "mixer": 0.0, "wash_trade": 0.0, "cluster": 0.0}
+    assert RiskScorer(settings=settings.with_overrides(risk_weights=weights)).weights == weights
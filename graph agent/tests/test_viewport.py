@@ -0,0 +1,51 @@
+"""
+Tests pour l'index spatial du layout (requêtes viewport)
+"""
+import pytest
+from config import Config
+from src.viewport import ViewportIndex, parse_bbox
+
+
+def _graph_data(side=30):
+    nodes = [
+        {"id": f"{x}:{y}", "x": float(x * 10), "y": float(y * 10), "pagerank": (x + y) / 1000, "is_mixer": False}
+        for x in range(side) for y in range(side)
+    ]
+    links = [
+        {"source": f"{x}:{y}", "target": f"{x + 1}:{y}", "value": 1}
+        for x in range(side - 1) for y in range(side)
+    ]
+    return {"nodes": nodes, "links": links}
+
+
+def test_query_matches_brute_force():
+    index = ViewportIndex(_graph_data())
+    bbox = (15.0, 42.0, 95.0, 120.0)
+    expected = {n["id"] for n in _graph_data()["nodes"] if 15 <= n["x"] <= 95 and 42 <= n["y"] <= 120}
+    assert {index.nodes[i]["id"] for i in index.query(bbox)} == expected
+    assert {index.nodes[i]["id"] for i in index.query((-1e9, -1e9, 1e9, 1e9))} == {n["id"] for n in index.nodes}
+
+
+def test_viewport_caps_density_and_links_stay_inside():
+    index = ViewportIndex(_graph_data())
+    # Zoom arrière: une cellule d'écran couvre beaucoup de nœuds -> plafonnement
+    result = index.viewport((0.0, 0.0, 290.0, 290.0), zoom=Config.VIEWPORT_CELL_PIXELS / 100)
+    assert result["stats"]["visible_total"] == 900
+    assert result["stats"]["returned"] <= 9 * Config.VIEWPORT_NODES_PER_CELL
+    returned = {n["id"] for n in result["nodes"]} | {n["id"] for n in result["context"]}
+    assert all(l["source"] in returned and l["target"] in returned for l in result["links"])
+    # Zoom avant sur une petite zone: tous les nœuds visibles, contexte ailleurs
+    close = index.viewport((0.0, 0.0, 40.0, 40.0), zoom=10)
+    assert close["stats"]["returned"] == 25
+    assert close["context"] and all(n["x"] > 40 or n["y"] > 40 for n in close["context"])
+
+
+def test_parse_bbox():
+    assert parse_bbox("1,2,3,4") == (1.0, 2.0, 3.0, 4.0)
+    with pytest.raises(ValueError):
+        parse_bbox("1,2,3")
+    with pytest.raises(ValueError):
+        parse_bbox("5,0,1,1")
+    for bbox in ("nan,0,1,1", "0,0,inf,1", "-inf,-inf,inf,inf", "0,0,1,NaN"):
+        with pytest.raises(ValueError):
+            parse_bbox(bbox)